@@ -0,0 +1,35 @@
+"""add_impersonation_id_to_request_logs
+
+Revision ID: 3f7c2a9d4e11
+Revises: 0e0dd6eced95
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7c2a9d4e11'
+down_revision: Union[str, Sequence[str], None] = '0e0dd6eced95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('request_logs', sa.Column('impersonation_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_request_logs_impersonation_id'), 'request_logs', ['impersonation_id'], unique=False)
+    op.create_foreign_key(
+        'fk_request_logs_impersonation_id', 'request_logs', 'user_impersonations',
+        ['impersonation_id'], ['id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_request_logs_impersonation_id', 'request_logs', type_='foreignkey')
+    op.drop_index(op.f('ix_request_logs_impersonation_id'), table_name='request_logs')
+    op.drop_column('request_logs', 'impersonation_id')
@@ -0,0 +1,28 @@
+"""add_ttfb_ms_to_request_logs
+
+Revision ID: 7b1e4d2c9a05
+Revises: 3f7c2a9d4e11
+Create Date: 2026-10-17 10:03:27.540917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4d2c9a05'
+down_revision: Union[str, Sequence[str], None] = '3f7c2a9d4e11'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('request_logs', sa.Column('ttfb_ms', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('request_logs', 'ttfb_ms')
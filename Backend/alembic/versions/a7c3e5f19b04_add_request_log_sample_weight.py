@@ -0,0 +1,28 @@
+"""add_request_log_sample_weight
+
+Revision ID: a7c3e5f19b04
+Revises: f1b84d20c7e9
+Create Date: 2026-10-17 19:12:37.604815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e5f19b04'
+down_revision: Union[str, Sequence[str], None] = 'f1b84d20c7e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('request_logs', sa.Column('sample_weight', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('request_logs', 'sample_weight')
@@ -0,0 +1,38 @@
+"""add_entity_counters
+
+Revision ID: b5d2f8e4a917
+Revises: a7c3e5f19b04
+Create Date: 2026-10-17 21:03:48.117529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2f8e4a917'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e5f19b04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTED_TABLES = ('customers', 'samples', 'projects', 'result_entries', 'reports')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('entity_counters',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Start from a full count; scripts/repair_entity_counters.py fixes anything written meanwhile
+    for table in COUNTED_TABLES:
+        op.execute(f"INSERT INTO entity_counters (name, count) SELECT '{table}', COUNT(*) FROM {table}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('entity_counters')
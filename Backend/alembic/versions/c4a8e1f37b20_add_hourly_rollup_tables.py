@@ -0,0 +1,66 @@
+"""add_hourly_rollup_tables
+
+Revision ID: c4a8e1f37b20
+Revises: 7b1e4d2c9a05
+Create Date: 2026-10-17 13:26:05.112874
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8e1f37b20'
+down_revision: Union[str, Sequence[str], None] = '7b1e4d2c9a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rollups start empty; the background rollup task catches up from id 0 in batches
+    op.create_table('request_log_hourly',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('route', sa.String(length=500), nullable=False),
+    sa.Column('method', sa.Enum('GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'OPTIONS', 'HEAD', name='httpmethod'), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=False),
+    sa.Column('request_count', sa.Integer(), nullable=False),
+    sa.Column('total_response_time_ms', sa.BigInteger(), nullable=False),
+    sa.Column('max_response_time_ms', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('hour', 'route', 'method', 'status_code', name='uq_request_log_hourly_bucket')
+    )
+    op.create_index(op.f('ix_request_log_hourly_hour'), 'request_log_hourly', ['hour'], unique=False)
+    op.create_index(op.f('ix_request_log_hourly_id'), 'request_log_hourly', ['id'], unique=False)
+    op.create_index(op.f('ix_request_log_hourly_route'), 'request_log_hourly', ['route'], unique=False)
+    op.create_table('login_history_hourly',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('success', sa.Boolean(), nullable=False),
+    sa.Column('attempt_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('hour', 'success', name='uq_login_history_hourly_bucket')
+    )
+    op.create_index(op.f('ix_login_history_hourly_hour'), 'login_history_hourly', ['hour'], unique=False)
+    op.create_index(op.f('ix_login_history_hourly_id'), 'login_history_hourly', ['id'], unique=False)
+    op.create_table('rollup_state',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rollup_state')
+    op.drop_index(op.f('ix_login_history_hourly_id'), table_name='login_history_hourly')
+    op.drop_index(op.f('ix_login_history_hourly_hour'), table_name='login_history_hourly')
+    op.drop_table('login_history_hourly')
+    op.drop_index(op.f('ix_request_log_hourly_route'), table_name='request_log_hourly')
+    op.drop_index(op.f('ix_request_log_hourly_id'), table_name='request_log_hourly')
+    op.drop_index(op.f('ix_request_log_hourly_hour'), table_name='request_log_hourly')
+    op.drop_table('request_log_hourly')
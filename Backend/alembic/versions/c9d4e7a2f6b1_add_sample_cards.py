@@ -0,0 +1,64 @@
+"""add_sample_cards
+
+Revision ID: c9d4e7a2f6b1
+Revises: b5d2f8e4a917
+Create Date: 2026-10-17 23:41:06.502184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d4e7a2f6b1'
+down_revision: Union[str, Sequence[str], None] = 'b5d2f8e4a917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sample_cards',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sample_code', sa.String(length=10), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('sample_type_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('volume', sa.String(length=100), nullable=True),
+    sa.Column('conditions', sa.Text(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('is_batch', sa.Boolean(), nullable=False),
+    sa.Column('batch_size', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('customer_code', sa.String(length=5), nullable=True),
+    sa.Column('customer_name', sa.String(length=255), nullable=True),
+    sa.Column('customer_email', sa.String(length=255), nullable=True),
+    sa.Column('customer_phone', sa.String(length=50), nullable=True),
+    sa.Column('customer_company', sa.String(length=255), nullable=True),
+    sa.Column('project_name', sa.String(length=255), nullable=True),
+    sa.Column('sample_type_name', sa.String(length=255), nullable=True),
+    sa.Column('department_names', sa.Text(), nullable=False),
+    sa.Column('test_type_names', sa.Text(), nullable=False),
+    sa.Column('search_text', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['id'], ['samples.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sample_cards_sample_code'), 'sample_cards', ['sample_code'], unique=False)
+    op.create_index(op.f('ix_sample_cards_customer_id'), 'sample_cards', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_sample_cards_project_id'), 'sample_cards', ['project_id'], unique=False)
+    op.create_index(op.f('ix_sample_cards_sample_type_id'), 'sample_cards', ['sample_type_id'], unique=False)
+    # The cards are built by the application on its first start (or scripts/rebuild_sample_cards.py)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_sample_cards_sample_type_id'), table_name='sample_cards')
+    op.drop_index(op.f('ix_sample_cards_project_id'), table_name='sample_cards')
+    op.drop_index(op.f('ix_sample_cards_customer_id'), table_name='sample_cards')
+    op.drop_index(op.f('ix_sample_cards_sample_code'), table_name='sample_cards')
+    op.drop_table('sample_cards')
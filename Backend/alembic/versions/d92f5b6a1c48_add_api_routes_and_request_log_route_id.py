@@ -0,0 +1,203 @@
+"""add_api_routes_and_request_log_route_id
+
+Revision ID: d92f5b6a1c48
+Revises: c4a8e1f37b20
+Create Date: 2026-10-17 15:02:41.530219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from starlette.routing import compile_path
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd92f5b6a1c48'
+down_revision: Union[str, Sequence[str], None] = 'c4a8e1f37b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows updated per statement batch, so the backfill never holds long locks on request_logs
+BACKFILL_CHUNK_SIZE = 10000
+
+# (method, template) of every API route when this revision was written, in the order the app
+# registered them (the first matching route serves a request). Frozen here so the migration
+# doesn't import the app; routes added later are registered by the app at startup
+ROUTES = (
+    ('POST', '/api/auth/login'),
+    ('GET', '/api/auth/me'),
+    ('POST', '/api/auth/reset-password'),
+    ('GET', '/api/users/'),
+    ('GET', '/api/users/{user_id}'),
+    ('POST', '/api/users/'),
+    ('GET', '/api/customers/search'),
+    ('GET', '/api/customers/'),
+    ('GET', '/api/customers/{id}'),
+    ('POST', '/api/customers/'),
+    ('PUT', '/api/customers/{customer_id}'),
+    ('DELETE', '/api/customers/{customer_id}'),
+    ('GET', '/api/projects/search'),
+    ('GET', '/api/projects/'),
+    ('GET', '/api/projects/{id}'),
+    ('POST', '/api/projects/'),
+    ('PUT', '/api/projects/{project_id}'),
+    ('DELETE', '/api/projects/{project_id}'),
+    ('GET', '/api/departments/'),
+    ('POST', '/api/departments/'),
+    ('PUT', '/api/departments/{department_id}'),
+    ('DELETE', '/api/departments/{department_id}'),
+    ('POST', '/api/departments/{department_id}/test-types'),
+    ('PUT', '/api/departments/{department_id}/test-types/{test_type_id}'),
+    ('DELETE', '/api/departments/{department_id}/test-types/{test_type_id}'),
+    ('GET', '/api/sample-types/'),
+    ('POST', '/api/sample-types/'),
+    ('PUT', '/api/sample-types/{sample_type_id}'),
+    ('DELETE', '/api/sample-types/{sample_type_id}'),
+    ('GET', '/api/samples/search'),
+    ('GET', '/api/samples/'),
+    ('GET', '/api/samples/{sample_id}/details'),
+    ('GET', '/api/samples/{sample_id}'),
+    ('POST', '/api/samples/'),
+    ('PUT', '/api/samples/{sample_id}'),
+    ('DELETE', '/api/samples/{sample_id}'),
+    ('GET', '/api/result-entries/search'),
+    ('GET', '/api/result-entries/sample/{sample_id}'),
+    ('GET', '/api/result-entries/{result_entry_id}'),
+    ('POST', '/api/result-entries/'),
+    ('POST', '/api/result-entries/{result_entry_id}/values'),
+    ('PUT', '/api/result-entries/{result_entry_id}/values/{value_id}'),
+    ('DELETE', '/api/result-entries/{result_entry_id}/values/{value_id}'),
+    ('POST', '/api/result-entries/{result_entry_id}/commit'),
+    ('DELETE', '/api/result-entries/{result_entry_id}'),
+    ('POST', '/api/reports/'),
+    ('GET', '/api/reports/proposed'),
+    ('GET', '/api/reports/finalized'),
+    ('GET', '/api/reports/{report_id}'),
+    ('POST', '/api/reports/{report_id}/validate'),
+    ('POST', '/api/reports/{report_id}/finalize'),
+    ('GET', '/api/reports/{report_id}/document'),
+    ('GET', '/api/reports/{report_id}/pdf'),
+    ('POST', '/api/reports/{report_id}/send-to-customer'),
+    ('GET', '/api/reports/public/view'),
+    ('GET', '/api/reports/public/{report_id}/pdf'),
+    ('DELETE', '/api/reports/{report_id}'),
+    ('GET', '/api/settings/account'),
+    ('GET', '/api/settings/organization'),
+    ('PUT', '/api/settings/organization'),
+    ('GET', '/api/settings/integrations'),
+    ('GET', '/api/settings/integrations/public/turnstile'),
+    ('GET', '/api/settings/integrations/{integration_name}'),
+    ('PUT', '/api/settings/integrations/{integration_name}'),
+    ('GET', '/api/settings/users'),
+    ('POST', '/api/settings/users'),
+    ('PUT', '/api/settings/users/{user_id}/suspend'),
+    ('PUT', '/api/settings/users/{user_id}/activate'),
+    ('DELETE', '/api/settings/users/{user_id}'),
+    ('POST', '/api/organization/logo'),
+    ('GET', '/api/email-templates/'),
+    ('GET', '/api/email-templates/{template_name}'),
+    ('POST', '/api/email-templates/'),
+    ('PUT', '/api/email-templates/{template_name}'),
+    ('GET', '/api/analytics/stats/overview'),
+    ('GET', '/api/analytics/runtime'),
+    ('GET', '/api/analytics/logins/history'),
+    ('GET', '/api/analytics/security/telemetry'),
+    ('GET', '/api/analytics/logins/chart'),
+    ('GET', '/api/analytics/requests/chart'),
+    ('GET', '/api/analytics/requests/routes'),
+    ('GET', '/api/analytics/users/list'),
+    ('POST', '/api/analytics/impersonate/end'),
+    ('POST', '/api/analytics/impersonate/{user_id}'),
+    ('GET', '/api/analytics/impersonate/status'),
+    ('GET', '/api/analytics/impersonate/history'),
+    ('GET', '/'),
+    ('GET', '/health'),
+)
+
+
+def match_route_template(compiled, method: str, path: str):
+    """Template of the route that would have served method + path (or whose path matched, for a 405)"""
+    partial = None
+    for route_method, template, regex in compiled:
+        if regex.match(path):
+            if route_method == method:
+                return template
+            if partial is None:
+                partial = template
+    return partial
+
+
+def backfill_route_ids(bind) -> None:
+    """Match existing request_logs paths to route templates and store their route_id"""
+    compiled = [(method, template, compile_path(template)[0]) for method, template in ROUTES]
+    api_routes = sa.table('api_routes', sa.column('id', sa.Integer), sa.column('template', sa.String))
+    request_logs = sa.table('request_logs', sa.column('id', sa.Integer), sa.column('method', sa.String),
+                            sa.column('path', sa.String), sa.column('route_id', sa.Integer))
+
+    op.bulk_insert(api_routes, [{'template': template} for template in sorted({template for _, template in ROUTES})])
+    route_ids = dict(bind.execute(sa.select(api_routes.c.template, api_routes.c.id)).all())
+
+    matched = {}  # (method, path) -> route id; most traffic hits a few hundred distinct paths
+    update = (
+        request_logs.update()
+        .where(request_logs.c.id == sa.bindparam('row_id'))
+        .values(route_id=sa.bindparam('new_route_id'))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(request_logs.c.id, request_logs.c.method, request_logs.c.path)
+            .where(request_logs.c.id > last_id)
+            .order_by(request_logs.c.id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row_id, method, path in rows:
+            key = (method, path)
+            if key not in matched:
+                template = match_route_template(compiled, method, path)
+                matched[key] = route_ids.get(template)
+            if matched[key] is not None:
+                params.append({'row_id': row_id, 'new_route_id': matched[key]})
+        if params:
+            bind.execute(update, params)
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('api_routes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('template', sa.String(length=500), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_api_routes_id'), 'api_routes', ['id'], unique=False)
+    op.create_index(op.f('ix_api_routes_template'), 'api_routes', ['template'], unique=True)
+    op.add_column('request_logs', sa.Column('route_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_request_logs_route_id'), 'request_logs', ['route_id'], unique=False)
+    op.create_foreign_key('fk_request_logs_route_id', 'request_logs', 'api_routes', ['route_id'], ['id'])
+
+    # Outside the migration transaction, so each chunk is committed as it goes instead of holding locks on the whole table
+    with op.get_context().autocommit_block():
+        backfill_route_ids(op.get_bind())
+
+    # Rebuild the request rollup so it is grouped by route template rather than raw path
+    op.execute("DELETE FROM request_log_hourly")
+    op.execute("DELETE FROM rollup_state WHERE name = 'request_logs'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_request_logs_route_id', 'request_logs', type_='foreignkey')
+    op.drop_index(op.f('ix_request_logs_route_id'), table_name='request_logs')
+    op.drop_column('request_logs', 'route_id')
+    op.drop_index(op.f('ix_api_routes_template'), table_name='api_routes')
+    op.drop_index(op.f('ix_api_routes_id'), table_name='api_routes')
+    op.drop_table('api_routes')
+    # Rebuild the request rollup grouped by raw path again
+    op.execute("DELETE FROM request_log_hourly")
+    op.execute("DELETE FROM rollup_state WHERE name = 'request_logs'")
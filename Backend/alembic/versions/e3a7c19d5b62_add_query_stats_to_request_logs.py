@@ -0,0 +1,30 @@
+"""add_query_stats_to_request_logs
+
+Revision ID: e3a7c19d5b62
+Revises: d92f5b6a1c48
+Create Date: 2026-10-17 16:20:13.904127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c19d5b62'
+down_revision: Union[str, Sequence[str], None] = 'd92f5b6a1c48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('request_logs', sa.Column('query_count', sa.Integer(), nullable=True))
+    op.add_column('request_logs', sa.Column('db_time_ms', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('request_logs', 'db_time_ms')
+    op.drop_column('request_logs', 'query_count')
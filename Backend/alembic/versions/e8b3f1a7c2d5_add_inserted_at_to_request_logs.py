@@ -0,0 +1,28 @@
+"""add_inserted_at_to_request_logs
+
+Revision ID: e8b3f1a7c2d5
+Revises: c9d4e7a2f6b1
+Create Date: 2026-10-18 09:26:51.318472
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3f1a7c2d5'
+down_revision: Union[str, Sequence[str], None] = 'c9d4e7a2f6b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('request_logs', sa.Column('inserted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('request_logs', 'inserted_at')
@@ -0,0 +1,32 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: f1b84d20c7e9
+Revises: e3a7c19d5b62
+Create Date: 2026-10-17 17:41:55.218306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b84d20c7e9'
+down_revision: Union[str, Sequence[str], None] = 'e3a7c19d5b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_login_history_user_id_created_at', 'login_history', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_request_logs_user_id_created_at', 'request_logs', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_user_impersonations_super_admin_id_started_at', 'user_impersonations', ['super_admin_id', 'started_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_impersonations_super_admin_id_started_at', table_name='user_impersonations')
+    op.drop_index('ix_request_logs_user_id_created_at', table_name='request_logs')
+    op.drop_index('ix_login_history_user_id_created_at', table_name='login_history')
@@ -0,0 +1,28 @@
+"""add_version_to_integrations
+
+Revision ID: f4c6a2d8b3e7
+Revises: e8b3f1a7c2d5
+Create Date: 2026-10-18 10:04:12.927350
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c6a2d8b3e7'
+down_revision: Union[str, Sequence[str], None] = 'e8b3f1a7c2d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('integrations', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('integrations', 'version')
@@ -12,10 +12,16 @@ load_dotenv()
 # time_cost: number of iterations (2 = recommended minimum)
 # memory_cost: memory in KB (65536 = 64 MB, recommended minimum)
 # parallelism: number of parallel threads (1 = single-threaded)
+# Tune these per deployment with scripts/calibrate_argon2.py; existing hashes
+# are upgraded to the new parameters the next time their owner logs in.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+
 ph = PasswordHasher(
-    time_cost=2,          # 2 iterations
-    memory_cost=65536,    # 64 MB
-    parallelism=1,       # Single-threaded
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
     hash_len=32,         # 32 bytes hash length
     salt_len=16          # 16 bytes salt length
 )
@@ -37,10 +43,6 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     
     try:
         ph.verify(hashed_password, plain_password)
-        # Check if hash needs rehashing (if parameters changed)
-        if ph.check_needs_rehash(hashed_password):
-            # Optionally rehash with new parameters
-            pass
         return True
     except VerifyMismatchError:
         return False
@@ -49,6 +51,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         print(f"Password verification error: {type(e).__name__}")
         return False
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check if a hash was made with different parameters than the current ones"""
+    try:
+        return ph.check_needs_rehash(hashed_password)
+    except Exception:
+        return False
+
 def get_password_hash(password: str) -> str:
     """Hash a password using Argon2"""
     # Argon2 has no password length limit like bcrypt's 72 bytes
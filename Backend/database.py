@@ -1,6 +1,8 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 import os
 from dotenv import load_dotenv
 
@@ -13,18 +15,68 @@ MYSQL_USER = os.getenv("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "")
 MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "atlas_lab_manager")
 
-# Create database URL
-DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+# Create database URL (DATABASE_URL overrides the MySQL settings, e.g. sqlite:///./local.db for local tests)
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+)
+
+# Async drivers for each supported backend
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its async counterpart"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", get_async_database_url(DATABASE_URL))
 
 # Create engine
 engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 
+# Create async engine (used by routers that have been ported to AsyncSession)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+
+class AppSession(Session):
+    """Session class of both session factories below.
+
+    ORM events that keep derived tables in step with writes (entity counters, sample
+    cards) listen on this class rather than on every Session, so sessions created
+    elsewhere (Alembic, tests, other engines) don't trigger them.
+    """
+
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=AppSession, autocommit=False, autoflush=False, bind=engine)
+
+# Create AsyncSessionLocal class
+# expire_on_commit is disabled because expired attributes cannot be lazy loaded on the event loop
+# Its sessions run on an AppSession underneath, so the same events fire for them
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False, sync_session_class=AppSession
+)
 
 # Create Base class for models
 Base = declarative_base()
 
+def get_connection_pool_stats() -> dict:
+    """Checked-out / idle connection counts for the sync and async engines' pools"""
+    stats = {}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.pool)):
+        pool_stats = {}
+        # QueuePool (MySQL) exposes all of these; SQLite's pools only some
+        for stat in ("size", "checkedout", "checkedin", "overflow"):
+            method = getattr(pool, stat, None)
+            if method is not None:
+                pool_stats[stat] = method()
+        stats[name] = pool_stats
+    return stats
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
@@ -33,3 +85,7 @@ def get_db():
     finally:
         db.close()
 
+# Dependency to get async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
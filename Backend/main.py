@@ -1,4 +1,8 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import os
+import secrets
+from fastapi import FastAPI, Request, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from routes import auth_router, users_router
@@ -12,13 +16,63 @@ from routes.reports import router as reports_router
 from routes.settings import router as settings_router
 from routes.organization import router as organization_router
 from routes.email_templates import router as email_templates_router
-from routes.analytics import router as analytics_router
+from routes.analytics import router as analytics_router, collect_runtime_stats
 from middleware.logging_middleware import LoggingMiddleware
+from services.blocking_pool import shutdown_pools
+from services.request_log_writer import request_log_writer
+from services.turnstile import turnstile_verifier
+from services.rollups import rollup_worker
+from services.log_retention import retention_worker
+from services.request_log_window import request_log_window
+from services.security_telemetry import security_telemetry
+from services.login_throttle import login_throttle
+from services.entity_counters import seed_entity_counters
+from services.sample_cards import seed_sample_cards
+from services.metrics import render_prometheus, flatten_metrics
+from services.route_registry import route_registry, get_route_templates
+from database import AsyncSessionLocal
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        async with AsyncSessionLocal() as db:
+            await route_registry.sync(db, get_route_templates(app.routes))
+    except Exception as e:
+        # Requests are still logged, just without a route_id
+        print(f"Failed to sync API routes: {e}")
+    try:
+        async with AsyncSessionLocal() as db:
+            await seed_entity_counters(db)
+    except Exception as e:
+        # The overview counts the tables directly until the counters exist
+        print(f"Failed to seed entity counters: {e}")
+    try:
+        async with AsyncSessionLocal() as db:
+            await seed_sample_cards(db)
+    except Exception as e:
+        # Another worker may be building them; scripts/rebuild_sample_cards.py can always regenerate them
+        print(f"Failed to build sample cards: {e}")
+    request_log_writer.start()
+    rollup_worker.start()
+    retention_worker.start()
+    request_log_window.warm()
+    security_telemetry.start()
+    await login_throttle.start()
+    yield
+    await login_throttle.stop()
+    await security_telemetry.stop()
+    await retention_worker.stop()
+    await rollup_worker.stop()
+    # Drain queued request logs and let in-flight blocking work finish before the worker exits
+    await request_log_writer.stop()
+    await turnstile_verifier.close()
+    shutdown_pools()
 
 app = FastAPI(
     title="Atlas Lab Manager API",
     description="Laboratory Management System API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -59,6 +113,19 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# Bearer token the scraper sends to /metrics; the endpoint is disabled until it is set
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """Prometheus text-format metrics for this worker process (each worker keeps its own)"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled (METRICS_TOKEN is not set)")
+    authorization = request.headers.get("authorization", "")
+    if not secrets.compare_digest(authorization, f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return render_prometheus(flatten_metrics(collect_runtime_stats()))
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
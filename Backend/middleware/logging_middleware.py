@@ -1,61 +1,63 @@
 import time
-from fastapi import Request, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-from sqlalchemy.orm import Session
-from database import SessionLocal
-from models.request_log import RequestLog, HTTPMethod
+from datetime import datetime, timezone
+from fastapi import status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from models.request_log import HTTPMethod
+from services.request_log_writer import request_log_writer
+from services.log_sampling import log_sampler
+from services.route_registry import route_registry, UNMATCHED_ROUTE
+from services.metrics import get_labeled_histogram
+from services.query_stats import current_query_stats, RequestQueryStats, n_plus_one_tracker
+from services.client_ip import client_ip
 import traceback
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        # Get user info if authenticated (will be set by auth dependency)
-        user_id = None
-        # Try to get user from token if available
-        try:
-            from fastapi.security import OAuth2PasswordBearer
-            from routes.auth import get_current_user
-            from database import SessionLocal
-            auth_header = request.headers.get("authorization")
-            if auth_header and auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-                db = SessionLocal()
-                try:
-                    from routes.auth import decode_access_token
-                    from models.user import User
-                    payload = decode_access_token(token)
-                    if payload:
-                        email = payload.get("sub")
-                        if email:
-                            user = db.query(User).filter(User.email == email).first()
-                            if user:
-                                user_id = user.id
-                except Exception:
-                    pass
-                finally:
-                    db.close()
-        except Exception:
-            pass
-        
-        # Get IP address
-        ip_address = request.client.host if request.client else None
-        if "x-forwarded-for" in request.headers:
-            ip_address = request.headers["x-forwarded-for"].split(",")[0].strip()
-        
-        # Get user agent
-        user_agent = request.headers.get("user-agent", None)
-        
-        # Process request
+# Paths that are never logged (health checks, static files, API docs)
+SKIPPED_PATH_PREFIXES = ("/health", "/metrics", "/uploads", "/docs", "/openapi.json")
+
+# Live latency per route template and status class, exported at /metrics
+request_latency = get_labeled_histogram(
+    "http_request_duration_ms", "HTTP request latency in milliseconds", ("route", "status_class")
+)
+
+class LoggingMiddleware:
+    """Raw ASGI middleware that records one RequestLog row per API request.
+
+    Status and timing are captured by wrapping `send`, so response bodies
+    (including streamed PDFs) pass through untouched and unbuffered.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(SKIPPED_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        # Rows are written in batches, so record when the request arrived rather than when it is inserted
+        request_received_at = datetime.now(timezone.utc)
+        first_byte_time = None
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR  # Until the app starts a response
         error_message = None
-        status_code = 200
+        # SQL run while handling this request, counted by the engine event hooks
+        query_stats = RequestQueryStats()
+        query_stats_token = current_query_stats.set(query_stats)
+
+        async def send_wrapper(message: Message):
+            nonlocal first_byte_time, status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                first_byte_time = time.perf_counter()
+                # Queries run before the response started; streamed bodies may run more afterwards
+                MutableHeaders(scope=message).append("Server-Timing", query_stats.server_timing())
+            await send(message)
+
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-        except Exception as e:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
             status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
-            error_message = str(e)
             traceback_str = traceback.format_exc()
             # Log full traceback for 500 errors
             if len(traceback_str) > 1000:
@@ -64,43 +66,65 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 error_message = traceback_str
             raise
         finally:
-            # Calculate response time
-            response_time_ms = int((time.time() - start_time) * 1000)
-            
-            # Log the request (skip health checks and static files)
-            path = request.url.path
-            if not path.startswith("/health") and not path.startswith("/uploads") and not path.startswith("/docs") and not path.startswith("/openapi.json"):
-                try:
-                    db: Session = SessionLocal()
-                    try:
-                        # Map HTTP method
-                        method_str = request.method.upper()
-                        try:
-                            method = HTTPMethod(method_str)
-                        except ValueError:
-                            method = HTTPMethod.GET  # Default fallback
-                        
-                        log_entry = RequestLog(
-                            user_id=user_id,
-                            method=method,
-                            path=path,
-                            status_code=status_code,
-                            ip_address=ip_address,
-                            user_agent=user_agent,
-                            response_time_ms=response_time_ms,
-                            error_message=error_message if status_code >= 500 else None
-                        )
-                        db.add(log_entry)
-                        db.commit()
-                    except Exception as e:
-                        db.rollback()
-                        # Don't fail the request if logging fails
-                        print(f"Failed to log request: {e}")
-                    finally:
-                        db.close()
-                except Exception as e:
-                    # Don't fail the request if logging fails
-                    print(f"Failed to create database session for logging: {e}")
-        
-        return response
+            current_query_stats.reset(query_stats_token)
+            # Calculate response times
+            end_time = time.perf_counter()
+            response_time_ms = int((end_time - start_time) * 1000)
+            ttfb_ms = int((first_byte_time - start_time) * 1000) if first_byte_time else None
+
+            route = scope.get("route")
+            route_template = route.path if route is not None else UNMATCHED_ROUTE
+            request_latency.labels(route_template, f"{status_code // 100}xx").observe((end_time - start_time) * 1000)
+
+            repeated = query_stats.repeated_statements()
+            if repeated:
+                n_plus_one_tracker.record(route_template, repeated)
+
+            # Latency and N+1 tracking above see every request; only the sampled ones get a row
+            sample_weight = log_sampler.sample_weight(scope["method"], scope["path"], status_code)
+            if sample_weight:
+                await request_log_writer.enqueue(self.build_row(
+                    scope, status_code, response_time_ms, ttfb_ms, error_message, request_received_at,
+                    query_stats, sample_weight,
+                ))
+
+    @staticmethod
+    def build_row(scope: Scope, status_code: int, response_time_ms: int, ttfb_ms, error_message, received_at,
+                  query_stats: RequestQueryStats = None, sample_weight: int = 1) -> dict:
+        """Build the RequestLog column values for a finished request"""
+        headers = Headers(scope=scope)
+
+        # Get IP address
+        client = scope.get("client")
+        ip_address = client_ip(client[0] if client else None, headers.get("x-forwarded-for"))
+
+        # Map HTTP method
+        try:
+            method = HTTPMethod(scope["method"].upper())
+        except ValueError:
+            method = HTTPMethod.GET  # Default fallback
+
+        # Identity resolved by the auth dependency via request.state (None for unauthenticated requests)
+        state = scope.get("state") or {}
+
+        # The router leaves the matched route in the scope; its template groups /api/samples/1 with /api/samples/2
+        route = scope.get("route")
+        route_id = route_registry.get_id(route.path) if route is not None else None
 
+        return {
+            "user_id": state.get("user_id"),
+            "impersonation_id": state.get("impersonation_id"),
+            "method": method,
+            "path": scope["path"],
+            "route_id": route_id,
+            "status_code": status_code,
+            "ip_address": ip_address,
+            "user_agent": headers.get("user-agent"),
+            "response_time_ms": response_time_ms,
+            "ttfb_ms": ttfb_ms,
+            "query_count": query_stats.count if query_stats is not None else None,
+            "db_time_ms": round(query_stats.total_ms) if query_stats is not None else None,
+            "sample_weight": sample_weight,
+            "error_message": error_message if status_code >= 500 else None,
+            "created_at": received_at,
+        }
@@ -12,13 +12,18 @@ from .sample_activity import SampleActivity
 from .result_entry import ResultEntry, ResultValue
 from .report import Report, ReportStatus
 from .login_history import LoginHistory
+from .api_route import ApiRoute
 from .request_log import RequestLog, HTTPMethod
 from .user_impersonation import UserImpersonation
+from .analytics_rollup import RequestLogHourly, LoginHistoryHourly, RollupState
+from .entity_counter import EntityCounter
+from .sample_card import SampleCard
 
 __all__ = [
     "User", "UserType", "Customer", "Organization", "Integration",
     "EmailTemplate", "Project", "Department", "TestType", "SampleType",
     "Sample", "sample_departments", "sample_tests", "SampleActivity",
     "ResultEntry", "ResultValue", "Report", "ReportStatus",
-    "LoginHistory", "RequestLog", "HTTPMethod", "UserImpersonation"
+    "LoginHistory", "ApiRoute", "RequestLog", "HTTPMethod", "UserImpersonation",
+    "RequestLogHourly", "LoginHistoryHourly", "RollupState", "EntityCounter", "SampleCard"
 ]
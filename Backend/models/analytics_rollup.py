@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Boolean, UniqueConstraint, Enum as SQLEnum
+from sqlalchemy.sql import func
+from database import Base
+from models.request_log import HTTPMethod
+
+class RequestLogHourly(Base):
+    """Per-hour request counts and latency, rolled up from request_logs"""
+    __tablename__ = "request_log_hourly"
+    __table_args__ = (
+        UniqueConstraint("hour", "route", "method", "status_code", name="uq_request_log_hourly_bucket"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    hour = Column(DateTime, nullable=False, index=True)  # Start of the hour (UTC)
+    route = Column(String(500), nullable=False, index=True)
+    method = Column(SQLEnum(HTTPMethod), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    request_count = Column(Integer, nullable=False, default=0)
+    total_response_time_ms = Column(BigInteger, nullable=False, default=0)
+    max_response_time_ms = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<RequestLogHourly {self.hour} {self.method} {self.route} {self.status_code}: {self.request_count}>"
+
+class LoginHistoryHourly(Base):
+    """Per-hour login attempt counts, rolled up from login_history"""
+    __tablename__ = "login_history_hourly"
+    __table_args__ = (
+        UniqueConstraint("hour", "success", name="uq_login_history_hourly_bucket"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    hour = Column(DateTime, nullable=False, index=True)  # Start of the hour (UTC)
+    success = Column(Boolean, nullable=False)
+    attempt_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<LoginHistoryHourly {self.hour} success={self.success}: {self.attempt_count}>"
+
+class RollupState(Base):
+    """High-water mark of the last source row folded into a rollup table"""
+    __tablename__ = "rollup_state"
+    
+    name = Column(String(100), primary_key=True)  # Source table name
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<RollupState {self.name} last_id={self.last_id}>"
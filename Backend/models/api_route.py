@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+class ApiRoute(Base):
+    """Lookup table of FastAPI route templates, so request logs can store a small route id"""
+    __tablename__ = "api_routes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    template = Column(String(500), unique=True, nullable=False, index=True)  # e.g. /api/samples/{sample_id}/details
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<ApiRoute {self.id} {self.template}>"
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+class EntityCounter(Base):
+    """Row count of a business table, kept up to date by ORM flush events (see services.entity_counters)"""
+    __tablename__ = "entity_counters"
+    
+    name = Column(String(100), primary_key=True)  # Table name
+    count = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<EntityCounter {self.name}={self.count}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, literal_column
 from sqlalchemy.sql import func
 from database import Base
 
@@ -11,6 +11,9 @@ class Integration(Base):
     config = Column(Text)  # JSON string for configuration
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Bumped in the UPDATE itself on every change, so services.integration_registry can spot
+    # two changes within the same second (updated_at has one-second resolution on MySQL)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version") + 1)
     
     def __repr__(self):
         return f"<Integration {self.name} ({self.id})>"
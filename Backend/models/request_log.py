@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -15,20 +15,32 @@ class HTTPMethod(str, enum.Enum):
 
 class RequestLog(Base):
     __tablename__ = "request_logs"
+    __table_args__ = (
+        # Newest-first keyset pagination per user
+        Index("ix_request_logs_user_id_created_at", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # Nullable for unauthenticated requests
+    impersonation_id = Column(Integer, ForeignKey("user_impersonations.id"), nullable=True, index=True)  # Set when a super admin acts as user_id
     method = Column(SQLEnum(HTTPMethod), nullable=False, index=True)
     path = Column(String(500), nullable=False, index=True)
+    route_id = Column(Integer, ForeignKey("api_routes.id"), nullable=True, index=True)  # Matched route template (None if no route matched)
     status_code = Column(Integer, nullable=False, index=True)
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(Text, nullable=True)
     response_time_ms = Column(Integer, nullable=True)  # Response time in milliseconds
+    ttfb_ms = Column(Integer, nullable=True)  # Time until the response headers were sent, in milliseconds
+    query_count = Column(Integer, nullable=True)  # SQL statements executed while handling the request
+    db_time_ms = Column(Integer, nullable=True)  # Time spent in those statements, in milliseconds
+    sample_weight = Column(Integer, nullable=False, default=1, server_default="1")  # Requests this row stands for (N when 1 in N is logged)
     error_message = Column(Text, nullable=True)  # For 500 errors
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)  # When the request arrived
+    inserted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # When the (batched) row was written
     
     # Relationships
     user = relationship("User", foreign_keys=[user_id], backref="request_logs")
+    route = relationship("ApiRoute")
     
     def __repr__(self):
         return f"<RequestLog {self.method} {self.path} {self.status_code}>"
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean
+from database import Base
+
+class SampleCard(Base):
+    """What the sample list and search show for one sample, flattened into a single row.
+
+    Read model kept up to date by ORM flush events (see services.sample_cards);
+    scripts/rebuild_sample_cards.py regenerates it.
+    """
+    __tablename__ = "sample_cards"
+
+    id = Column(Integer, ForeignKey("samples.id", ondelete="CASCADE"), primary_key=True)  # samples.id
+    sample_code = Column(String(10), nullable=False, index=True)  # samples.sample_id
+    customer_id = Column(Integer, nullable=False, index=True)
+    project_id = Column(Integer, nullable=True, index=True)
+    sample_type_id = Column(Integer, nullable=False, index=True)
+
+    # Sample details
+    name = Column(String(255), nullable=False)
+    volume = Column(String(100))
+    conditions = Column(Text)
+    notes = Column(Text)
+    is_batch = Column(Boolean, nullable=False)
+    batch_size = Column(Integer, nullable=True)
+    status = Column(String(50))
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Related data
+    customer_code = Column(String(5))  # customers.customer_id
+    customer_name = Column(String(255))
+    customer_email = Column(String(255))
+    customer_phone = Column(String(50))
+    customer_company = Column(String(255))
+    project_name = Column(String(255))
+    sample_type_name = Column(String(255))
+    department_names = Column(Text, nullable=False)  # JSON list
+    test_type_names = Column(Text, nullable=False)  # JSON list
+
+    # Upper-cased searchable fields, one per line, matched with a single LIKE
+    search_text = Column(Text, nullable=False)
+
+    def __repr__(self):
+        return f"<SampleCard {self.sample_code}>"
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text, String
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text, String, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 
 class UserImpersonation(Base):
     __tablename__ = "user_impersonations"
+    __table_args__ = (
+        # Newest-first keyset pagination per super admin
+        Index("ix_user_impersonations_super_admin_id_started_at", "super_admin_id", "started_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     super_admin_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # Super admin doing the impersonation
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case, and_, or_
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel
-from database import get_db
+from database import get_async_db, AsyncSessionLocal, get_connection_pool_stats
 from models.user import User, UserType
 from models.login_history import LoginHistory
 from models.request_log import RequestLog, HTTPMethod
+from models.api_route import ApiRoute
 from models.user_impersonation import UserImpersonation
 from models.customer import Customer
 from models.sample import Sample
@@ -16,7 +18,29 @@ from models.result_entry import ResultEntry
 from models.report import Report
 from routes.auth import get_current_user
 from routes.settings import require_lab_admin_or_manager
+from services.blocking_pool import get_pool_stats
+from services.request_log_writer import request_log_writer
+from services.user_cache import user_cache
+from services.password_hashing import get_password_hashing_stats
+from services.turnstile import turnstile_verifier
+from services.integration_registry import integration_registry
+from services.snapshot_cache import SnapshotCache
+from services.rollups import rolled_up_totals, rollup_worker, hour_expression, REQUEST_LOG_ROLLUP, LOGIN_HISTORY_ROLLUP
+from services.route_registry import route_registry, UNMATCHED_ROUTE
+from services.query_stats import n_plus_one_tracker
+from services.log_sampling import log_sampler
+from services.log_retention import retention_worker
+from services.request_log_window import request_log_window
+from services.security_telemetry import security_telemetry
+from services.login_throttle import login_throttle
+from services.entity_counters import get_entity_counts
+from services.loader_profiles import LOGIN_HISTORY_LIST, REQUEST_LOG_LIST, IMPERSONATION_LIST
+from services.pagination import keyset_page, count_total
+from services.export import ExportFormat, stream_export, export_headers
+from services.time_buckets import Granularity, TimeBucketer, get_organization_timezone, zero_filled_series
+from middleware.logging_middleware import request_latency
 import json
+import os
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
@@ -29,152 +53,206 @@ def require_super_admin(current_user: User = Depends(get_current_user)) -> User:
         )
     return current_user
 
-@router.get("/stats/overview")
-async def get_overview_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_super_admin)
-):
-    """Get overview statistics"""
+# Overview stats still grow with table size, so they're served from a snapshot
+OVERVIEW_STATS_TTL_SECONDS = float(os.getenv("OVERVIEW_STATS_TTL_SECONDS", "30"))
+OVERVIEW_STATS_MAX_STALE_SECONDS = float(os.getenv("OVERVIEW_STATS_MAX_STALE_SECONDS", "600"))
+
+def count_if(*criteria):
+    """Conditional count aggregate: SUM(CASE WHEN <criteria> THEN 1 ELSE 0 END)"""
+    return func.coalesce(func.sum(case((and_(*criteria), 1), else_=0)), 0)
+
+def weighted_count_if(weight, *criteria):
+    """Like count_if, but each matching row counts as `weight` (sampled request logs)"""
+    return func.coalesce(func.sum(case((and_(*criteria), weight), else_=0)), 0)
+
+# Start of the rollup range when asking for all-time totals
+ALL_TIME = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+async def compute_overview_stats(db: AsyncSession) -> dict:
+    """Overview statistics in a handful of queries instead of one COUNT per figure.
+
+    All-time totals come from the hourly rollups, which keep counting rows after
+    the retention job has deleted them and weight sampled request logs; the
+    last-24h figures come from one conditional-aggregate pass over the
+    created_at index range, and business record counts from entity_counters.
+    """
     now = datetime.now(timezone.utc)
     last_24h = now - timedelta(hours=24)
-    last_7d = now - timedelta(days=7)
-    last_30d = now - timedelta(days=30)
     
     # User stats
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active == True).count()
-    users_by_type = db.query(
-        User.user_type,
-        func.count(User.id).label('count')
-    ).group_by(User.user_type).all()
+    users = (await db.execute(
+        select(
+            func.count(User.id),
+            count_if(User.is_active == True),
+            *[count_if(User.user_type == user_type) for user_type in UserType],
+        )
+    )).one()
+    total_users, active_users, *type_counts = users
+    users_by_type = {
+        user_type.value: count for user_type, count in zip(UserType, type_counts) if count
+    }
     
     # Login stats
-    total_logins = db.query(LoginHistory).filter(LoginHistory.success == True).count()
-    failed_logins = db.query(LoginHistory).filter(LoginHistory.success == False).count()
-    logins_24h = db.query(LoginHistory).filter(
-        and_(LoginHistory.success == True, LoginHistory.created_at >= last_24h)
-    ).count()
-    failed_logins_24h = db.query(LoginHistory).filter(
-        and_(LoginHistory.success == False, LoginHistory.created_at >= last_24h)
-    ).count()
-    
-    # Request stats
-    total_requests = db.query(RequestLog).count()
-    requests_24h = db.query(RequestLog).filter(RequestLog.created_at >= last_24h).count()
-    
-    # Error stats
-    error_500 = db.query(RequestLog).filter(RequestLog.status_code == 500).count()
-    error_500_24h = db.query(RequestLog).filter(
-        and_(RequestLog.status_code == 500, RequestLog.created_at >= last_24h)
-    ).count()
-    
-    error_401 = db.query(RequestLog).filter(RequestLog.status_code == 401).count()
-    error_401_24h = db.query(RequestLog).filter(
-        and_(RequestLog.status_code == 401, RequestLog.created_at >= last_24h)
-    ).count()
-    
-    error_403 = db.query(RequestLog).filter(RequestLog.status_code == 403).count()
-    error_403_24h = db.query(RequestLog).filter(
-        and_(RequestLog.status_code == 403, RequestLog.created_at >= last_24h)
-    ).count()
-    
-    error_404 = db.query(RequestLog).filter(RequestLog.status_code == 404).count()
-    error_404_24h = db.query(RequestLog).filter(
-        and_(RequestLog.status_code == 404, RequestLog.created_at >= last_24h)
-    ).count()
-    
-    # Business stats
-    total_customers = db.query(Customer).count()
-    total_samples = db.query(Sample).count()
-    total_projects = db.query(Project).count()
-    total_result_entries = db.query(ResultEntry).count()
-    total_reports = db.query(Report).count()
+    logins_by_success = {
+        key[0]: measures["attempt_count"]
+        for key, measures in (await rolled_up_totals(db, LOGIN_HISTORY_ROLLUP, ALL_TIME, ("success",))).items()
+    }
+    logins_24h = (await db.execute(
+        select(
+            count_if(LoginHistory.success == True),
+            count_if(LoginHistory.success == False),
+        ).where(LoginHistory.created_at >= last_24h)
+    )).one()
+    
+    # Request and error stats
+    error_codes = (500, 401, 403, 404)
+    requests_by_status = {
+        key[0]: measures["request_count"]
+        for key, measures in (await rolled_up_totals(db, REQUEST_LOG_ROLLUP, ALL_TIME, ("status_code",))).items()
+    }
+    requests_24h, *errors_24h = (await db.execute(
+        select(
+            func.coalesce(func.sum(RequestLog.sample_weight), 0),
+            *[weighted_count_if(RequestLog.sample_weight, RequestLog.status_code == code) for code in error_codes],
+        ).where(RequestLog.created_at >= last_24h)
+    )).one()
+    errors = {
+        code: (requests_by_status.get(code, 0), count_24h)
+        for code, count_24h in zip(error_codes, errors_24h)
+    }
+    
+    # Business stats, from the counters maintained on every insert/delete (no table scans)
+    business = await get_entity_counts(db)
     
     return {
         "users": {
             "total": total_users,
             "active": active_users,
-            "by_type": {ut.value: count for ut, count in users_by_type}
+            "by_type": users_by_type
         },
         "logins": {
-            "total_successful": total_logins,
-            "total_failed": failed_logins,
-            "successful_24h": logins_24h,
-            "failed_24h": failed_logins_24h
+            "total_successful": logins_by_success.get(True, 0),
+            "total_failed": logins_by_success.get(False, 0),
+            "successful_24h": logins_24h[0],
+            "failed_24h": logins_24h[1]
         },
         "requests": {
-            "total": total_requests,
+            "total": sum(requests_by_status.values()),
             "last_24h": requests_24h
         },
         "errors": {
             "500_internal_server_error": {
-                "total": error_500,
-                "last_24h": error_500_24h
+                "total": errors[500][0],
+                "last_24h": errors[500][1]
             },
             "401_unauthorized": {
-                "total": error_401,
-                "last_24h": error_401_24h
+                "total": errors[401][0],
+                "last_24h": errors[401][1]
             },
             "403_forbidden": {
-                "total": error_403,
-                "last_24h": error_403_24h
+                "total": errors[403][0],
+                "last_24h": errors[403][1]
             },
             "404_not_found": {
-                "total": error_404,
-                "last_24h": error_404_24h
+                "total": errors[404][0],
+                "last_24h": errors[404][1]
             }
         },
         "business": {
-            "customers": total_customers,
-            "samples": total_samples,
-            "projects": total_projects,
-            "result_entries": total_result_entries,
-            "reports": total_reports
+            "customers": business["customers"],
+            "samples": business["samples"],
+            "projects": business["projects"],
+            "result_entries": business["result_entries"],
+            "reports": business["reports"]
         }
     }
 
+async def load_overview_stats() -> dict:
+    async with AsyncSessionLocal() as db:
+        return await compute_overview_stats(db)
+
+overview_stats_cache = SnapshotCache(
+    "overview_stats", load_overview_stats,
+    ttl=OVERVIEW_STATS_TTL_SECONDS, max_stale=OVERVIEW_STATS_MAX_STALE_SECONDS,
+)
+
+@router.get("/stats/overview")
+async def get_overview_stats(current_user: User = Depends(require_super_admin)):
+    """Get overview statistics (cached for OVERVIEW_STATS_TTL_SECONDS, refreshed in the background)"""
+    return await overview_stats_cache.get()
+
+def collect_runtime_stats() -> dict:
+    """In-process runtime statistics for this worker (thread pools, queues, caches)"""
+    return {
+        "db_connection_pools": get_connection_pool_stats(),
+        "blocking_pools": get_pool_stats(),
+        "request_log_writer": request_log_writer.stats(),
+        "user_cache": user_cache.stats(),
+        "password_hashing": get_password_hashing_stats(),
+        "turnstile": turnstile_verifier.stats(),
+        "integration_registry": integration_registry.stats(),
+        "overview_stats_cache": overview_stats_cache.stats(),
+        "rollups": rollup_worker.stats(),
+        "request_log_sampling": log_sampler.stats(),
+        "log_retention": retention_worker.stats(),
+        "request_log_window": request_log_window.stats(),
+        "security_telemetry": security_telemetry.stats(),
+        "login_throttle": login_throttle.stats(),
+        "route_registry": route_registry.stats(),
+        "n_plus_one": n_plus_one_tracker.stats(),
+    }
+
+@router.get("/runtime")
+async def get_runtime_stats(current_user: User = Depends(require_super_admin)):
+    """Get in-process runtime statistics for this worker (thread pools, queues, caches)"""
+    return {**collect_runtime_stats(), "request_latency": request_latency.stats()}
+
 @router.get("/logins/history")
 async def get_login_history(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(100, ge=1, le=1000),
+    exact_total: bool = Query(False, description="Count every matching row instead of estimating"),
     success_only: bool = Query(False),
     failed_only: bool = Query(False),
     user_id: Optional[int] = Query(None),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_super_admin)
 ):
     """Get login history with filters"""
-    query = db.query(LoginHistory)
+    query = select(LoginHistory)
     
     if success_only:
-        query = query.filter(LoginHistory.success == True)
+        query = query.where(LoginHistory.success == True)
     elif failed_only:
-        query = query.filter(LoginHistory.success == False)
+        query = query.where(LoginHistory.success == False)
     
     if user_id:
-        query = query.filter(LoginHistory.user_id == user_id)
+        query = query.where(LoginHistory.user_id == user_id)
     
     if start_date:
         try:
             start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            query = query.filter(LoginHistory.created_at >= start_dt)
+            query = query.where(LoginHistory.created_at >= start_dt)
         except ValueError:
             pass
     
     if end_date:
         try:
             end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            query = query.filter(LoginHistory.created_at <= end_dt)
+            query = query.where(LoginHistory.created_at <= end_dt)
         except ValueError:
             pass
     
-    total = query.count()
-    logins = query.order_by(LoginHistory.created_at.desc()).offset(skip).limit(limit).all()
+    totals = await count_total(db, query, exact_total)
+    logins, next_cursor = await keyset_page(
+        db, LOGIN_HISTORY_LIST.apply(query), LoginHistory.created_at, LoginHistory.id, cursor, limit
+    )
     
     return {
-        "total": total,
+        **totals,
+        "next_cursor": next_cursor,
         "items": [
             {
                 "id": login.id,
@@ -194,210 +272,422 @@ async def get_login_history(
 @router.get("/security/telemetry")
 async def get_security_telemetry(
     days: int = Query(7, ge=1, le=90),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_super_admin)
 ):
-    """Get security telemetry data"""
-    now = datetime.now(timezone.utc)
-    start_date = now - timedelta(days=days)
-    
-    # Failed logins
-    failed_logins = db.query(LoginHistory).filter(
-        and_(
-            LoginHistory.success == False,
-            LoginHistory.created_at >= start_date
-        )
-    ).order_by(LoginHistory.created_at.desc()).all()
+    """Get security telemetry data.
+
+    Failed logins and error requests come from the incrementally maintained
+    security telemetry store (refreshed in the background, so this only reads
+    it), and the status code breakdown from the hourly rollups, so no raw rows
+    are scanned here.
+    """
+    start_date = datetime.now(timezone.utc) - timedelta(days=days)
     
     # Status code breakdown
-    status_codes = db.query(
-        RequestLog.status_code,
-        func.count(RequestLog.id).label('count')
-    ).filter(
-        RequestLog.created_at >= start_date
-    ).group_by(RequestLog.status_code).all()
-    
-    # Error requests (4xx and 5xx)
-    error_requests = db.query(RequestLog).filter(
-        and_(
-            RequestLog.status_code >= 400,
-            RequestLog.created_at >= start_date
-        )
-    ).order_by(RequestLog.created_at.desc()).limit(100).all()
-    
-    # Failed logins by reason
-    failed_by_reason = db.query(
-        LoginHistory.failure_reason,
-        func.count(LoginHistory.id).label('count')
-    ).filter(
-        and_(
-            LoginHistory.success == False,
-            LoginHistory.created_at >= start_date
-        )
-    ).group_by(LoginHistory.failure_reason).all()
-    
-    # Failed logins by IP
-    failed_by_ip = db.query(
-        LoginHistory.ip_address,
-        func.count(LoginHistory.id).label('count')
-    ).filter(
-        and_(
-            LoginHistory.success == False,
-            LoginHistory.created_at >= start_date,
-            LoginHistory.ip_address.isnot(None)
-        )
-    ).group_by(LoginHistory.ip_address).order_by(func.count(LoginHistory.id).desc()).limit(20).all()
+    status_totals = await rolled_up_totals(db, REQUEST_LOG_ROLLUP, start_date, ("status_code",))
+    status_codes = sorted((code, measures["request_count"]) for (code,), measures in status_totals.items())
     
     return {
         "period_days": days,
-        "failed_logins": {
-            "total": len(failed_logins),
-            "by_reason": {reason or "Unknown": count for reason, count in failed_by_reason},
-            "by_ip": {ip: count for ip, count in failed_by_ip},
-            "recent": [
-                {
-                    "id": login.id,
-                    "email": login.email,
-                    "ip_address": login.ip_address,
-                    "failure_reason": login.failure_reason,
-                    "user_agent": login.user_agent,
-                    "created_at": login.created_at.isoformat() if login.created_at else None
-                }
-                for login in failed_logins[:50]
-            ]
-        },
+        "failed_logins": security_telemetry.failed_logins(start_date),
         "status_codes": {str(code): count for code, count in status_codes},
-        "error_requests": [
-            {
-                "id": req.id,
-                "method": req.method.value,
-                "path": req.path,
-                "status_code": req.status_code,
-                "user_id": req.user_id,
-                "ip_address": req.ip_address,
-                "error_message": req.error_message,
-                "created_at": req.created_at.isoformat() if req.created_at else None
-            }
-            for req in error_requests
-        ]
+        "error_requests": security_telemetry.error_requests(start_date)
     }
 
+async def chart_buckets(db: AsyncSession, days: int, granularity: Granularity) -> tuple:
+    """Bucketer in the organization's time zone and the bucket starts covering the last `days` days"""
+    bucketer = TimeBucketer(await get_organization_timezone(db), granularity)
+    now = datetime.now(timezone.utc)
+    return bucketer, bucketer.buckets_since(now - timedelta(days=days), now)
+
 @router.get("/logins/chart")
 async def get_login_chart_data(
     days: int = Query(7, ge=1, le=90),
-    db: Session = Depends(get_db),
+    granularity: Granularity = Query(Granularity.DAY),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_super_admin)
 ):
-    """Get login data for charting (grouped by day)"""
-    now = datetime.now(timezone.utc)
-    start_date = now - timedelta(days=days)
-    
-    # Group successful logins by day
-    successful_by_day = db.query(
-        func.date(LoginHistory.created_at).label('date'),
-        func.count(LoginHistory.id).label('count')
-    ).filter(
-        and_(
-            LoginHistory.success == True,
-            LoginHistory.created_at >= start_date
-        )
-    ).group_by(func.date(LoginHistory.created_at)).all()
-    
-    # Group failed logins by day
-    failed_by_day = db.query(
-        func.date(LoginHistory.created_at).label('date'),
-        func.count(LoginHistory.id).label('count')
-    ).filter(
-        and_(
-            LoginHistory.success == False,
-            LoginHistory.created_at >= start_date
-        )
-    ).group_by(func.date(LoginHistory.created_at)).all()
+    """Get login data for charting (grouped by hour, day, week or month in the organization's time zone)"""
+    bucketer, buckets = await chart_buckets(db, days, granularity)
     
-    # Create date range
-    date_map = {}
-    for i in range(days):
-        date = (now - timedelta(days=i)).date()
-        date_map[date] = {"successful": 0, "failed": 0}
+    # Hourly rollups (plus rows not yet rolled up) instead of grouping raw rows
+    totals = await rolled_up_totals(db, LOGIN_HISTORY_ROLLUP, buckets[0], ("hour", "success"))
+    series = zero_filled_series(bucketer, buckets, (
+        (hour, "successful" if success else "failed", measures["attempt_count"])
+        for (hour, success), measures in totals.items()
+    ))
     
-    # Fill in data
-    for date, count in successful_by_day:
-        if date in date_map:
-            date_map[date]["successful"] = count
-    
-    for date, count in failed_by_day:
-        if date in date_map:
-            date_map[date]["failed"] = count
-    
-    # Convert to list sorted by date
-    chart_data = [
+    return [
         {
-            "date": str(date),
-            "successful": data["successful"],
-            "failed": data["failed"]
+            "date": bucketer.label(start),
+            "start": start.isoformat(),
+            "successful": counts.get("successful", 0),
+            "failed": counts.get("failed", 0)
         }
-        for date, data in sorted(date_map.items())
+        for start, counts in series
     ]
-    
-    return chart_data
 
 @router.get("/requests/chart")
 async def get_requests_chart_data(
     days: int = Query(7, ge=1, le=90),
-    db: Session = Depends(get_db),
+    granularity: Granularity = Query(Granularity.DAY),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_super_admin)
 ):
-    """Get request data for charting (grouped by day and status code)"""
-    now = datetime.now(timezone.utc)
-    start_date = now - timedelta(days=days)
-    
-    # Group by day and status code
-    requests_by_day_status = db.query(
-        func.date(RequestLog.created_at).label('date'),
-        RequestLog.status_code,
-        func.count(RequestLog.id).label('count')
-    ).filter(
-        RequestLog.created_at >= start_date
-    ).group_by(
-        func.date(RequestLog.created_at),
-        RequestLog.status_code
-    ).all()
-    
-    # Create date range
-    date_map = {}
-    for i in range(days):
-        date = (now - timedelta(days=i)).date()
-        date_map[date] = {}
-    
-    # Fill in data
-    for date, status_code, count in requests_by_day_status:
-        if date in date_map:
-            if status_code not in date_map[date]:
-                date_map[date][status_code] = 0
-            date_map[date][status_code] = count
-    
-    # Convert to list sorted by date
-    chart_data = [
+    """Get request data for charting (grouped by bucket and status code)"""
+    bucketer, buckets = await chart_buckets(db, days, granularity)
+    
+    # Hourly rollups (plus rows not yet rolled up) instead of grouping raw rows
+    totals = await rolled_up_totals(db, REQUEST_LOG_ROLLUP, buckets[0], ("hour", "status_code"))
+    series = zero_filled_series(bucketer, buckets, (
+        (hour, status_code, measures["request_count"])
+        for (hour, status_code), measures in totals.items()
+    ))
+    
+    return [
         {
-            "date": str(date),
-            "status_codes": {str(code): count for code, count in status_data.items()},
+            "date": bucketer.label(start),
+            "start": start.isoformat(),
+            "status_codes": {str(code): count for code, count in sorted(status_data.items())},
             "total": sum(status_data.values())
         }
-        for date, status_data in sorted(date_map.items())
+        for start, status_data in series
+    ]
+
+# Business records charted by creation time
+BUSINESS_CHART_MODELS = {
+    "customers": Customer,
+    "projects": Project,
+    "samples": Sample,
+    "result_entries": ResultEntry,
+    "reports": Report,
+}
+
+@router.get("/business/chart")
+async def get_business_chart_data(
+    days: int = Query(30, ge=1, le=366),
+    granularity: Granularity = Query(Granularity.DAY),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """Get customers, projects, samples, result entries and reports created per bucket"""
+    bucketer, buckets = await chart_buckets(db, days, granularity)
+    since = buckets[0].astimezone(timezone.utc)
+    
+    # Counted per UTC hour in SQL, so at most one row per hour of the period comes back per table
+    counts = []
+    for name, model in BUSINESS_CHART_MODELS.items():
+        hour = hour_expression(model.created_at, db.bind.dialect.name)
+        rows = await db.execute(select(hour, func.count()).where(model.created_at >= since).group_by(hour))
+        counts.extend((datetime.strptime(start, "%Y-%m-%d %H:%M:%S"), name, count) for start, count in rows)
+    series = zero_filled_series(bucketer, buckets, counts)
+    
+    return [
+        {
+            "date": bucketer.label(start),
+            "start": start.isoformat(),
+            **{name: created.get(name, 0) for name in BUSINESS_CHART_MODELS}
+        }
+        for start, created in series
+    ]
+
+@router.get("/requests/log")
+async def get_request_log(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    exact_total: bool = Query(False, description="Count every matching row instead of estimating"),
+    user_id: Optional[int] = Query(None),
+    status_code: Optional[int] = Query(None),
+    method: Optional[HTTPMethod] = Query(None),
+    route: Optional[str] = Query(None, description="Route template, e.g. /api/samples/{sample_id}"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """Browse raw request logs, newest first"""
+    query = select(RequestLog)
+    
+    if user_id:
+        query = query.where(RequestLog.user_id == user_id)
+    if status_code:
+        query = query.where(RequestLog.status_code == status_code)
+    if method:
+        query = query.where(RequestLog.method == method)
+    if route == UNMATCHED_ROUTE:
+        query = query.where(RequestLog.route_id.is_(None))
+    elif route:
+        route_id = route_registry.get_id(route)
+        if route_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown route '{route}'"
+            )
+        query = query.where(RequestLog.route_id == route_id)
+    
+    totals = await count_total(db, query, exact_total)
+    logs, next_cursor = await keyset_page(
+        db, REQUEST_LOG_LIST.apply(query), RequestLog.created_at, RequestLog.id, cursor, limit
+    )
+    
+    return {
+        **totals,
+        "next_cursor": next_cursor,
+        "items": [
+            {
+                "id": log.id,
+                "user_id": log.user_id,
+                "impersonation_id": log.impersonation_id,
+                "method": log.method.value if log.method else None,
+                "path": log.path,
+                "route": log.route.template if log.route else None,
+                "status_code": log.status_code,
+                "ip_address": log.ip_address,
+                "response_time_ms": log.response_time_ms,
+                "ttfb_ms": log.ttfb_ms,
+                "query_count": log.query_count,
+                "db_time_ms": log.db_time_ms,
+                "error_message": log.error_message,
+                "created_at": log.created_at.isoformat() if log.created_at else None
+            }
+            for log in logs
+        ]
+    }
+
+@router.get("/export/request-logs")
+async def export_request_logs(
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+    gzip: bool = Query(False),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    status_code: Optional[int] = Query(None),
+    status_class: Optional[int] = Query(None, ge=1, le=5, description="e.g. 5 for all 5xx responses"),
+    user_id: Optional[int] = Query(None),
+    current_user: User = Depends(require_super_admin)
+):
+    """Download request logs as NDJSON or CSV, streamed oldest first"""
+    query = select(
+        RequestLog.id, RequestLog.created_at, RequestLog.method, RequestLog.path,
+        ApiRoute.template.label("route"), RequestLog.status_code, RequestLog.user_id,
+        RequestLog.impersonation_id, RequestLog.ip_address, RequestLog.user_agent,
+        RequestLog.response_time_ms, RequestLog.ttfb_ms, RequestLog.query_count,
+        RequestLog.db_time_ms, RequestLog.sample_weight, RequestLog.error_message,
+    ).outerjoin(ApiRoute, RequestLog.route_id == ApiRoute.id)
+    
+    if start_date:
+        query = query.where(RequestLog.created_at >= start_date)
+    if end_date:
+        query = query.where(RequestLog.created_at <= end_date)
+    if status_code:
+        query = query.where(RequestLog.status_code == status_code)
+    if status_class:
+        query = query.where(RequestLog.status_code.between(status_class * 100, status_class * 100 + 99))
+    if user_id:
+        query = query.where(RequestLog.user_id == user_id)
+    
+    media_type, headers = export_headers("request-logs", format, gzip)
+    return StreamingResponse(
+        stream_export(query.order_by(RequestLog.created_at, RequestLog.id), format, gzip),
+        media_type=media_type, headers=headers
+    )
+
+@router.get("/export/login-history")
+async def export_login_history(
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+    gzip: bool = Query(False),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    success: Optional[bool] = Query(None),
+    user_id: Optional[int] = Query(None),
+    current_user: User = Depends(require_super_admin)
+):
+    """Download login history as NDJSON or CSV, streamed oldest first"""
+    query = select(
+        LoginHistory.id, LoginHistory.created_at, LoginHistory.email, LoginHistory.user_id,
+        LoginHistory.success, LoginHistory.failure_reason, LoginHistory.ip_address, LoginHistory.user_agent,
+    )
+    
+    if start_date:
+        query = query.where(LoginHistory.created_at >= start_date)
+    if end_date:
+        query = query.where(LoginHistory.created_at <= end_date)
+    if success is not None:
+        query = query.where(LoginHistory.success == success)
+    if user_id:
+        query = query.where(LoginHistory.user_id == user_id)
+    
+    media_type, headers = export_headers("login-history", format, gzip)
+    return StreamingResponse(
+        stream_export(query.order_by(LoginHistory.created_at, LoginHistory.id), format, gzip),
+        media_type=media_type, headers=headers
+    )
+
+async def route_templates(db: AsyncSession, route_ids) -> dict:
+    """{route id: template} for the given api_routes ids"""
+    return dict((await db.execute(
+        select(ApiRoute.id, ApiRoute.template).where(ApiRoute.id.in_([route_id for route_id in route_ids if route_id]))
+    )).all())
+
+@router.get("/requests/routes")
+async def get_requests_by_route(
+    days: int = Query(7, ge=1, le=90),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """Get request volume, latency and errors per route template (e.g. /api/samples/{sample_id}).
+
+    Within the in-memory request log window this is computed from its columns and
+    includes latency percentiles; longer periods come from the hourly rollups,
+    which have no percentiles.
+    """
+    start_date = datetime.now(timezone.utc) - timedelta(days=days)
+    percentile_fields = ("p50_response_time_ms", "p95_response_time_ms", "p99_response_time_ms")
+    
+    if await request_log_window.ready_for(start_date):
+        summary = request_log_window.route_summary(start_date)
+        templates = await route_templates(db, {row["route_id"] for row in summary})
+        rows = [
+            {"route": templates.get(row.pop("route_id"), UNMATCHED_ROUTE), **row}
+            for row in summary
+        ]
+        return sorted(rows, key=lambda row: row["requests"], reverse=True)
+    
+    totals = await rolled_up_totals(db, REQUEST_LOG_ROLLUP, start_date, ("route", "method", "status_code"))
+    
+    routes = {}
+    for (route, method, status_code), measures in totals.items():
+        key = (route, method.value if isinstance(method, HTTPMethod) else method)
+        data = routes.setdefault(key, {"requests": 0, "errors": 0, "total_response_time_ms": 0, "max_response_time_ms": 0})
+        data["requests"] += measures["request_count"]
+        data["total_response_time_ms"] += measures["total_response_time_ms"]
+        data["max_response_time_ms"] = max(data["max_response_time_ms"], measures["max_response_time_ms"])
+        if status_code >= 500:
+            data["errors"] += measures["request_count"]
+    
+    return sorted(
+        (
+            {
+                "route": route,
+                "method": method,
+                "requests": data["requests"],
+                "errors": data["errors"],
+                "avg_response_time_ms": round(data["total_response_time_ms"] / data["requests"], 1) if data["requests"] else 0,
+                "max_response_time_ms": data["max_response_time_ms"],
+                **{field: None for field in percentile_fields},
+            }
+            for (route, method), data in routes.items()
+        ),
+        key=lambda row: row["requests"],
+        reverse=True,
+    )
+
+@router.get("/requests/top-users")
+async def get_top_users_by_requests(
+    days: int = Query(1, ge=1, le=90),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """Get the users making the most requests, with their 4xx/5xx count and average latency"""
+    start_date = datetime.now(timezone.utc) - timedelta(days=days)
+    
+    if await request_log_window.ready_for(start_date):
+        top = request_log_window.top_users(start_date, limit)
+    else:
+        requests = func.sum(RequestLog.sample_weight).label("requests")
+        timed = RequestLog.response_time_ms.isnot(None)
+        rows = (await db.execute(
+            select(
+                RequestLog.user_id,
+                requests,
+                weighted_count_if(RequestLog.sample_weight, RequestLog.status_code >= 400).label("errors"),
+                func.sum(case((timed, RequestLog.response_time_ms * RequestLog.sample_weight), else_=0)).label("latency_sum"),
+                weighted_count_if(RequestLog.sample_weight, timed).label("timed"),
+            )
+            .where(RequestLog.created_at >= start_date, RequestLog.user_id.isnot(None))
+            .group_by(RequestLog.user_id)
+            .order_by(requests.desc())
+            .limit(limit)
+        )).all()
+        top = [
+            {
+                "user_id": row.user_id,
+                "requests": int(row.requests),
+                "errors": int(row.errors),
+                "avg_response_time_ms": round(float(row.latency_sum) / float(row.timed), 1) if row.timed else 0,
+            }
+            for row in rows
+        ]
+    
+    users = {
+        user.id: user
+        for user in (await db.execute(select(User).where(User.id.in_([row["user_id"] for row in top])))).scalars()
+    }
+    return [
+        {
+            **row,
+            "email": users[row["user_id"]].email if row["user_id"] in users else None,
+            "full_name": users[row["user_id"]].full_name if row["user_id"] in users else None,
+        }
+        for row in top
     ]
+
+@router.get("/queries/offenders")
+async def get_query_offenders(
+    days: int = Query(1, ge=1, le=30),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """Get the routes issuing the most SQL per request, plus statements flagged as N+1 on this worker"""
+    start_date = datetime.now(timezone.utc) - timedelta(days=days)
+    route = func.coalesce(ApiRoute.template, UNMATCHED_ROUTE).label("route")
+    avg_queries = func.avg(RequestLog.query_count).label("avg_queries")
+    rows = (await db.execute(
+        select(
+            route,
+            RequestLog.method,
+            func.count(RequestLog.id).label("requests"),
+            avg_queries,
+            func.max(RequestLog.query_count).label("max_queries"),
+            func.avg(RequestLog.db_time_ms).label("avg_db_time_ms"),
+            func.max(RequestLog.db_time_ms).label("max_db_time_ms"),
+        )
+        .select_from(RequestLog)
+        .outerjoin(ApiRoute, RequestLog.route_id == ApiRoute.id)
+        .where(RequestLog.created_at >= start_date, RequestLog.query_count.isnot(None))
+        .group_by(route, RequestLog.method)
+        .order_by(avg_queries.desc())
+        .limit(limit)
+    )).all()
     
-    return chart_data
+    return {
+        "routes": [
+            {
+                "route": row.route,
+                "method": row.method.value if isinstance(row.method, HTTPMethod) else row.method,
+                "requests": row.requests,
+                "avg_queries": round(float(row.avg_queries or 0), 1),
+                "max_queries": row.max_queries,
+                "avg_db_time_ms": round(float(row.avg_db_time_ms or 0), 1),
+                "max_db_time_ms": row.max_db_time_ms,
+            }
+            for row in rows
+        ],
+        "n_plus_one": n_plus_one_tracker.top(limit),
+    }
 
 @router.get("/users/list")
 async def get_users_for_impersonation(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_super_admin)
 ):
     """Get list of users that can be impersonated (lab admins and managers)"""
-    users = db.query(User).filter(
-        User.user_type.in_([UserType.LAB_ADMINISTRATOR, UserType.LAB_MANAGER]),
-        User.is_active == True
-    ).order_by(User.full_name).all()
+    users = (await db.execute(
+        select(User).where(
+            User.user_type.in_([UserType.LAB_ADMINISTRATOR, UserType.LAB_MANAGER]),
+            User.is_active == True
+        ).order_by(User.full_name)
+    )).scalars().all()
     
     return [
         {
@@ -415,23 +705,25 @@ class ImpersonationRequest(BaseModel):
 
 @router.post("/impersonate/end")
 async def end_impersonation(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_super_admin)
 ):
     """End current impersonation"""
     # Find active impersonation
-    impersonation = db.query(UserImpersonation).filter(
-        and_(
-            UserImpersonation.super_admin_id == current_user.id,
-            UserImpersonation.ended_at.is_(None)
+    impersonation = (await db.execute(
+        select(UserImpersonation).where(
+            and_(
+                UserImpersonation.super_admin_id == current_user.id,
+                UserImpersonation.ended_at.is_(None)
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if not impersonation:
         raise HTTPException(status_code=400, detail="No active impersonation found")
     
     impersonation.ended_at = datetime.now(timezone.utc)
-    db.commit()
+    await db.commit()
     
     # Create new token for super admin
     from auth import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
@@ -456,13 +748,13 @@ async def end_impersonation(
 async def start_impersonation(
     user_id: int,
     request_data: ImpersonationRequest = Body(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_super_admin)
 ):
     """Start impersonating a user"""
     reason = request_data.reason if request_data else None
     # Get user to impersonate
-    target_user = db.query(User).filter(User.id == user_id).first()
+    target_user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -473,12 +765,14 @@ async def start_impersonation(
         raise HTTPException(status_code=400, detail="Can only impersonate Lab Administrators or Lab Managers")
     
     # Check if there's an active impersonation
-    active_impersonation = db.query(UserImpersonation).filter(
-        and_(
-            UserImpersonation.super_admin_id == current_user.id,
-            UserImpersonation.ended_at.is_(None)
+    active_impersonation = (await db.execute(
+        select(UserImpersonation).where(
+            and_(
+                UserImpersonation.super_admin_id == current_user.id,
+                UserImpersonation.ended_at.is_(None)
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if active_impersonation:
         raise HTTPException(status_code=400, detail="You are already impersonating a user. End current impersonation first.")
@@ -490,8 +784,7 @@ async def start_impersonation(
         reason=reason
     )
     db.add(impersonation)
-    db.commit()
-    db.refresh(impersonation)
+    await db.commit()
     
     # Create access token for impersonated user
     from auth import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
@@ -522,21 +815,25 @@ async def start_impersonation(
 
 @router.get("/impersonate/status")
 async def get_impersonation_status(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_super_admin)
 ):
     """Get current impersonation status"""
-    impersonation = db.query(UserImpersonation).filter(
-        and_(
-            UserImpersonation.super_admin_id == current_user.id,
-            UserImpersonation.ended_at.is_(None)
+    impersonation = (await db.execute(
+        select(UserImpersonation).where(
+            and_(
+                UserImpersonation.super_admin_id == current_user.id,
+                UserImpersonation.ended_at.is_(None)
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if not impersonation:
         return {"is_impersonating": False}
     
-    impersonated_user = db.query(User).filter(User.id == impersonation.impersonated_user_id).first()
+    impersonated_user = (await db.execute(
+        select(User).where(User.id == impersonation.impersonated_user_id)
+    )).scalar_one_or_none()
     
     return {
         "is_impersonating": True,
@@ -553,22 +850,23 @@ async def get_impersonation_status(
 
 @router.get("/impersonate/history")
 async def get_impersonation_history(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
+    exact_total: bool = Query(False, description="Count every matching row instead of estimating"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_super_admin)
 ):
     """Get impersonation history"""
-    impersonations = db.query(UserImpersonation).filter(
-        UserImpersonation.super_admin_id == current_user.id
-    ).order_by(UserImpersonation.started_at.desc()).offset(skip).limit(limit).all()
-    
-    total = db.query(UserImpersonation).filter(
-        UserImpersonation.super_admin_id == current_user.id
-    ).count()
+    query = select(UserImpersonation).where(UserImpersonation.super_admin_id == current_user.id)
+    totals = await count_total(db, query, exact_total)
+    impersonations, next_cursor = await keyset_page(
+        db, IMPERSONATION_LIST.apply(query),
+        UserImpersonation.started_at, UserImpersonation.id, cursor, limit
+    )
     
     return {
-        "total": total,
+        **totals,
+        "next_cursor": next_cursor,
         "items": [
             {
                 "id": imp.id,
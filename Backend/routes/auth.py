@@ -1,27 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Form, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from datetime import timedelta
-from database import get_db
+import math
+from database import get_async_db
+from services.turnstile import turnstile_verifier
+from services.integration_registry import integration_registry
+from services.password_hashing import verify_password_async, hash_password_async
+from services.user_cache import user_cache, UserSnapshot
+from services.login_throttle import login_throttle
+from services.client_ip import client_ip
 from models.user import User
-from models.integration import Integration
 from models.login_history import LoginHistory
 from schemas.user import UserLogin, Token, UserResponse, PasswordReset
-from auth import verify_password, create_access_token, decode_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, get_password_hash
-import json
-import requests
+from auth import create_access_token, decode_access_token, password_needs_rehash, ACCESS_TOKEN_EXPIRE_MINUTES
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Get the current authenticated user (handles impersonation)"""
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> UserSnapshot:
+    """Get the current authenticated user (handles impersonation).
+
+    Returns a cached UserSnapshot rather than a session-bound User. The resolved
+    identity is left on request.state for LoggingMiddleware, so it doesn't have to
+    decode the token and look the user up a second time.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    # A suspended user's token stops working at once; 401 makes the frontend sign them out
+    inactive_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Inactive user",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
     payload = decode_access_token(token)
     if payload is None:
         raise credentials_exception
@@ -33,93 +53,96 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     impersonated_user_id = payload.get("impersonated_user_id")
     if impersonated_user_id:
         # User is being impersonated - return the impersonated user
-        user = db.query(User).filter(User.id == impersonated_user_id).first()
+        user = await get_user_snapshot(db, ("id", impersonated_user_id), User.id == impersonated_user_id)
         if user is None:
             raise credentials_exception
         if not user.is_active:
-            raise HTTPException(status_code=400, detail="Inactive user")
-        # Store impersonation info in user object for reference
-        user._is_impersonated = True
-        user._impersonated_by = email  # Super admin email
+            raise inactive_exception
+        request.state.user_id = user.id
+        request.state.impersonation_id = payload.get("impersonation_id")
         return user
     
     # Normal authentication - return the actual user
-    user = db.query(User).filter(User.email == email).first()
+    user = await get_user_snapshot(db, ("email", email), User.email == email)
     if user is None:
         raise credentials_exception
     if not user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
+        raise inactive_exception
+    request.state.user_id = user.id
     return user
 
-def verify_turnstile_token(token: str, secret_key: str) -> bool:
-    """Verify Turnstile token with Cloudflare"""
-    try:
-        response = requests.post(
-            'https://challenges.cloudflare.com/turnstile/v0/siteverify',
-            data={
-                'secret': secret_key,
-                'response': token,
-            },
-            timeout=5
-        )
-        result = response.json()
-        return result.get('success', False)
-    except Exception as e:
-        print(f"Turnstile verification error: {e}")
-        return False
+async def get_user_snapshot(db: AsyncSession, cache_key, criterion) -> UserSnapshot | None:
+    """Look a user up in the user cache, falling back to the database.
+
+    Routes that change a user call user_cache.invalidate, which only clears this
+    worker's cache: other workers keep serving their snapshot (e.g. of a user who
+    was just suspended) for up to USER_CACHE_TTL_SECONDS.
+    """
+    snapshot = user_cache.get(cache_key)
+    if snapshot is None:
+        user = (await db.execute(select(User).where(criterion))).scalar_one_or_none()
+        if user is None:
+            return None
+        snapshot = UserSnapshot.from_user(user)
+        user_cache.set(cache_key, snapshot)
+    return snapshot
 
 def get_client_ip(request: Request) -> str:
-    """Get client IP address from request"""
-    if "x-forwarded-for" in request.headers:
-        return request.headers["x-forwarded-for"].split(",")[0].strip()
-    if request.client:
-        return request.client.host
-    return "unknown"
+    """Get client IP address from request (X-Forwarded-For only counts from TRUSTED_PROXIES)"""
+    peer = request.client.host if request.client else None
+    return client_ip(peer, request.headers.get("x-forwarded-for")) or "unknown"
 
 def get_user_agent(request: Request) -> str:
     """Get user agent from request"""
     return request.headers.get("user-agent", "unknown")
 
+async def record_failed_login(db: AsyncSession, email: str, ip_address: str, user_agent: str, reason: str):
+    """Log a failed login attempt and count it towards the login throttle"""
+    login_throttle.record_failure(ip_address, email)
+    login_log = LoginHistory(
+        email=email,
+        success=False,
+        ip_address=ip_address,
+        user_agent=user_agent,
+        failure_reason=reason
+    )
+    db.add(login_log)
+    await db.commit()
+
 @router.post("/login")
 async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     turnstile_token: str = Form(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Authenticate user and return JWT token"""
     email = form_data.username
     ip_address = get_client_ip(request)
     user_agent = get_user_agent(request)
     
+    # Too many recent failures for this IP or email: refuse before any DB or Argon2 work
+    retry_after = login_throttle.check(ip_address, email)
+    if retry_after:
+        login_throttle.record_rejected(ip_address, email)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts. Please try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    
     # Check if Turnstile is enabled and verify token
-    turnstile_integration = db.query(Integration).filter(Integration.name == "cloudflare_turnstile").first()
+    turnstile_integration = await integration_registry.get_async(db, "cloudflare_turnstile")
     if turnstile_integration and turnstile_integration.enabled:
         if not turnstile_token:
-            # Log failed login attempt
-            login_log = LoginHistory(
-                email=email,
-                success=False,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                failure_reason="Turnstile verification required"
-            )
-            db.add(login_log)
-            db.commit()
+            await record_failed_login(db, email, ip_address, user_agent, "Turnstile verification required")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Turnstile verification required"
             )
         
         # Get secret key from config
-        config = {}
-        if turnstile_integration.config:
-            try:
-                config = json.loads(turnstile_integration.config) if isinstance(turnstile_integration.config, str) else turnstile_integration.config
-            except (json.JSONDecodeError, TypeError):
-                pass
-        
-        secret_key = config.get('secret_key', '')
+        secret_key = turnstile_integration.get('secret_key', '')
         if not secret_key:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -127,53 +150,35 @@ async def login(
             )
         
         # Verify token
-        if not verify_turnstile_token(turnstile_token, secret_key):
-            # Log failed login attempt
-            login_log = LoginHistory(
-                email=email,
-                success=False,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                failure_reason="Turnstile verification failed"
-            )
-            db.add(login_log)
-            db.commit()
+        if not await turnstile_verifier.verify(turnstile_token, secret_key, remote_ip=ip_address):
+            await record_failed_login(db, email, ip_address, user_agent, "Turnstile verification failed")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Turnstile verification failed"
             )
     
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        # Log failed login attempt
-        login_log = LoginHistory(
-            email=email,
-            success=False,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            failure_reason="Incorrect email or password"
-        )
-        db.add(login_log)
-        db.commit()
+    user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+    # Argon2 runs in the bounded hash pool; a full queue answers 503 instead of piling up memory
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
+        await record_failed_login(db, email, ip_address, user_agent, "Incorrect email or password")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     if not user.is_active:
-        # Log failed login attempt
-        login_log = LoginHistory(
-            email=email,
-            success=False,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            failure_reason="Inactive user"
-        )
-        db.add(login_log)
-        db.commit()
+        await record_failed_login(db, email, ip_address, user_agent, "Inactive user")
         raise HTTPException(status_code=400, detail="Inactive user")
     
+    # Upgrade hashes made with older Argon2 parameters while we have the plain password
+    if password_needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await hash_password_async(form_data.password)
+        except HTTPException:
+            pass  # Hash pool is busy; the login itself already succeeded, so retry on a later one
+    
     # Log successful login
+    login_throttle.record_success(email)
     login_log = LoginHistory(
         user_id=user.id,
         email=email,
@@ -182,7 +187,7 @@ async def login(
         user_agent=user_agent
     )
     db.add(login_log)
-    db.commit()
+    await db.commit()
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -230,7 +235,7 @@ async def read_users_me(
 async def reset_password(
     password_data: PasswordReset,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Reset password for user (required on first login)"""
     if password_data.new_password != password_data.confirm_password:
@@ -239,10 +244,12 @@ async def reset_password(
     if len(password_data.new_password) < 8:
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
     
-    current_user.hashed_password = get_password_hash(password_data.new_password)
-    current_user.needs_password_reset = False
-    db.commit()
-    db.refresh(current_user)
+    # current_user is a cached snapshot, so update the row itself
+    user = (await db.execute(select(User).where(User.id == current_user.id))).scalar_one()
+    user.hashed_password = await hash_password_async(password_data.new_password)
+    user.needs_password_reset = False
+    await db.commit()
+    user_cache.invalidate(user.id)
     
     return {"message": "Password reset successfully"}
 
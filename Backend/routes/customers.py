@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Optional
-from database import get_db
+from database import get_async_db
+from services.blocking_pool import run_blocking
 from models.customer import Customer
 from models.user import User, UserType
 from schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse
 from routes.auth import get_current_user
 from utils.customer_id_generator import generate_customer_id
-from services.email_service import send_customer_welcome_email
+from services.email_service import send_customer_welcome_email, send_with_own_session
 
 router = APIRouter(prefix="/api/customers", tags=["customers"])
 
@@ -17,7 +19,7 @@ router = APIRouter(prefix="/api/customers", tags=["customers"])
 @router.get("/search", response_model=List[CustomerResponse])
 async def search_customers(
     q: str = Query(..., description="Search query (customer ID, name, company, email)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Enhanced search for customers with fuzzy matching"""
@@ -28,7 +30,7 @@ async def search_customers(
         return []
     
     query = q.strip().upper()
-    all_customers = db.query(Customer).all()
+    all_customers = (await db.execute(select(Customer))).scalars().all()
     
     # Exact matches first (highest priority)
     exact_matches = []
@@ -116,21 +118,21 @@ async def search_customers(
 async def get_customers(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all customers"""
-    customers = db.query(Customer).offset(skip).limit(limit).all()
+    customers = (await db.execute(select(Customer).offset(skip).limit(limit))).scalars().all()
     return customers
 
 @router.get("/{id}", response_model=CustomerResponse)
 async def get_customer(
     id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific customer by internal ID"""
-    customer = db.query(Customer).filter(Customer.id == id).first()
+    customer = (await db.execute(select(Customer).where(Customer.id == id))).scalar_one_or_none()
     if customer is None:
         raise HTTPException(status_code=404, detail="Customer not found")
     return customer
@@ -139,28 +141,30 @@ async def get_customer(
 async def create_customer(
     customer: CustomerCreate,
     send_welcome_email: bool = Query(True, description="Send welcome email to customer"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new customer"""
     # Generate unique customer ID
-    customer_id = generate_customer_id(db)
+    customer_id = await generate_customer_id(db)
     
     customer_data = customer.model_dump()
     customer_data['customer_id'] = customer_id
     
     db_customer = Customer(**customer_data)
     db.add(db_customer)
-    db.commit()
-    db.refresh(db_customer)
+    await db.commit()
+    await db.refresh(db_customer)
     
     # Send welcome email if requested and email is provided
     if send_welcome_email and db_customer.email:
-        email_sent = send_customer_welcome_email(
+        email_sent = await run_blocking(
+            "email",
+            send_with_own_session,
+            send_customer_welcome_email,
             to_email=db_customer.email,
             full_name=db_customer.full_name,
-            customer_id=db_customer.customer_id,
-            db=db
+            customer_id=db_customer.customer_id
         )
         if not email_sent:
             print(f"Warning: Failed to send welcome email to {db_customer.email}")
@@ -171,11 +175,11 @@ async def create_customer(
 async def update_customer(
     customer_id: int,
     customer: CustomerUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a customer"""
-    db_customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    db_customer = (await db.execute(select(Customer).where(Customer.id == customer_id))).scalar_one_or_none()
     if db_customer is None:
         raise HTTPException(status_code=404, detail="Customer not found")
     
@@ -183,22 +187,22 @@ async def update_customer(
     for field, value in update_data.items():
         setattr(db_customer, field, value)
     
-    db.commit()
-    db.refresh(db_customer)
+    await db.commit()
+    await db.refresh(db_customer)
     return db_customer
 
 @router.delete("/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_customer(
     customer_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a customer"""
-    db_customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    db_customer = (await db.execute(select(Customer).where(Customer.id == customer_id))).scalar_one_or_none()
     if db_customer is None:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    db.delete(db_customer)
-    db.commit()
+    await db.delete(db_customer)
+    await db.commit()
     return None
 
@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
+from services.blocking_pool import offload
+from services.loader_profiles import DEPARTMENT_RESPONSE
 from models.department import Department
 from models.test_type import TestType
 from models.user import User
@@ -12,19 +14,19 @@ from routes.settings import require_lab_admin_or_manager
 router = APIRouter(prefix="/api/departments", tags=["departments"])
 
 @router.get("/", response_model=List[DepartmentResponse])
-async def get_departments(
+@offload("db")
+def get_departments(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all departments with their test types"""
     # Get all departments (including inactive) for admin users
-    # Use joinedload to eagerly load test_types to avoid N+1 queries
-    from sqlalchemy.orm import joinedload
-    departments = db.query(Department).options(joinedload(Department.test_types)).all()
+    departments = db.query(Department).options(*DEPARTMENT_RESPONSE.options).all()
     return departments
 
 @router.post("/", response_model=DepartmentResponse, status_code=status.HTTP_201_CREATED)
-async def create_department(
+@offload("db")
+def create_department(
     department: DepartmentCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -42,7 +44,8 @@ async def create_department(
     return db_department
 
 @router.put("/{department_id}", response_model=DepartmentResponse)
-async def update_department(
+@offload("db")
+def update_department(
     department_id: int,
     department: DepartmentUpdate,
     db: Session = Depends(get_db),
@@ -62,7 +65,8 @@ async def update_department(
     return db_department
 
 @router.delete("/{department_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_department(
+@offload("db")
+def delete_department(
     department_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -78,7 +82,8 @@ async def delete_department(
 
 # Test Type endpoints
 @router.post("/{department_id}/test-types", response_model=TestTypeResponse, status_code=status.HTTP_201_CREATED)
-async def create_test_type(
+@offload("db")
+def create_test_type(
     department_id: int,
     test_type: TestTypeCreate,
     db: Session = Depends(get_db),
@@ -97,7 +102,8 @@ async def create_test_type(
     return db_test_type
 
 @router.put("/{department_id}/test-types/{test_type_id}", response_model=TestTypeResponse)
-async def update_test_type(
+@offload("db")
+def update_test_type(
     department_id: int,
     test_type_id: int,
     test_type: TestTypeUpdate,
@@ -121,7 +127,8 @@ async def update_test_type(
     return db_test_type
 
 @router.delete("/{department_id}/test-types/{test_type_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_test_type(
+@offload("db")
+def delete_test_type(
     department_id: int,
     test_type_id: int,
     db: Session = Depends(get_db),
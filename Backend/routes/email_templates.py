@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
+from services.blocking_pool import offload
 from models.email_template import EmailTemplate
 from models.user import User
 from schemas.email_template import EmailTemplateCreate, EmailTemplateUpdate, EmailTemplateResponse
@@ -11,7 +12,8 @@ from routes.settings import require_lab_admin_or_manager
 router = APIRouter(prefix="/api/email-templates", tags=["email-templates"])
 
 @router.get("/", response_model=List[EmailTemplateResponse])
-async def get_email_templates(
+@offload("db")
+def get_email_templates(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
 ):
@@ -20,7 +22,8 @@ async def get_email_templates(
     return templates
 
 @router.get("/{template_name}", response_model=EmailTemplateResponse)
-async def get_email_template(
+@offload("db")
+def get_email_template(
     template_name: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -32,7 +35,8 @@ async def get_email_template(
     return template
 
 @router.post("/", response_model=EmailTemplateResponse, status_code=status.HTTP_201_CREATED)
-async def create_email_template(
+@offload("db")
+def create_email_template(
     template: EmailTemplateCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -50,7 +54,8 @@ async def create_email_template(
     return db_template
 
 @router.put("/{template_name}", response_model=EmailTemplateResponse)
-async def update_email_template(
+@offload("db")
+def update_email_template(
     template_name: str,
     template: EmailTemplateUpdate,
     db: Session = Depends(get_db),
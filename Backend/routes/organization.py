@@ -6,6 +6,7 @@ import os
 import uuid
 import io
 from database import get_db
+from services.blocking_pool import offload
 from models.organization import Organization
 from models.user import User, UserType
 from schemas.organization import OrganizationResponse, OrganizationUpdate
@@ -29,7 +30,8 @@ def require_lab_admin_or_manager(current_user: User = Depends(get_current_user))
     return current_user
 
 @router.post("/logo", response_model=OrganizationResponse)
-async def upload_logo(
+@offload("db")
+def upload_logo(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -44,7 +46,7 @@ async def upload_logo(
         )
     
     # Read file content
-    contents = await file.read()
+    contents = file.file.read()
     
     # Check file size
     if len(contents) > MAX_FILE_SIZE:
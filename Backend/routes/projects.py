@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Optional
-from database import get_db
+from database import get_async_db
+from services.loader_profiles import PROJECT_RESPONSE
 from models.project import Project
 from models.customer import Customer
 from models.user import User
@@ -16,7 +18,7 @@ router = APIRouter(prefix="/api/projects", tags=["projects"])
 @router.get("/search", response_model=List[ProjectWithCustomer])
 async def search_projects(
     q: str = Query(..., description="Search query (project ID, name, type, customer name)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Enhanced search for projects with fuzzy matching"""
@@ -28,7 +30,9 @@ async def search_projects(
     
     query = q.strip().upper()
     # Join with customers to get customer info
-    all_projects = db.query(Project).join(Customer).all()
+    all_projects = (await db.execute(
+        PROJECT_RESPONSE.select().join(Customer)
+    )).scalars().all()
     
     # Exact matches first (highest priority)
     exact_matches = []
@@ -122,16 +126,16 @@ async def get_projects(
     skip: int = 0,
     limit: int = 100,
     customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all projects, optionally filtered by customer"""
-    query = db.query(Project).join(Customer)
+    query = PROJECT_RESPONSE.select().join(Customer)
     
     if customer_id:
-        query = query.filter(Project.customer_id == customer_id)
+        query = query.where(Project.customer_id == customer_id)
     
-    projects = query.offset(skip).limit(limit).all()
+    projects = (await db.execute(query.offset(skip).limit(limit))).scalars().all()
     
     # Format results with customer info
     formatted_results = []
@@ -147,11 +151,13 @@ async def get_projects(
 @router.get("/{id}", response_model=ProjectWithCustomer)
 async def get_project(
     id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific project by internal ID"""
-    project = db.query(Project).filter(Project.id == id).first()
+    project = (await db.execute(
+        PROJECT_RESPONSE.select().where(Project.id == id)
+    )).scalar_one_or_none()
     if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -164,25 +170,25 @@ async def get_project(
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project: ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new project"""
     # Verify customer exists
-    customer = db.query(Customer).filter(Customer.id == project.customer_id).first()
+    customer = (await db.execute(select(Customer).where(Customer.id == project.customer_id))).scalar_one_or_none()
     if customer is None:
         raise HTTPException(status_code=404, detail="Customer not found")
     
     # Generate unique project ID
-    project_id = generate_project_id(db)
+    project_id = await generate_project_id(db)
     
     project_data = project.model_dump()
     project_data['project_id'] = project_id
     
     db_project = Project(**project_data)
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    await db.commit()
+    await db.refresh(db_project)
     
     return db_project
 
@@ -190,11 +196,11 @@ async def create_project(
 async def update_project(
     project_id: int,
     project: ProjectUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a project"""
-    db_project = db.query(Project).filter(Project.id == project_id).first()
+    db_project = (await db.execute(select(Project).where(Project.id == project_id))).scalar_one_or_none()
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -202,22 +208,22 @@ async def update_project(
     for field, value in update_data.items():
         setattr(db_project, field, value)
     
-    db.commit()
-    db.refresh(db_project)
+    await db.commit()
+    await db.refresh(db_project)
     return db_project
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a project"""
-    db_project = db.query(Project).filter(Project.id == project_id).first()
+    db_project = (await db.execute(select(Project).where(Project.id == project_id))).scalar_one_or_none()
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    db.delete(db_project)
-    db.commit()
+    await db.delete(db_project)
+    await db.commit()
     return None
 
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.responses import HTMLResponse, FileResponse, Response
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
 from typing import List, Optional
 from datetime import datetime, timezone
-from database import get_db
+from database import get_async_db
+from services.blocking_pool import run_blocking
+from services.loader_profiles import REPORT_RESPONSE, REPORT_DETAIL, RESULT_ENTRY_REPORT_DATA
 from models.report import Report, ReportStatus
 from models.result_entry import ResultEntry, ResultValue
 from models.sample import Sample
@@ -18,18 +20,39 @@ import json
 import hashlib
 import secrets
 import os
-from weasyprint import HTML
 from io import BytesIO
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
-def generate_report_number(db: Session) -> str:
+async def get_report_for_response(db: AsyncSession, *criteria, detail: bool = False) -> Optional[Report]:
+    """Load a single report matching the criteria with everything the response builders need"""
+    profile = REPORT_DETAIL if detail else REPORT_RESPONSE
+    result = await db.execute(
+        profile.select()
+        .where(*criteria)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def get_organization(db: AsyncSession) -> Optional[Organization]:
+    """Get the organization shown on report documents"""
+    return (await db.execute(select(Organization))).scalars().first()
+
+def render_report_pdf(html_content: str) -> bytes:
+    """Render report HTML to PDF (CPU bound, call from a worker thread)"""
+    # Imported on first use: weasyprint needs Pango, which the tests and scripts that import the app don't
+    from weasyprint import HTML
+    return HTML(string=html_content).write_pdf()
+
+async def generate_report_number(db: AsyncSession) -> str:
     """Generate unique report number: RPT-YYYY-XXX"""
     current_year = datetime.now().year
     # Get the last report number for this year
-    last_report = db.query(Report).filter(
-        Report.report_number.like(f"RPT-{current_year}-%")
-    ).order_by(Report.report_number.desc()).first()
+    last_report = (await db.execute(
+        select(Report).where(
+            Report.report_number.like(f"RPT-{current_year}-%")
+        ).order_by(Report.report_number.desc())
+    )).scalars().first()
     
     if last_report:
         # Extract the number part and increment
@@ -85,12 +108,15 @@ def format_report_response(report: Report) -> dict:
 @router.post("/", response_model=ReportResponse, status_code=status.HTTP_201_CREATED)
 async def create_report(
     report: ReportCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Generate a new report from a result entry"""
     # Verify result entry exists and is committed
-    result_entry = db.query(ResultEntry).filter(ResultEntry.id == report.result_entry_id).first()
+    result_entry = (await db.execute(
+        RESULT_ENTRY_REPORT_DATA.select()
+        .where(ResultEntry.id == report.result_entry_id)
+    )).scalar_one_or_none()
     if result_entry is None:
         raise HTTPException(status_code=404, detail="Result entry not found")
     
@@ -98,15 +124,17 @@ async def create_report(
         raise HTTPException(status_code=400, detail="Cannot generate report from uncommitted result entry")
     
     # Check if a proposed report already exists
-    existing = db.query(Report).filter(
-        Report.result_entry_id == report.result_entry_id,
-        Report.status == ReportStatus.PROPOSED
-    ).first()
+    existing = (await db.execute(
+        select(Report).where(
+            Report.result_entry_id == report.result_entry_id,
+            Report.status == ReportStatus.PROPOSED
+        )
+    )).scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="An amended report already exists for this result entry")
     
     # Generate report number
-    report_number = generate_report_number(db)
+    report_number = await generate_report_number(db)
     
     # Build report data structure
     sample = result_entry.sample
@@ -168,41 +196,45 @@ async def create_report(
         notes=report.notes,
     )
     db.add(db_report)
-    db.commit()
-    db.refresh(db_report)
+    await db.commit()
+    db_report = await get_report_for_response(db, Report.id == db_report.id)
     
     return format_report_response(db_report)
 
 @router.get("/proposed", response_model=List[ReportResponse])
 async def get_proposed_reports(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_lab_admin_or_manager)
 ):
     """Get all amended reports (manager/admin only)"""
-    reports = db.query(Report).filter(Report.status == ReportStatus.PROPOSED).order_by(Report.generated_at.desc()).all()
+    reports = (await db.execute(
+        REPORT_RESPONSE.select()
+        .where(Report.status == ReportStatus.PROPOSED)
+        .order_by(Report.generated_at.desc())
+    )).scalars().all()
     return [format_report_response(r) for r in reports]
 
 @router.get("/finalized", response_model=List[ReportResponse])
 async def get_finalized_reports(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all finalized and validated reports"""
-    reports = db.query(Report).filter(
-        Report.status.in_([ReportStatus.FINALIZED, ReportStatus.VALIDATED])
-    ).order_by(
-        func.coalesce(Report.finalized_at, Report.validated_at, Report.generated_at).desc()
-    ).all()
+    reports = (await db.execute(
+        REPORT_RESPONSE.select()
+        .where(Report.status.in_([ReportStatus.FINALIZED, ReportStatus.VALIDATED]))
+        .order_by(func.coalesce(Report.finalized_at, Report.validated_at, Report.generated_at).desc())
+    )).scalars().all()
     return [format_report_response(r) for r in reports]
 
 @router.get("/{report_id}", response_model=ReportWithDetails)
 async def get_report(
     report_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific report with full details"""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = await get_report_for_response(db, Report.id == report_id, detail=True)
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
@@ -238,11 +270,11 @@ async def get_report(
 @router.post("/{report_id}/validate", response_model=ReportResponse)
 async def validate_report(
     report_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_lab_admin_or_manager)
 ):
     """Validate and finalize an amended report (manager/admin only)"""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = (await db.execute(select(Report).where(Report.id == report_id))).scalar_one_or_none()
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
@@ -256,19 +288,19 @@ async def validate_report(
     report.finalized_at = datetime.now(timezone.utc)
     report.finalized_by_id = current_user.id
     
-    db.commit()
-    db.refresh(report)
+    await db.commit()
+    report = await get_report_for_response(db, Report.id == report_id)
     
     return format_report_response(report)
 
 @router.post("/{report_id}/finalize", response_model=ReportResponse)
 async def finalize_report(
     report_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_lab_admin_or_manager)
 ):
     """Finalize a validated report (manager/admin only)"""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = (await db.execute(select(Report).where(Report.id == report_id))).scalar_one_or_none()
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
@@ -279,30 +311,29 @@ async def finalize_report(
     report.finalized_at = datetime.now(timezone.utc)
     report.finalized_by_id = current_user.id
     
-    db.commit()
-    db.refresh(report)
+    await db.commit()
+    report = await get_report_for_response(db, Report.id == report_id)
     
     return format_report_response(report)
 
 @router.get("/{report_id}/document", response_class=HTMLResponse)
 async def get_report_document(
     report_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get report as HTML document for viewing/downloading"""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = await get_report_for_response(db, Report.id == report_id)
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
     # Use the shared HTML generation function
-    html_content = generate_report_html(report, db)
+    html_content = generate_report_html(report, await get_organization(db))
     return HTMLResponse(content=html_content)
 
-def generate_report_html(report: Report, db: Session) -> str:
+def generate_report_html(report: Report, org: Optional[Organization]) -> str:
     """Generate HTML content for report (used for both viewing and PDF generation)"""
     # Get organization details
-    org = db.query(Organization).first()
     org_name = org.name if org else "Atlas Lab"
     org_address = org.address if org else ""
     org_phone = org.phone if org else ""
@@ -638,19 +669,19 @@ def generate_report_html(report: Report, db: Session) -> str:
 @router.get("/{report_id}/pdf")
 async def get_report_pdf(
     report_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get report as PDF file"""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = await get_report_for_response(db, Report.id == report_id)
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
     # Generate HTML
-    html_content = generate_report_html(report, db)
+    html_content = generate_report_html(report, await get_organization(db))
     
     # Convert HTML to PDF
-    pdf_bytes = HTML(string=html_content).write_pdf()
+    pdf_bytes = await run_blocking("render", render_report_pdf, html_content)
     
     # Return PDF as file response
     return Response(
@@ -664,11 +695,11 @@ async def get_report_pdf(
 @router.post("/{report_id}/send-to-customer", response_model=ReportResponse)
 async def send_report_to_customer(
     report_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_lab_admin_or_manager)
 ):
     """Send report to customer via email with view key"""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = await get_report_for_response(db, Report.id == report_id)
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
@@ -685,11 +716,11 @@ async def send_report_to_customer(
     if not report.view_key:
         view_key = generate_view_key()
         # Ensure uniqueness
-        while db.query(Report).filter(Report.view_key == view_key).first():
+        while (await db.execute(select(Report.id).where(Report.view_key == view_key))).first():
             view_key = generate_view_key()
         report.view_key = view_key
-        db.commit()
-        db.refresh(report)
+        await db.commit()
+        report = await get_report_for_response(db, Report.id == report_id)
     # If view_key already exists, we'll just resend with the existing key
     
     # Parse report data
@@ -701,13 +732,12 @@ async def send_report_to_customer(
             report_data = {}
     
     # Generate PDF
-    html_content = generate_report_html(report, db)
-    pdf_bytes = HTML(string=html_content).write_pdf()
+    org = await get_organization(db)
+    html_content = generate_report_html(report, org)
+    pdf_bytes = await run_blocking("render", render_report_pdf, html_content)
     
     # Send email with PDF attachment
-    from services.email_service import send_report_email
-    from models.organization import Organization
-    org = db.query(Organization).first()
+    from services.email_service import send_report_email, send_with_own_session
     org_name = org.name if org else "Atlas Lab"
     
     # Get public URL (you'll need to configure this)
@@ -715,7 +745,10 @@ async def send_report_to_customer(
     sample_id = report_data.get('sample_id', '') or (sample.sample_id if sample else '')
     view_url = f"{public_url}/view-report?sample_id={sample_id}&view_key={report.view_key}"
     
-    success = send_report_email(
+    success = await run_blocking(
+        "email",
+        send_with_own_session,
+        send_report_email,
         to_email=customer.email,
         customer_name=customer.full_name,
         sample_id=report_data.get('sample_id', ''),
@@ -724,8 +757,7 @@ async def send_report_to_customer(
         view_url=view_url,
         pdf_bytes=pdf_bytes,
         report_filename=f"{report.report_number}.pdf",
-        org_name=org_name,
-        db=db
+        org_name=org_name
     )
     
     if not success:
@@ -737,23 +769,24 @@ async def send_report_to_customer(
 async def get_public_report(
     sample_id: str = Query(..., description="Sample ID"),
     view_key: str = Query(..., description="View key"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Public endpoint to view report by sample ID and view key"""
     # Find report by sample ID and view key
-    sample = db.query(Sample).filter(Sample.sample_id == sample_id).first()
+    sample = (await db.execute(select(Sample).where(Sample.sample_id == sample_id))).scalar_one_or_none()
     if sample is None:
         raise HTTPException(status_code=404, detail="Sample not found")
     
-    result_entry = db.query(ResultEntry).filter(ResultEntry.sample_id == sample.id).first()
+    result_entry = (await db.execute(select(ResultEntry).where(ResultEntry.sample_id == sample.id))).scalars().first()
     if result_entry is None:
         raise HTTPException(status_code=404, detail="Result entry not found")
     
-    report = db.query(Report).filter(
+    report = await get_report_for_response(
+        db,
         Report.result_entry_id == result_entry.id,
         Report.view_key == view_key,
         Report.status == ReportStatus.FINALIZED
-    ).first()
+    )
     
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found or invalid view key")
@@ -772,21 +805,22 @@ async def get_public_report(
 async def get_public_report_pdf(
     report_id: int,
     view_key: str = Query(..., description="View key"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Public endpoint to download report PDF by view key"""
-    report = db.query(Report).filter(
+    report = await get_report_for_response(
+        db,
         Report.id == report_id,
         Report.view_key == view_key,
         Report.status == ReportStatus.FINALIZED
-    ).first()
+    )
     
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found or invalid view key")
     
     # Generate PDF
-    html_content = generate_report_html(report, db)
-    pdf_bytes = HTML(string=html_content).write_pdf()
+    html_content = generate_report_html(report, await get_organization(db))
+    pdf_bytes = await run_blocking("render", render_report_pdf, html_content)
     
     return Response(
         content=pdf_bytes,
@@ -799,19 +833,19 @@ async def get_public_report_pdf(
 @router.delete("/{report_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_report(
     report_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_lab_admin_or_manager)
 ):
     """Delete a report (only amended reports can be deleted)"""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = (await db.execute(select(Report).where(Report.id == report_id))).scalar_one_or_none()
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
     if report.status != ReportStatus.PROPOSED:
         raise HTTPException(status_code=400, detail="Only amended reports can be deleted")
     
-    db.delete(report)
-    db.commit()
+    await db.delete(report)
+    await db.commit()
     
     return None
 
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_, func
 from typing import List, Optional
-from database import get_db
+from database import get_async_db
+from services.loader_profiles import RESULT_ENTRY_RESPONSE
 from models.result_entry import ResultEntry, ResultValue
 from models.sample import Sample
+from models.sample_card import SampleCard
 from models.sample_activity import SampleActivity
 from models.user import User
 from schemas.result_entry import (
@@ -18,6 +20,20 @@ import json
 
 router = APIRouter(prefix="/api/result-entries", tags=["result-entries"])
 
+async def get_result_entry_for_response(db: AsyncSession, result_entry_id: int) -> Optional[ResultEntry]:
+    """Load a result entry with everything format_result_entry_response needs"""
+    result = await db.execute(
+        RESULT_ENTRY_RESPONSE.select()
+        .where(ResultEntry.id == result_entry_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+async def load_result_entry(db: AsyncSession, result_entry_id: int) -> Optional[ResultEntry]:
+    """Load a result entry without its relationships"""
+    result = await db.execute(select(ResultEntry).where(ResultEntry.id == result_entry_id))
+    return result.scalar_one_or_none()
+
 def format_result_entry_response(result_entry: ResultEntry) -> dict:
     """Format result entry response with related data"""
     return {
@@ -53,7 +69,7 @@ def format_result_entry_response(result_entry: ResultEntry) -> dict:
 @router.get("/search", response_model=List[ResultEntryWithSample])
 async def search_result_entries(
     q: str = Query(..., description="Search query (sample ID, name)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Search for result entries by sample ID or name"""
@@ -65,24 +81,30 @@ async def search_result_entries(
     search_pattern = f"%{search_term_escaped}%"
     search_pattern_upper = search_pattern.upper()
     
-    query = db.query(ResultEntry).join(Sample)
+    # Customer, project and sample type names come from the sample's card; it is outer joined so an
+    # entry whose card is missing (until scripts/rebuild_sample_cards.py runs) is still found
+    query = (
+        RESULT_ENTRY_RESPONSE.select()
+        .add_columns(SampleCard)
+        .join(Sample, Sample.id == ResultEntry.sample_id)
+        .outerjoin(SampleCard, SampleCard.id == ResultEntry.sample_id)
+    )
     
     conditions = [
         func.upper(Sample.sample_id).like(search_pattern_upper),
         func.upper(Sample.name).like(search_pattern_upper),
     ]
     
-    query = query.filter(or_(*conditions))
+    query = query.where(or_(*conditions))
     
-    result_entries = query.distinct().limit(50).all()
+    rows = (await db.execute(query.limit(50))).all()
     
     formatted_results = []
-    for entry in result_entries:
+    for entry, card in rows:
         data = format_result_entry_response(entry)
-        if entry.sample:
-            data["customer_name"] = entry.sample.customer.full_name if entry.sample.customer else ""
-            data["project_name"] = entry.sample.project.name if entry.sample.project else None
-            data["sample_type_name"] = entry.sample.sample_type.name if entry.sample.sample_type else ""
+        data["customer_name"] = (card.customer_name if card else None) or ""
+        data["project_name"] = card.project_name if card else None
+        data["sample_type_name"] = (card.sample_type_name if card else None) or ""
         formatted_results.append(data)
     
     return formatted_results
@@ -90,11 +112,13 @@ async def search_result_entries(
 @router.get("/sample/{sample_id}", response_model=Optional[ResultEntryResponse])
 async def get_result_entry_by_sample(
     sample_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get result entry for a specific sample"""
-    result_entry = db.query(ResultEntry).filter(ResultEntry.sample_id == sample_id).first()
+    result_entry = (await db.execute(
+        RESULT_ENTRY_RESPONSE.select().where(ResultEntry.sample_id == sample_id)
+    )).scalars().first()
     if result_entry is None:
         return None
     
@@ -103,11 +127,11 @@ async def get_result_entry_by_sample(
 @router.get("/{result_entry_id}", response_model=ResultEntryResponse)
 async def get_result_entry(
     result_entry_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific result entry"""
-    result_entry = db.query(ResultEntry).filter(ResultEntry.id == result_entry_id).first()
+    result_entry = await get_result_entry_for_response(db, result_entry_id)
     if result_entry is None:
         raise HTTPException(status_code=404, detail="Result entry not found")
     
@@ -116,17 +140,19 @@ async def get_result_entry(
 @router.post("/", response_model=ResultEntryResponse, status_code=status.HTTP_201_CREATED)
 async def create_result_entry(
     result_entry: ResultEntryCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new result entry for a sample"""
     # Verify sample exists
-    sample = db.query(Sample).filter(Sample.id == result_entry.sample_id).first()
+    sample = (await db.execute(select(Sample).where(Sample.id == result_entry.sample_id))).scalar_one_or_none()
     if sample is None:
         raise HTTPException(status_code=404, detail="Sample not found")
     
     # Check if result entry already exists for this sample
-    existing = db.query(ResultEntry).filter(ResultEntry.sample_id == result_entry.sample_id).first()
+    existing = (await db.execute(
+        select(ResultEntry).where(ResultEntry.sample_id == result_entry.sample_id)
+    )).scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="Result entry already exists for this sample")
     
@@ -137,7 +163,7 @@ async def create_result_entry(
         notes=result_entry.notes,
     )
     db.add(db_result_entry)
-    db.flush()
+    await db.flush()
     
     # Create activity log
     activity = SampleActivity(
@@ -151,8 +177,8 @@ async def create_result_entry(
     )
     db.add(activity)
     
-    db.commit()
-    db.refresh(db_result_entry)
+    await db.commit()
+    db_result_entry = await get_result_entry_for_response(db, db_result_entry.id)
     
     return format_result_entry_response(db_result_entry)
 
@@ -161,11 +187,11 @@ async def add_result_value(
     result_entry_id: int,
     result_value: ResultValueCreate,
     reason: Optional[str] = Query(None, description="Reason for adding this result (required for managers/admins editing committed sheets)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Add a result value to a result entry"""
-    result_entry = db.query(ResultEntry).filter(ResultEntry.id == result_entry_id).first()
+    result_entry = await load_result_entry(db, result_entry_id)
     if result_entry is None:
         raise HTTPException(status_code=404, detail="Result entry not found")
     
@@ -189,7 +215,7 @@ async def add_result_value(
         notes=result_value.notes,
     )
     db.add(db_result_value)
-    db.flush()
+    await db.flush()
     
     # Create activity log
     activity_description = f"Result value added: {result_value.test_type} = {result_value.value}"
@@ -213,8 +239,8 @@ async def add_result_value(
     )
     db.add(activity)
     
-    db.commit()
-    db.refresh(db_result_value)
+    await db.commit()
+    await db.refresh(db_result_value)
     
     return {
         "id": db_result_value.id,
@@ -234,18 +260,20 @@ async def update_result_value(
     value_id: int,
     result_value: ResultValueUpdate,
     reason: str = Query(..., description="Reason for editing this result (required)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_lab_admin_or_manager)
 ):
     """Update a result value (only managers/admins)"""
-    result_entry = db.query(ResultEntry).filter(ResultEntry.id == result_entry_id).first()
+    result_entry = await load_result_entry(db, result_entry_id)
     if result_entry is None:
         raise HTTPException(status_code=404, detail="Result entry not found")
     
-    db_result_value = db.query(ResultValue).filter(
-        ResultValue.id == value_id,
-        ResultValue.result_entry_id == result_entry_id
-    ).first()
+    db_result_value = (await db.execute(
+        select(ResultValue).where(
+            ResultValue.id == value_id,
+            ResultValue.result_entry_id == result_entry_id
+        )
+    )).scalar_one_or_none()
     if db_result_value is None:
         raise HTTPException(status_code=404, detail="Result value not found")
     
@@ -285,8 +313,8 @@ async def update_result_value(
         )
         db.add(activity)
     
-    db.commit()
-    db.refresh(db_result_value)
+    await db.commit()
+    await db.refresh(db_result_value)
     
     return {
         "id": db_result_value.id,
@@ -305,18 +333,20 @@ async def delete_result_value(
     result_entry_id: int,
     value_id: int,
     reason: str = Query(..., description="Reason for deleting this result (required)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_lab_admin_or_manager)
 ):
     """Delete a result value (only managers/admins)"""
-    result_entry = db.query(ResultEntry).filter(ResultEntry.id == result_entry_id).first()
+    result_entry = await load_result_entry(db, result_entry_id)
     if result_entry is None:
         raise HTTPException(status_code=404, detail="Result entry not found")
     
-    db_result_value = db.query(ResultValue).filter(
-        ResultValue.id == value_id,
-        ResultValue.result_entry_id == result_entry_id
-    ).first()
+    db_result_value = (await db.execute(
+        select(ResultValue).where(
+            ResultValue.id == value_id,
+            ResultValue.result_entry_id == result_entry_id
+        )
+    )).scalar_one_or_none()
     if db_result_value is None:
         raise HTTPException(status_code=404, detail="Result value not found")
     
@@ -345,19 +375,19 @@ async def delete_result_value(
     )
     db.add(activity)
     
-    db.delete(db_result_value)
-    db.commit()
+    await db.delete(db_result_value)
+    await db.commit()
     
     return None
 
 @router.post("/{result_entry_id}/commit", response_model=ResultEntryResponse)
 async def commit_result_entry(
     result_entry_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Commit/finalize a result entry"""
-    result_entry = db.query(ResultEntry).filter(ResultEntry.id == result_entry_id).first()
+    result_entry = await get_result_entry_for_response(db, result_entry_id)
     if result_entry is None:
         raise HTTPException(status_code=404, detail="Result entry not found")
     
@@ -387,8 +417,8 @@ async def commit_result_entry(
     )
     db.add(activity)
     
-    db.commit()
-    db.refresh(result_entry)
+    await db.commit()
+    result_entry = await get_result_entry_for_response(db, result_entry_id)
     
     return format_result_entry_response(result_entry)
 
@@ -396,11 +426,11 @@ async def commit_result_entry(
 async def delete_result_entry(
     result_entry_id: int,
     reason: str = Query(..., description="Reason for deleting this result entry (required)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_lab_admin_or_manager)
 ):
     """Delete a result entry (only managers/admins)"""
-    result_entry = db.query(ResultEntry).filter(ResultEntry.id == result_entry_id).first()
+    result_entry = await load_result_entry(db, result_entry_id)
     if result_entry is None:
         raise HTTPException(status_code=404, detail="Result entry not found")
     
@@ -420,8 +450,8 @@ async def delete_result_entry(
     )
     db.add(activity)
     
-    db.delete(result_entry)
-    db.commit()
+    await db.delete(result_entry)
+    await db.commit()
     
     return None
 
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
+from services.blocking_pool import offload
 from models.sample_type import SampleType
 from models.user import User
 from schemas.sample_type import SampleTypeCreate, SampleTypeUpdate, SampleTypeResponse
@@ -11,7 +12,8 @@ from routes.settings import require_lab_admin_or_manager
 router = APIRouter(prefix="/api/sample-types", tags=["sample-types"])
 
 @router.get("/", response_model=List[SampleTypeResponse])
-async def get_sample_types(
+@offload("db")
+def get_sample_types(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -20,7 +22,8 @@ async def get_sample_types(
     return sample_types
 
 @router.post("/", response_model=SampleTypeResponse, status_code=status.HTTP_201_CREATED)
-async def create_sample_type(
+@offload("db")
+def create_sample_type(
     sample_type: SampleTypeCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -38,7 +41,8 @@ async def create_sample_type(
     return db_sample_type
 
 @router.put("/{sample_type_id}", response_model=SampleTypeResponse)
-async def update_sample_type(
+@offload("db")
+def update_sample_type(
     sample_type_id: int,
     sample_type: SampleTypeUpdate,
     db: Session = Depends(get_db),
@@ -58,7 +62,8 @@ async def update_sample_type(
     return db_sample_type
 
 @router.delete("/{sample_type_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_sample_type(
+@offload("db")
+def delete_sample_type(
     sample_type_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Optional
-from database import get_db
+from database import get_async_db
+from services.blocking_pool import run_blocking
+from services.loader_profiles import SAMPLE_RESPONSE, SAMPLE_ACTIVITY
+from models.sample_card import SampleCard
 from models.sample import Sample
 from models.customer import Customer
 from models.project import Project
@@ -14,19 +17,30 @@ from models.sample_activity import SampleActivity
 from schemas.sample import SampleCreate, SampleUpdate, SampleResponse
 from routes.auth import get_current_user
 from utils.sample_id_generator import generate_sample_id
-import re
 import json
-from Levenshtein import distance as levenshtein_distance
 
 router = APIRouter(prefix="/api/samples", tags=["samples"])
 
+async def get_sample_for_response(db: AsyncSession, sample_id: int) -> Optional[Sample]:
+    """Load a sample with everything format_sample_response needs"""
+    result = await db.execute(
+        SAMPLE_RESPONSE.select()
+        .where(Sample.id == sample_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
 @router.get("/search", response_model=List[SampleResponse])
 async def search_samples(
     q: str = Query(..., description="Search query (sample ID, name, customer name)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Enhanced search for samples with case-insensitive partial matching"""
+    """Enhanced search for samples with case-insensitive partial matching.
+
+    Matches the sample ID and name, the customer's name, email, company and code,
+    the project name and the sample type name, all held in the sample's card.
+    """
     if not q or len(q.strip()) == 0:
         return []
     
@@ -37,35 +51,12 @@ async def search_samples(
     # Create pattern for partial matching (contains)
     search_pattern = f"%{search_term_escaped}%"
     
-    # Build query with case-insensitive LIKE matching
-    query = db.query(Sample).join(Customer).outerjoin(Project).outerjoin(SampleType)
-    
-    # Case-insensitive search across multiple fields
-    # Use UPPER() on field and apply UPPER() to the pattern string
-    search_pattern_upper = search_pattern.upper()
-    conditions = [
-        func.upper(Sample.sample_id).like(search_pattern_upper),
-        func.upper(Sample.name).like(search_pattern_upper),
-        func.upper(Customer.full_name).like(search_pattern_upper),
-        func.upper(Customer.email).like(search_pattern_upper),
-        func.upper(Customer.company_name).like(search_pattern_upper),
-        func.upper(Customer.customer_id).like(search_pattern_upper),  # Customer code
-        func.upper(Project.name).like(search_pattern_upper),
-        func.upper(SampleType.name).like(search_pattern_upper),
-    ]
+    # The card's search text holds every searchable field upper-cased, so one LIKE covers them all
+    cards = (await db.execute(
+        select(SampleCard).where(SampleCard.search_text.like(search_pattern.upper())).limit(50)
+    )).scalars().all()
     
-    # Apply OR condition for all search fields
-    query = query.filter(or_(*conditions))
-    
-    # Get results and remove duplicates
-    samples = query.distinct().limit(50).all()
-    
-    # Format results
-    formatted_results = []
-    for sample in samples:
-        formatted_results.append(format_sample_response(sample))
-    
-    return formatted_results
+    return [format_sample_card(card) for card in cards]
 
 @router.get("/", response_model=List[SampleResponse])
 async def get_samples(
@@ -73,35 +64,37 @@ async def get_samples(
     limit: int = 100,
     customer_id: Optional[int] = Query(None),
     project_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all samples, optionally filtered"""
-    query = db.query(Sample)
+    """Get all samples, optionally filtered (read from the sample cards)"""
+    query = select(SampleCard)
     
     if customer_id:
-        query = query.filter(Sample.customer_id == customer_id)
+        query = query.where(SampleCard.customer_id == customer_id)
     if project_id:
-        query = query.filter(Sample.project_id == project_id)
+        query = query.where(SampleCard.project_id == project_id)
     
-    samples = query.offset(skip).limit(limit).all()
-    return [format_sample_response(sample) for sample in samples]
+    cards = (await db.execute(query.offset(skip).limit(limit))).scalars().all()
+    return [format_sample_card(card) for card in cards]
 
 @router.get("/{sample_id}/details")
 async def get_sample_details(
     sample_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get detailed sample information with activity tracking"""
-    sample = db.query(Sample).filter(Sample.id == sample_id).first()
+    sample = await get_sample_for_response(db, sample_id)
     if sample is None:
         raise HTTPException(status_code=404, detail="Sample not found")
     
     # Get all activities for this sample, ordered by creation date
-    activities = db.query(SampleActivity).filter(
-        SampleActivity.sample_id == sample_id
-    ).order_by(SampleActivity.created_at.desc()).all()
+    activities = (await db.execute(
+        SAMPLE_ACTIVITY.select()
+        .where(SampleActivity.sample_id == sample_id)
+        .order_by(SampleActivity.created_at.desc())
+    )).scalars().all()
     
     # Format activities
     formatted_activities = []
@@ -141,11 +134,11 @@ async def get_sample_details(
 @router.get("/{sample_id}", response_model=SampleResponse)
 async def get_sample(
     sample_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific sample"""
-    sample = db.query(Sample).filter(Sample.id == sample_id).first()
+    sample = await get_sample_for_response(db, sample_id)
     if sample is None:
         raise HTTPException(status_code=404, detail="Sample not found")
     
@@ -154,46 +147,48 @@ async def get_sample(
 @router.post("/", response_model=SampleResponse, status_code=status.HTTP_201_CREATED)
 async def create_sample(
     sample: SampleCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new sample"""
     # Verify customer exists
-    customer = db.query(Customer).filter(Customer.id == sample.customer_id).first()
+    customer = (await db.execute(select(Customer).where(Customer.id == sample.customer_id))).scalar_one_or_none()
     if customer is None:
         raise HTTPException(status_code=404, detail="Customer not found")
     
     # Verify project if provided
     if sample.project_id:
-        project = db.query(Project).filter(Project.id == sample.project_id).first()
+        project = (await db.execute(select(Project).where(Project.id == sample.project_id))).scalar_one_or_none()
         if project is None:
             raise HTTPException(status_code=404, detail="Project not found")
     
     # Verify sample type
-    sample_type = db.query(SampleType).filter(SampleType.id == sample.sample_type_id).first()
+    sample_type = (await db.execute(select(SampleType).where(SampleType.id == sample.sample_type_id))).scalar_one_or_none()
     if sample_type is None:
         raise HTTPException(status_code=404, detail="Sample type not found")
     
     # Generate unique sample ID
-    sample_id = generate_sample_id(db)
+    sample_id = await generate_sample_id(db)
     
     # Create sample
     sample_data = sample.model_dump(exclude={'department_ids', 'test_type_ids'})
     sample_data['sample_id'] = sample_id
     
-    db_sample = Sample(**sample_data)
-    db.add(db_sample)
-    db.flush()  # Flush to get the ID
-    
-    # Add departments
+    # Add departments (assigned before the flush so the empty collections are never lazy loaded)
     if sample.department_ids:
-        departments = db.query(Department).filter(Department.id.in_(sample.department_ids)).all()
-        db_sample.departments = departments
+        sample_data['departments'] = list((await db.execute(
+            select(Department).where(Department.id.in_(sample.department_ids))
+        )).scalars().all())
     
     # Add test types (only from selected departments)
     if sample.test_type_ids:
-        test_types = db.query(TestType).filter(TestType.id.in_(sample.test_type_ids)).all()
-        db_sample.test_types = test_types
+        sample_data['test_types'] = list((await db.execute(
+            select(TestType).where(TestType.id.in_(sample.test_type_ids))
+        )).scalars().all())
+    
+    db_sample = Sample(**sample_data)
+    db.add(db_sample)
+    await db.flush()  # Flush to get the ID
     
     # Create activity log entry for sample creation
     activity = SampleActivity(
@@ -210,27 +205,29 @@ async def create_sample(
     )
     db.add(activity)
     
-    db.commit()
-    db.refresh(db_sample)
+    await db.commit()
+    db_sample = await get_sample_for_response(db, db_sample.id)
     
     # Send email notification to customer
     if customer.email:
         from datetime import datetime
-        from services.email_service import send_sample_collection_email
+        from services.email_service import send_sample_collection_email, send_with_own_session
         
         # Format collection timestamp
         collected_at = datetime.now().strftime("%B %d, %Y at %I:%M %p")
         
         # Send email (non-blocking - don't fail sample creation if email fails)
         try:
-            send_sample_collection_email(
+            await run_blocking(
+                "email",
+                send_with_own_session,
+                send_sample_collection_email,
                 to_email=customer.email,
                 customer_name=customer.full_name,
                 sample_id=sample_id,
                 sample_name=db_sample.name,
                 collected_by=current_user.full_name,
-                collected_at=collected_at,
-                db=db
+                collected_at=collected_at
             )
         except Exception as e:
             # Log error but don't fail the sample creation
@@ -242,11 +239,11 @@ async def create_sample(
 async def update_sample(
     sample_id: int,
     sample: SampleUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a sample"""
-    db_sample = db.query(Sample).filter(Sample.id == sample_id).first()
+    db_sample = await get_sample_for_response(db, sample_id)
     if db_sample is None:
         raise HTTPException(status_code=404, detail="Sample not found")
     
@@ -256,13 +253,17 @@ async def update_sample(
     
     # Update departments if provided
     if sample.department_ids is not None:
-        departments = db.query(Department).filter(Department.id.in_(sample.department_ids)).all()
-        db_sample.departments = departments
+        departments = (await db.execute(
+            select(Department).where(Department.id.in_(sample.department_ids))
+        )).scalars().all()
+        db_sample.departments = list(departments)
     
     # Update test types if provided
     if sample.test_type_ids is not None:
-        test_types = db.query(TestType).filter(TestType.id.in_(sample.test_type_ids)).all()
-        db_sample.test_types = test_types
+        test_types = (await db.execute(
+            select(TestType).where(TestType.id.in_(sample.test_type_ids))
+        )).scalars().all()
+        db_sample.test_types = list(test_types)
     
     # Create activity log entry for sample update
     changes = []
@@ -282,24 +283,24 @@ async def update_sample(
         )
         db.add(activity)
     
-    db.commit()
-    db.refresh(db_sample)
+    await db.commit()
+    db_sample = await get_sample_for_response(db, db_sample.id)
     
     return format_sample_response(db_sample)
 
 @router.delete("/{sample_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_sample(
     sample_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a sample"""
-    db_sample = db.query(Sample).filter(Sample.id == sample_id).first()
+    db_sample = (await db.execute(select(Sample).where(Sample.id == sample_id))).scalar_one_or_none()
     if db_sample is None:
         raise HTTPException(status_code=404, detail="Sample not found")
     
-    db.delete(db_sample)
-    db.commit()
+    await db.delete(db_sample)
+    await db.commit()
     return None
 
 def format_sample_response(sample: Sample) -> dict:
@@ -328,3 +329,28 @@ def format_sample_response(sample: Sample) -> dict:
         "test_type_names": [test.name for test in sample.test_types],
     }
 
+def format_sample_card(card: SampleCard) -> dict:
+    """Format sample response from the sample's card (same fields as format_sample_response)"""
+    return {
+        "id": card.id,
+        "sample_id": card.sample_code,
+        "customer_id": card.customer_id,
+        "project_id": card.project_id,
+        "sample_type_id": card.sample_type_id,
+        "name": card.name,
+        "volume": card.volume,
+        "conditions": card.conditions,
+        "notes": card.notes,
+        "is_batch": card.is_batch,
+        "batch_size": card.batch_size,
+        "status": card.status,
+        "created_at": card.created_at,
+        "updated_at": card.updated_at,
+        "customer_name": card.customer_name or "",
+        "customer_email": card.customer_email,
+        "customer_phone": card.customer_phone,
+        "project_name": card.project_name,
+        "sample_type_name": card.sample_type_name or "",
+        "department_names": json.loads(card.department_names),
+        "test_type_names": json.loads(card.test_type_names),
+    }
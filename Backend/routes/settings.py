@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import json
 import os
-from database import get_db
+from database import get_db, get_async_db
+from services.blocking_pool import offload
 from models.user import User, UserType
 from models.organization import Organization
 from models.integration import Integration
@@ -11,9 +13,11 @@ from schemas.organization import OrganizationResponse, OrganizationUpdate
 from schemas.integration import IntegrationResponse, IntegrationUpdate
 from schemas.user import UserResponse, UserCreate
 from routes.auth import get_current_user
-from auth import get_password_hash
+from services.password_hashing import hash_password_bounded
 from utils.password_generator import generate_temp_password
 from services.email_service import send_welcome_email
+from services.user_cache import user_cache
+from services.integration_registry import integration_registry
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
@@ -34,7 +38,8 @@ async def get_account(current_user: User = Depends(get_current_user)):
 
 # Organization endpoints (lab admin and manager only)
 @router.get("/organization", response_model=OrganizationResponse)
-async def get_organization(
+@offload("db")
+def get_organization(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
 ):
@@ -49,7 +54,8 @@ async def get_organization(
     return org
 
 @router.put("/organization", response_model=OrganizationResponse)
-async def update_organization(
+@offload("db")
+def update_organization(
     org_data: OrganizationUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -72,7 +78,8 @@ async def update_organization(
 
 # Integration endpoints (lab admin and manager only)
 @router.get("/integrations", response_model=List[IntegrationResponse])
-async def get_integrations(
+@offload("db")
+def get_integrations(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
 ):
@@ -91,26 +98,20 @@ async def get_integrations(
     return result
 
 @router.get("/integrations/public/turnstile")
-async def get_turnstile_public_config(db: Session = Depends(get_db)):
+async def get_turnstile_public_config(db: AsyncSession = Depends(get_async_db)):
     """Public endpoint to get Turnstile site key (for login page)"""
-    turnstile = db.query(Integration).filter(Integration.name == "cloudflare_turnstile").first()
+    turnstile = await integration_registry.get_async(db, "cloudflare_turnstile")
     if not turnstile or not turnstile.enabled:
         return {"enabled": False, "site_key": None}
     
-    config = {}
-    if turnstile.config:
-        try:
-            config = json.loads(turnstile.config) if isinstance(turnstile.config, str) else turnstile.config
-        except (json.JSONDecodeError, TypeError):
-            pass
-    
     return {
         "enabled": True,
-        "site_key": config.get("site_key", "")
+        "site_key": turnstile.get("site_key", "")
     }
 
 @router.get("/integrations/{integration_name}", response_model=IntegrationResponse)
-async def get_integration(
+@offload("db")
+def get_integration(
     integration_name: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -129,7 +130,8 @@ async def get_integration(
     }
 
 @router.put("/integrations/{integration_name}", response_model=IntegrationResponse)
-async def update_integration(
+@offload("db")
+def update_integration(
     integration_name: str,
     integration_data: IntegrationUpdate,
     db: Session = Depends(get_db),
@@ -158,6 +160,8 @@ async def update_integration(
     
     db.commit()
     db.refresh(integration)
+    # Other workers notice the change through the registry's version check
+    integration_registry.invalidate()
     
     # Parse config back to dict for response
     response_data = {
@@ -173,7 +177,8 @@ async def update_integration(
 
 # User Management endpoints (lab admin and manager only)
 @router.get("/users", response_model=List[UserResponse])
-async def get_users(
+@offload("db")
+def get_users(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
@@ -184,7 +189,8 @@ async def get_users(
     return users
 
 @router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(
+@offload("db")
+def create_user(
     user: UserCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -202,7 +208,7 @@ async def create_user(
     
     # Generate temporary password
     temp_password = generate_temp_password()
-    hashed_password = get_password_hash(temp_password)
+    hashed_password = hash_password_bounded(temp_password)
     
     db_user = User(
         email=user.email,
@@ -232,7 +238,8 @@ async def create_user(
     return db_user
 
 @router.put("/users/{user_id}/suspend", response_model=UserResponse)
-async def suspend_user(
+@offload("db")
+def suspend_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -250,11 +257,13 @@ async def suspend_user(
     
     db_user.is_active = False
     db.commit()
+    user_cache.invalidate(user_id)
     db.refresh(db_user)
     return db_user
 
 @router.put("/users/{user_id}/activate", response_model=UserResponse)
-async def activate_user(
+@offload("db")
+def activate_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -266,11 +275,13 @@ async def activate_user(
     
     db_user.is_active = True
     db.commit()
+    user_cache.invalidate(user_id)
     db.refresh(db_user)
     return db_user
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(
+@offload("db")
+def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_lab_admin_or_manager)
@@ -288,5 +299,6 @@ async def delete_user(
     
     db.delete(db_user)
     db.commit()
+    user_cache.invalidate(user_id)
     return None
 
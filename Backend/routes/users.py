@@ -2,15 +2,17 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
+from services.blocking_pool import offload
 from models.user import User, UserType
 from schemas.user import UserCreate, UserResponse
-from auth import get_password_hash
+from services.password_hashing import hash_password_bounded
 from .auth import get_current_user
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 @router.get("/", response_model=List[UserResponse])
-async def get_users(
+@offload("db")
+def get_users(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
@@ -21,7 +23,8 @@ async def get_users(
     return users
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(
+@offload("db")
+def get_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -33,7 +36,8 @@ async def get_user(
     return user
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(
+@offload("db")
+def create_user(
     user: UserCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -45,7 +49,7 @@ async def create_user(
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = hash_password_bounded(user.password)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Script to measure concurrent-request throughput against a running API server.
+Run it before and after a change against the same data set to compare.
+
+Example:
+    python scripts/benchmark_concurrency.py --token $TOKEN --path /api/samples/ --concurrency 50
+
+To see how light endpoints hold up while heavy ones run, add background load:
+    python scripts/benchmark_concurrency.py --token $TOKEN --path /health \
+        --background-path /api/analytics/stats/overview --background-concurrency 8
+
+Or a login burst (each login runs Argon2):
+    python scripts/benchmark_concurrency.py --token $TOKEN --path /api/samples/ \
+        --background-login admin@example.com:password --background-concurrency 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+async def run_background_load(client, paths, stop, login=None):
+    """Keep requesting the heavy paths (or logging in) until stop is set"""
+    i = 0
+    while not stop.is_set():
+        try:
+            if login:
+                await client.post("/api/auth/login", data={"username": login[0], "password": login[1]})
+            else:
+                await client.get(paths[i % len(paths)])
+        except httpx.HTTPError:
+            pass
+        i += 1
+
+async def run_benchmark(base_url, paths, token, concurrency, total_requests,
+                        background_paths=None, background_concurrency=0, background_login=None):
+    """Fire total_requests GETs with at most `concurrency` in flight and collect timings"""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    latencies = []
+    errors = 0
+    counter = iter(range(total_requests))
+    limits = httpx.Limits(max_connections=concurrency + background_concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=60, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                path = paths[i % len(paths)]
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        stop = asyncio.Event()
+        background = [
+            asyncio.create_task(run_background_load(client, background_paths, stop, background_login))
+            for _ in range(background_concurrency if background_paths or background_login else 0)
+        ]
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        await asyncio.gather(*background)
+
+    return latencies, errors, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent request throughput benchmark")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the API server")
+    parser.add_argument("--path", action="append", dest="paths", help="Path to request (repeatable)")
+    parser.add_argument("--token", default=None, help="Bearer token for authenticated endpoints")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once")
+    parser.add_argument("--requests", type=int, default=1000, help="Total number of requests")
+    parser.add_argument("--background-path", action="append", dest="background_paths",
+                        help="Heavy path kept busy while measuring (repeatable)")
+    parser.add_argument("--background-login", default=None, metavar="EMAIL:PASSWORD",
+                        help="Log in repeatedly as this user in the background instead of requesting paths")
+    parser.add_argument("--background-concurrency", type=int, default=4,
+                        help="Background requests in flight at once")
+    args = parser.parse_args()
+
+    paths = args.paths or ["/health"]
+    background_login = tuple(args.background_login.split(":", 1)) if args.background_login else None
+    latencies, errors, elapsed = asyncio.run(
+        run_benchmark(args.url, paths, args.token, args.concurrency, args.requests,
+                      args.background_paths, args.background_concurrency, background_login)
+    )
+
+    print("=== Concurrency Benchmark ===\n")
+    print(f"  Paths:        {', '.join(paths)}")
+    if args.background_paths:
+        print(f"  Background:   {', '.join(args.background_paths)} x{args.background_concurrency}")
+    if background_login:
+        print(f"  Background:   login as {background_login[0]} x{args.background_concurrency}")
+    print(f"  Concurrency:  {args.concurrency}")
+    print(f"  Requests:     {len(latencies)} ({errors} errors)")
+    print(f"  Elapsed:      {elapsed:.2f} s")
+    print(f"  Throughput:   {len(latencies) / elapsed:.1f} req/s")
+    print(f"  Latency mean: {statistics.mean(latencies):.1f} ms")
+    print(f"  Latency p50:  {percentile(latencies, 50):.1f} ms")
+    print(f"  Latency p99:  {percentile(latencies, 99):.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Script to measure streaming export throughput and memory on a synthetic request log.
+Builds a throwaway SQLite database with --rows request_logs, then runs stream_export
+over the whole table as NDJSON, CSV and gzipped NDJSON, reporting rows/s, output size
+and peak Python memory (traced in a second pass, since tracing slows the run down).
+For contrast it also materializes --materialize-rows rows and serializes them in one go,
+the way a single large JSON page is built.
+
+Example:
+    python scripts/benchmark_export.py --rows 2000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+parser = argparse.ArgumentParser(description="Streaming export benchmark")
+parser.add_argument("--rows", type=int, default=2_000_000, help="Synthetic request_logs rows")
+parser.add_argument("--materialize-rows", type=int, default=200_000, help="Rows for the materialized comparison")
+parser.add_argument("--database", default=os.path.join(tempfile.gettempdir(), "atlas_export_benchmark.db"),
+                    help="SQLite file to (re)build")
+args = parser.parse_args()
+
+# Point the app at the throwaway database before anything imports database.py
+os.environ["DATABASE_URL"] = f"sqlite:///{args.database}"
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select
+from database import Base, engine, async_engine
+import models  # noqa: F401 - registers every table on Base.metadata
+from models.request_log import RequestLog, HTTPMethod
+from services.export import ExportFormat, stream_export
+
+STATUS_CODES = [200] * 85 + [201] * 5 + [401] * 4 + [403] * 2 + [404] * 3 + [500]
+PATHS = ["/api/samples/", "/api/customers/", "/api/reports/proposed", "/api/auth/me", "/api/projects/"]
+BATCH_SIZE = 50_000
+
+EXPORT_QUERY = select(
+    RequestLog.id, RequestLog.created_at, RequestLog.method, RequestLog.path, RequestLog.status_code,
+    RequestLog.user_id, RequestLog.ip_address, RequestLog.user_agent, RequestLog.response_time_ms,
+).order_by(RequestLog.created_at, RequestLog.id)
+
+def build_database(rows: int):
+    """Create the schema and fill request_logs with synthetic requests"""
+    if os.path.exists(args.database):
+        os.remove(args.database)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now(timezone.utc)
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        for start in range(0, rows, BATCH_SIZE):
+            conn.execute(insert(RequestLog), [
+                {"user_id": rng.randint(1, 50), "method": HTTPMethod.GET, "path": rng.choice(PATHS),
+                 "status_code": rng.choice(STATUS_CODES), "response_time_ms": rng.randint(1, 400),
+                 "ip_address": f"10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)}",
+                 "user_agent": "Mozilla/5.0 (X11; Linux x86_64) benchmark",
+                 "created_at": now - timedelta(seconds=rng.randint(0, 60 * 60 * 24 * 90))}
+                for _ in range(min(BATCH_SIZE, rows - start))
+            ])
+
+async def consume(export_format: ExportFormat, gzip: bool) -> int:
+    """Drain the export stream like a client would; returns bytes produced"""
+    size = 0
+    async for chunk in stream_export(EXPORT_QUERY, export_format, gzip):
+        size += len(chunk)
+    return size
+
+async def materialize(rows: int) -> int:
+    """Fetch every row, then serialize the whole list at once"""
+    async with async_engine.connect() as conn:
+        result = (await conn.execute(EXPORT_QUERY.limit(rows))).mappings().all()
+    return len(json.dumps([dict(row) for row in result], default=str))
+
+async def measure(func, *func_args) -> tuple:
+    started = time.perf_counter()
+    size = await func(*func_args)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    await func(*func_args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, size, peak
+
+async def run() -> list:
+    results = []
+    for name, export_format, gzip in (
+        ("ndjson", ExportFormat.NDJSON, False),
+        ("csv", ExportFormat.CSV, False),
+        ("ndjson + gzip", ExportFormat.NDJSON, True),
+    ):
+        results.append((f"stream {name}", args.rows, *await measure(consume, export_format, gzip)))
+    rows = min(args.rows, args.materialize_rows)
+    results.append(("materialized json", rows, *await measure(materialize, rows)))
+    await async_engine.dispose()
+    return results
+
+def main():
+    print("=== Export Benchmark ===\n")
+    started = time.perf_counter()
+    build_database(args.rows)
+    print(f"  Built {args.rows} request_logs in {time.perf_counter() - started:.1f} s ({args.database})\n")
+
+    print(f"  {'variant':<20} {'rows':>10} {'rows/s':>10} {'MB/s':>8} {'output MB':>10} {'peak MB':>8}")
+    for name, rows, elapsed, size, peak in asyncio.run(run()):
+        print(f"  {name:<20} {rows:>10} {rows / elapsed:>10.0f} {size / elapsed / 1e6:>8.1f} "
+              f"{size / 1e6:>10.1f} {peak / 1e6:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Script to measure the per-request overhead of the request logging middleware.
+Runs in-process against a trivial endpoint (no server or database needed) and compares:
+  - no middleware
+  - the previous BaseHTTPMiddleware implementation
+  - the current raw ASGI LoggingMiddleware
+
+Log rows are discarded instead of queued for the database so only middleware cost is measured.
+
+Example:
+    python scripts/benchmark_logging_middleware.py --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import middleware.logging_middleware as logging_middleware
+from middleware.logging_middleware import LoggingMiddleware
+
+class DiscardingWriter:
+    """Stands in for request_log_writer so no rows reach the database"""
+
+    def __init__(self):
+        self.rows = 0
+
+    async def enqueue(self, row: dict):
+        self.rows += 1
+
+writer = DiscardingWriter()
+logging_middleware.request_log_writer = writer
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    """The previous implementation: same row, collected around call_next"""
+
+    async def dispatch(self, request, call_next):
+        start_time = time.perf_counter()
+        request_received_at = datetime.now(timezone.utc)
+        response = await call_next(request)
+        response_time_ms = int((time.perf_counter() - start_time) * 1000)
+        await writer.enqueue(LoggingMiddleware.build_row(
+            request.scope, response.status_code, response_time_ms, None, None, request_received_at
+        ))
+        return response
+
+async def ping(request):
+    return PlainTextResponse("ok")
+
+async def stream(request):
+    async def chunks():
+        for _ in range(16):
+            yield b"x" * 4096
+    return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+ROUTES = [Route("/ping", ping), Route("/stream", stream)]
+
+VARIANTS = {
+    "none": [],
+    "base_http": [Middleware(BaseHTTPLoggingMiddleware)],
+    "raw_asgi": [Middleware(LoggingMiddleware)],
+}
+
+async def measure(app, path, total_requests):
+    """Send requests one at a time and return per-request latencies in microseconds"""
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up
+        for _ in range(min(200, total_requests)):
+            await client.get(path)
+        for _ in range(total_requests):
+            start = time.perf_counter()
+            await client.get(path)
+            latencies.append((time.perf_counter() - start) * 1_000_000)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="Request logging middleware overhead benchmark")
+    parser.add_argument("--requests", type=int, default=3000, help="Requests per variant")
+    parser.add_argument("--path", default="/ping", choices=["/ping", "/stream"], help="Endpoint to call")
+    args = parser.parse_args()
+
+    print("=== Logging Middleware Benchmark ===\n")
+    print(f"  Path:     {args.path}")
+    print(f"  Requests: {args.requests} per variant\n")
+
+    baseline = None
+    for name, middleware in VARIANTS.items():
+        app = Starlette(routes=ROUTES, middleware=middleware)
+        latencies = asyncio.run(measure(app, args.path, args.requests))
+        median = statistics.median(latencies)
+        if baseline is None:
+            baseline = median
+        print(f"  {name:<10} median {median:8.1f} us   mean {statistics.mean(latencies):8.1f} us"
+              f"   overhead {median - baseline:7.1f} us")
+
+if __name__ == "__main__":
+    main()
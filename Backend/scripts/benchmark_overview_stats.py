@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Script to compare the cost of the analytics overview queries on a synthetic request log.
+Builds a throwaway SQLite database with --rows request_logs (and a proportional number of
+login_history rows), then times:
+  - the previous approach: one COUNT(*) query per figure (~25 queries)
+  - compute_overview_stats: grouped counts plus conditional aggregates (six queries)
+  - the snapshot cache the endpoint serves from
+
+Example:
+    python scripts/benchmark_overview_stats.py --rows 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+parser = argparse.ArgumentParser(description="Analytics overview query benchmark")
+parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic request_logs rows")
+parser.add_argument("--repeat", type=int, default=3, help="Timed runs per variant")
+parser.add_argument("--database", default=os.path.join(tempfile.gettempdir(), "atlas_overview_benchmark.db"),
+                    help="SQLite file to (re)build")
+args = parser.parse_args()
+
+# Point the app at the throwaway database before anything imports database.py
+os.environ["DATABASE_URL"] = f"sqlite:///{args.database}"
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select, func
+from database import Base, engine, AsyncSessionLocal, async_engine
+import models  # noqa: F401 - registers every table on Base.metadata
+from models.user import User, UserType
+from models.login_history import LoginHistory
+from models.request_log import RequestLog, HTTPMethod
+from models.customer import Customer
+from models.sample import Sample
+from models.project import Project
+from models.result_entry import ResultEntry
+from models.report import Report
+from routes.analytics import compute_overview_stats, overview_stats_cache
+
+STATUS_CODES = [200] * 85 + [201] * 5 + [401] * 4 + [403] * 2 + [404] * 3 + [500]
+PATHS = ["/api/samples/", "/api/customers/", "/api/reports/proposed", "/api/auth/me", "/api/projects/"]
+BATCH_SIZE = 50_000
+
+def build_database(rows: int):
+    """Create the schema and fill it with synthetic users, logins and request logs"""
+    if os.path.exists(args.database):
+        os.remove(args.database)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now(timezone.utc)
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"email": f"user{i}@example.com", "hashed_password": "x", "full_name": f"User {i}",
+             "user_type": rng.choice(list(UserType)), "is_active": i % 10 != 0}
+            for i in range(50)
+        ])
+        conn.execute(insert(LoginHistory), [
+            {"user_id": rng.randint(1, 50), "email": "user@example.com", "success": rng.random() > 0.1,
+             "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))}
+            for _ in range(max(1, rows // 100))
+        ])
+        for start in range(0, rows, BATCH_SIZE):
+            conn.execute(insert(RequestLog), [
+                {"user_id": rng.randint(1, 50), "method": HTTPMethod.GET, "path": rng.choice(PATHS),
+                 "status_code": rng.choice(STATUS_CODES), "response_time_ms": rng.randint(1, 400),
+                 "created_at": now - timedelta(seconds=rng.randint(0, 60 * 60 * 24 * 90))}
+                for _ in range(min(BATCH_SIZE, rows - start))
+            ])
+
+async def count_rows(db, model, *criteria) -> int:
+    return await db.scalar(select(func.count()).select_from(model).where(*criteria))
+
+async def previous_overview_stats(db) -> dict:
+    """The old implementation's queries: one COUNT(*) per figure"""
+    last_24h = datetime.now(timezone.utc) - timedelta(hours=24)
+    counts = [
+        await count_rows(db, User),
+        await count_rows(db, User, User.is_active == True),
+        await count_rows(db, LoginHistory, LoginHistory.success == True),
+        await count_rows(db, LoginHistory, LoginHistory.success == False),
+        await count_rows(db, LoginHistory, LoginHistory.success == True, LoginHistory.created_at >= last_24h),
+        await count_rows(db, LoginHistory, LoginHistory.success == False, LoginHistory.created_at >= last_24h),
+        await count_rows(db, RequestLog),
+        await count_rows(db, RequestLog, RequestLog.created_at >= last_24h),
+    ]
+    for code in (500, 401, 403, 404):
+        counts.append(await count_rows(db, RequestLog, RequestLog.status_code == code))
+        counts.append(await count_rows(db, RequestLog, RequestLog.status_code == code, RequestLog.created_at >= last_24h))
+    for model in (Customer, Sample, Project, ResultEntry, Report):
+        counts.append(await count_rows(db, model))
+    return counts
+
+async def time_variant(func, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await func(db)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+async def time_cache(repeat: int) -> list:
+    await overview_stats_cache.get()  # First load
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await overview_stats_cache.get()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+async def run():
+    results = {
+        "previous (one COUNT per figure)": await time_variant(previous_overview_stats, args.repeat),
+        "grouped + conditional aggregates": await time_variant(compute_overview_stats, args.repeat),
+        "snapshot cache (warm)": await time_cache(args.repeat * 100),
+    }
+    await async_engine.dispose()
+    return results
+
+def main():
+    print("=== Overview Stats Benchmark ===\n")
+    started = time.perf_counter()
+    build_database(args.rows)
+    print(f"  Built {args.rows} request_logs in {time.perf_counter() - started:.1f} s ({args.database})\n")
+
+    for name, timings in asyncio.run(run()).items():
+        print(f"  {name:<34} median {statistics.median(timings):9.2f} ms   max {max(timings):9.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Script to compare OFFSET and keyset (cursor) pagination on a synthetic login history.
+Builds a throwaway SQLite database with --rows login_history rows, then times fetching
+one page at increasing depths with:
+  - the previous approach: ORDER BY created_at DESC OFFSET n LIMIT page
+  - keyset_page: WHERE (created_at, id) < cursor ORDER BY created_at DESC, id DESC LIMIT page
+
+Example:
+    python scripts/benchmark_pagination.py --rows 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+parser = argparse.ArgumentParser(description="OFFSET vs keyset pagination benchmark")
+parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic login_history rows")
+parser.add_argument("--page-size", type=int, default=100, help="Rows per page")
+parser.add_argument("--repeat", type=int, default=5, help="Timed runs per depth")
+parser.add_argument("--database", default=os.path.join(tempfile.gettempdir(), "atlas_pagination_benchmark.db"),
+                    help="SQLite file to (re)build")
+args = parser.parse_args()
+
+# Point the app at the throwaway database before anything imports database.py
+os.environ["DATABASE_URL"] = f"sqlite:///{args.database}"
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select
+from database import Base, engine, AsyncSessionLocal, async_engine
+import models  # noqa: F401 - registers every table on Base.metadata
+from models.login_history import LoginHistory
+from services.pagination import keyset_page, encode_cursor
+
+BATCH_SIZE = 50_000
+
+def build_database(rows: int):
+    """Create the schema and fill login_history with synthetic attempts"""
+    if os.path.exists(args.database):
+        os.remove(args.database)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now(timezone.utc)
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        for start in range(0, rows, BATCH_SIZE):
+            conn.execute(insert(LoginHistory), [
+                {"email": f"user{rng.randint(1, 500)}@example.com", "success": rng.random() > 0.1,
+                 "created_at": now - timedelta(seconds=rng.randint(0, 60 * 60 * 24 * 365))}
+                for _ in range(min(BATCH_SIZE, rows - start))
+            ])
+
+async def offset_page(db, depth: int):
+    return (await db.execute(
+        select(LoginHistory).order_by(LoginHistory.created_at.desc()).offset(depth).limit(args.page_size)
+    )).scalars().all()
+
+async def cursor_at(db, depth: int) -> str | None:
+    """Cursor a client would hold after paging to `depth` (looked up once, not timed)"""
+    if depth == 0:
+        return None
+    row = (await db.execute(
+        select(LoginHistory.created_at, LoginHistory.id)
+        .order_by(LoginHistory.created_at.desc(), LoginHistory.id.desc())
+        .offset(depth - 1).limit(1)
+    )).one()
+    return encode_cursor(row.created_at, row.id)
+
+async def time_call(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await func(db)
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+async def run(depths: list) -> list:
+    results = []
+    for depth in depths:
+        async with AsyncSessionLocal() as db:
+            cursor = await cursor_at(db, depth)
+        offset_ms = await time_call(lambda db: offset_page(db, depth), args.repeat)
+        keyset_ms = await time_call(
+            lambda db: keyset_page(db, select(LoginHistory), LoginHistory.created_at, LoginHistory.id, cursor, args.page_size),
+            args.repeat,
+        )
+        results.append((depth, offset_ms, keyset_ms))
+    await async_engine.dispose()
+    return results
+
+def main():
+    print("=== Pagination Benchmark ===\n")
+    started = time.perf_counter()
+    build_database(args.rows)
+    print(f"  Built {args.rows} login_history rows in {time.perf_counter() - started:.1f} s ({args.database})\n")
+
+    depths = [depth for depth in (0, 1_000, 10_000, 100_000, 500_000, args.rows - args.page_size) if depth < args.rows]
+    print(f"  {'depth':>10}   {'OFFSET (ms)':>12}   {'keyset (ms)':>12}")
+    for depth, offset_ms, keyset_ms in asyncio.run(run(depths)):
+        print(f"  {depth:>10}   {offset_ms:>12.2f}   {keyset_ms:>12.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Script to compare the in-memory request log window with the SQL path.
+Builds a throwaway SQLite database with --rows request_logs spread over the last
+7 days, then times, for the last --days days:
+  - per-route summary: SQL GROUP BY route/method vs RequestLogWindow.route_summary
+    (which also computes p50/p95/p99, something SQL can only do by fetching and
+    sorting every latency)
+  - top users: SQL GROUP BY user_id ORDER BY count LIMIT n vs RequestLogWindow.top_users
+  - the window's first load and an incremental refresh after --new-rows more rows
+
+Example:
+    python scripts/benchmark_request_log_window.py --rows 2000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+parser = argparse.ArgumentParser(description="Columnar request log window vs SQL benchmark")
+parser.add_argument("--rows", type=int, default=2_000_000, help="Synthetic request_logs rows")
+parser.add_argument("--new-rows", type=int, default=20_000, help="Rows added before the incremental refresh")
+parser.add_argument("--days", type=int, default=1, help="Query period in days")
+parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query")
+parser.add_argument("--database", default=os.path.join(tempfile.gettempdir(), "atlas_window_benchmark.db"),
+                    help="SQLite file to (re)build")
+args = parser.parse_args()
+
+# Point the app at the throwaway database before anything imports database.py
+os.environ["DATABASE_URL"] = f"sqlite:///{args.database}"
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select, func
+from database import Base, engine, AsyncSessionLocal, async_engine
+import models  # noqa: F401 - registers every table on Base.metadata
+from models.request_log import RequestLog, HTTPMethod
+from services.request_log_window import RequestLogWindow
+
+STATUS_CODES = [200] * 85 + [201] * 5 + [401] * 4 + [403] * 2 + [404] * 3 + [500]
+METHODS = [HTTPMethod.GET] * 8 + [HTTPMethod.POST, HTTPMethod.PUT]
+BATCH_SIZE = 50_000
+TOP_USERS = 20
+
+def insert_rows(rows: int, max_age_seconds: int, seed: int):
+    """Insert synthetic requests spread over the last `max_age_seconds`"""
+    now = datetime.now(timezone.utc)
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        for start in range(0, rows, BATCH_SIZE):
+            conn.execute(insert(RequestLog), [
+                {"user_id": rng.randint(1, 500), "method": rng.choice(METHODS), "path": "/api/benchmark",
+                 "route_id": rng.randint(1, 60), "status_code": rng.choice(STATUS_CODES),
+                 "response_time_ms": int(rng.lognormvariate(3.5, 0.8)),
+                 "created_at": now - timedelta(seconds=rng.randint(10, max_age_seconds))}
+                for _ in range(min(BATCH_SIZE, rows - start))
+            ])
+
+def build_database(rows: int):
+    if os.path.exists(args.database):
+        os.remove(args.database)
+    Base.metadata.create_all(bind=engine)
+    insert_rows(rows, 60 * 60 * 24 * 7, 42)
+
+async def sql_route_summary(since: datetime):
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(
+            select(
+                RequestLog.route_id, RequestLog.method, func.sum(RequestLog.sample_weight),
+                func.avg(RequestLog.response_time_ms), func.max(RequestLog.response_time_ms),
+            ).where(RequestLog.created_at >= since).group_by(RequestLog.route_id, RequestLog.method)
+        )).all()
+
+async def sql_route_percentiles(since: datetime):
+    """What percentiles cost without the window: every latency, sorted per group, in Python"""
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(RequestLog.route_id, RequestLog.method, RequestLog.response_time_ms)
+            .where(RequestLog.created_at >= since)
+            .order_by(RequestLog.route_id, RequestLog.method, RequestLog.response_time_ms)
+        )).all()
+    groups = {}
+    for route_id, method, latency in rows:
+        groups.setdefault((route_id, method), []).append(latency)
+    return {key: [values[int(len(values) * q)] for q in (0.5, 0.95, 0.99)] for key, values in groups.items()}
+
+async def sql_top_users(since: datetime):
+    async with AsyncSessionLocal() as db:
+        requests = func.sum(RequestLog.sample_weight)
+        return (await db.execute(
+            select(RequestLog.user_id, requests).where(RequestLog.created_at >= since, RequestLog.user_id.isnot(None))
+            .group_by(RequestLog.user_id).order_by(requests.desc()).limit(TOP_USERS)
+        )).all()
+
+async def time_call(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        if asyncio.iscoroutine(result):
+            await result
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+async def run() -> tuple:
+    window = RequestLogWindow(days=7, refresh_seconds=0, max_rows=10_000_000, batch_size=50_000, lag_seconds=2)
+    started = time.perf_counter()
+    await window.refresh()
+    load_ms = (time.perf_counter() - started) * 1000
+
+    insert_rows(args.new_rows, 60, 7)
+    started = time.perf_counter()
+    await window.refresh()
+    refresh_ms = (time.perf_counter() - started) * 1000
+
+    since = datetime.now(timezone.utc) - timedelta(days=args.days)
+    results = [
+        ("route summary (SQL)", await time_call(lambda: sql_route_summary(since), args.repeat)),
+        ("route percentiles (SQL)", await time_call(lambda: sql_route_percentiles(since), args.repeat)),
+        ("route summary + pcts (window)", await time_call(lambda: window.route_summary(since), args.repeat)),
+        ("top users (SQL)", await time_call(lambda: sql_top_users(since), args.repeat)),
+        ("top users (window)", await time_call(lambda: window.top_users(since, TOP_USERS), args.repeat)),
+    ]
+    await async_engine.dispose()
+    return load_ms, refresh_ms, window.stats(), results
+
+def main():
+    print("=== Request Log Window Benchmark ===\n")
+    started = time.perf_counter()
+    build_database(args.rows)
+    print(f"  Built {args.rows} request_logs in {time.perf_counter() - started:.1f} s ({args.database})\n")
+
+    load_ms, refresh_ms, stats, results = asyncio.run(run())
+    print(f"  First load:          {load_ms:>10.1f} ms ({stats['rows_loaded'] - args.new_rows} rows)")
+    print(f"  Incremental refresh: {refresh_ms:>10.1f} ms ({args.new_rows} new rows)")
+    print(f"  Window memory:       {stats['memory_bytes'] / 1e6:>10.1f} MB for {stats['rows']} rows\n")
+    print(f"  Last {args.days} day(s), median of {args.repeat} runs:")
+    for name, elapsed_ms in results:
+        print(f"  {name:<32} {elapsed_ms:>10.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Script to pick Argon2id parameters for this host.
+Benchmarks password verification over a range of memory and time costs and
+recommends the strongest settings that stay under the target latency and
+memory budget. Copy the printed ARGON2_* lines into .env; existing passwords
+are rehashed with the new parameters the next time each user logs in.
+
+Example:
+    python scripts/calibrate_argon2.py --target-ms 250 --memory-budget-mb 512 --concurrency 4
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from argon2 import PasswordHasher
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM
+
+# Memory costs tried, in MB (OWASP's minimum for Argon2id is 19 MB)
+MEMORY_CANDIDATES_MB = (19, 32, 46, 64, 96, 128, 192, 256)
+MAX_TIME_COST = 10
+
+def time_verify(time_cost: int, memory_kb: int, parallelism: int, rounds: int) -> float:
+    """Median verify time in milliseconds for the given parameters"""
+    ph = PasswordHasher(time_cost=time_cost, memory_cost=memory_kb, parallelism=parallelism,
+                        hash_len=32, salt_len=16)
+    hashed = ph.hash("calibration-password")
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        ph.verify(hashed, "calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def calibrate(target_ms: float, per_hash_mb: int, parallelism: int, rounds: int):
+    """Return (memory_mb, time_cost, verify_ms) rows for the highest time cost under target at each memory cost"""
+    results = []
+    for memory_mb in MEMORY_CANDIDATES_MB:
+        if memory_mb > per_hash_mb:
+            break
+        best = None
+        for time_cost in range(1, MAX_TIME_COST + 1):
+            elapsed = time_verify(time_cost, memory_mb * 1024, parallelism, rounds)
+            if elapsed > target_ms:
+                break
+            best = (memory_mb, time_cost, elapsed)
+        if best is None:
+            # Even a single pass is too slow at this memory cost; larger ones will be too
+            break
+        results.append(best)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend Argon2id parameters for this host")
+    parser.add_argument("--target-ms", type=float, default=250, help="Target verify latency per login")
+    parser.add_argument("--memory-budget-mb", type=int, default=512,
+                        help="Memory that concurrent password hashing may use in total")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1,
+                        help="Concurrent hashes to budget for (PASSWORD_HASH_CONCURRENCY)")
+    parser.add_argument("--parallelism", type=int, default=ARGON2_PARALLELISM, help="Argon2 lanes per hash")
+    parser.add_argument("--rounds", type=int, default=3, help="Verifications timed per setting")
+    args = parser.parse_args()
+
+    per_hash_mb = args.memory_budget_mb // max(1, args.concurrency)
+
+    print("=== Argon2 Calibration ===\n")
+    print(f"  Target verify:  {args.target_ms:.0f} ms")
+    print(f"  Memory budget:  {args.memory_budget_mb} MB for {args.concurrency} concurrent hashes "
+          f"({per_hash_mb} MB each)")
+    current_ms = time_verify(ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM, args.rounds)
+    print(f"  Current:        time_cost={ARGON2_TIME_COST} memory={ARGON2_MEMORY_COST // 1024} MB "
+          f"parallelism={ARGON2_PARALLELISM} -> {current_ms:.1f} ms\n")
+
+    results = calibrate(args.target_ms, per_hash_mb, args.parallelism, args.rounds)
+    if not results:
+        print("No setting fits the target. Raise --target-ms or --memory-budget-mb.")
+        sys.exit(1)
+
+    for memory_mb, time_cost, elapsed in results:
+        print(f"  memory={memory_mb:>4} MB  time_cost={time_cost:>2}  verify={elapsed:7.1f} ms")
+
+    # Prefer memory over iterations: it is what makes GPU cracking expensive
+    memory_mb, time_cost, elapsed = results[-1]
+    print("\nRecommended settings (.env):\n")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_mb * 1024}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+    print(f"PASSWORD_HASH_CONCURRENCY={args.concurrency}")
+
+if __name__ == "__main__":
+    main()
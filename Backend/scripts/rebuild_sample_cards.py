@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Script to regenerate the sample_cards read model behind the sample list and search.
+Rebuilds every card from samples, customers, projects, sample types, departments and
+test types in one transaction, so the API keeps serving the previous cards until it commits.
+Needed after writes that bypass the ORM (raw SQL, bulk statements, imports).
+
+Example:
+    python scripts/rebuild_sample_cards.py           # rebuild
+    python scripts/rebuild_sample_cards.py --check   # report missing/stale cards only; exit code 1 if any
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from services.sample_cards import rebuild_sample_cards, check_sample_cards
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild sample_cards")
+    parser.add_argument("--check", action="store_true", help="Only compare the cards with the source tables")
+    parser.add_argument("--batch-size", type=int, default=500, help="Samples per batch")
+    args = parser.parse_args()
+
+    print("=== Sample Cards ===\n")
+    db = SessionLocal()
+    try:
+        if args.check:
+            report = check_sample_cards(db, args.batch_size)
+            db.rollback()
+            for kind, count in report.items():
+                print(f"  {kind:<10} {count:>10}")
+            if any(report.values()):
+                print("\n  Cards are out of date; run without --check to rebuild them.")
+                sys.exit(1)
+            print("\n  Cards are up to date.")
+            return
+        started = time.perf_counter()
+        written = rebuild_sample_cards(db, args.batch_size)
+        db.commit()
+        print(f"  Rebuilt {written} cards in {time.perf_counter() - started:.1f} s")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
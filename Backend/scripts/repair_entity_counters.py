@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Script to recount the business tables behind the overview dashboard.
+Counts customers, samples, projects, result_entries and reports from scratch,
+reports any drift from the stored entity_counters values and corrects them.
+Drift means rows were written outside the ORM (raw SQL, bulk statements, imports).
+
+Example:
+    python scripts/repair_entity_counters.py           # report and fix
+    python scripts/repair_entity_counters.py --check   # report only; exit code 1 on drift
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from services.entity_counters import repair_entity_counters
+
+def main():
+    parser = argparse.ArgumentParser(description="Recount entity_counters")
+    parser.add_argument("--check", action="store_true", help="Only report drift, don't fix it")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = repair_entity_counters(db, apply=not args.check)
+    finally:
+        db.close()
+
+    print("=== Entity Counters ===\n")
+    print(f"  {'table':<16} {'stored':>12} {'actual':>12} {'drift':>8}")
+    drifted = False
+    for name, stored, actual in report:
+        drift = "missing" if stored is None else f"{actual - stored:+d}"
+        drifted = drifted or stored != actual
+        print(f"  {name:<16} {'-' if stored is None else stored:>12} {actual:>12} {drift:>8}")
+    if not drifted:
+        print("\n  No drift.")
+    elif args.check:
+        print("\n  Drift found; run without --check to fix it.")
+        sys.exit(1)
+    else:
+        print("\n  Counters corrected.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "pools" runs blocking work in the dedicated thread pools below,
+# "inline" runs it directly on the event loop (the old behaviour, kept for comparison)
+BLOCKING_OFFLOAD_MODE = os.getenv("BLOCKING_OFFLOAD_MODE", "pools").lower()
+
+# Pool sizing: POOL_<NAME>_WORKERS threads, and at most POOL_<NAME>_QUEUE calls waiting for one
+POOL_DEFAULTS = {
+    "db": {"workers": 16, "queue": 200},      # synchronous ORM work in routers not yet on AsyncSession
+    "render": {"workers": 2, "queue": 20},    # report PDF rendering (CPU bound)
+    "email": {"workers": 4, "queue": 100},    # SMTP sends
+    "archive": {"workers": 1, "queue": 10},   # retention archive files (one writer keeps appends in order)
+}
+
+class BlockingPool:
+    """A named, sized thread pool for blocking work called from async code"""
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_queued_seen = 0
+        self.total_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    def _call(self, submitted_at: float, func, args, kwargs):
+        started_at = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self.total_wait_ms += (started_at - submitted_at) * 1000
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+                self.total_run_ms += (time.perf_counter() - started_at) * 1000
+
+    async def run(self, func, *args, **kwargs):
+        """Run func in this pool and await its result (inline when offloading is disabled)"""
+        if BLOCKING_OFFLOAD_MODE == "inline":
+            return func(*args, **kwargs)
+
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self.queued += 1
+            self.max_queued_seen = max(self.max_queued_seen, self.queued)
+
+        # Copy the caller's context so context variables stay visible inside the worker thread
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, self._call, time.perf_counter(), func, args, kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    def stats(self) -> dict:
+        """Snapshot of this pool's limits and counters"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "active": self.active,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "max_queued_seen": self.max_queued_seen,
+                "avg_wait_ms": round(self.total_wait_ms / self.completed, 2) if self.completed else 0.0,
+                "avg_run_ms": round(self.total_run_ms / self.completed, 2) if self.completed else 0.0,
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+def _create_pools() -> dict:
+    pools = {}
+    for name, defaults in POOL_DEFAULTS.items():
+        workers = int(os.getenv(f"POOL_{name.upper()}_WORKERS", defaults["workers"]))
+        queue = int(os.getenv(f"POOL_{name.upper()}_QUEUE", defaults["queue"]))
+        pools[name] = BlockingPool(name, workers, queue)
+    return pools
+
+pools = _create_pools()
+
+def register_pool(name: str, max_workers: int, max_queue: int) -> BlockingPool:
+    """Create an extra named pool whose size is worked out at runtime (see services.password_hashing)"""
+    pools[name] = BlockingPool(name, max_workers, max_queue)
+    return pools[name]
+
+def get_pool(name: str) -> BlockingPool:
+    """Get a blocking pool by name"""
+    return pools[name]
+
+async def run_blocking(pool_name: str, func, *args, **kwargs):
+    """Run a blocking callable in the named pool"""
+    return await pools[pool_name].run(func, *args, **kwargs)
+
+def offload(pool_name: str):
+    """Decorator turning a synchronous route handler into an async one that runs in the named pool.
+
+    FastAPI still resolves dependencies from the wrapped function's signature.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await pools[pool_name].run(func, *args, **kwargs)
+        return wrapper
+    return decorator
+
+def get_pool_stats() -> dict:
+    """Stats for every pool, keyed by pool name"""
+    return {
+        "mode": BLOCKING_OFFLOAD_MODE,
+        "pools": {name: pool.stats() for name, pool in pools.items()},
+    }
+
+def shutdown_pools():
+    """Wait for in-flight work and stop all pool threads"""
+    for pool in pools.values():
+        pool.shutdown()
@@ -0,0 +1,47 @@
+import ipaddress
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Comma-separated addresses or networks (e.g. "10.0.0.0/8,127.0.0.1") of the reverse proxies in
+# front of the app. X-Forwarded-For is only read on connections from one of them; the default
+# (empty) ignores the header, since any client can send it
+TRUSTED_PROXIES = os.getenv("TRUSTED_PROXIES", "")
+
+def parse_networks(value: str) -> tuple:
+    networks = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(item, strict=False))
+        except ValueError:
+            print(f"Ignoring invalid TRUSTED_PROXIES entry: {item}")
+    return tuple(networks)
+
+TRUSTED_PROXY_NETWORKS = parse_networks(TRUSTED_PROXIES)
+
+def is_trusted_proxy(address: str, networks: tuple = TRUSTED_PROXY_NETWORKS) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+def client_ip(peer: str | None, forwarded_for: str | None, networks: tuple = TRUSTED_PROXY_NETWORKS) -> str | None:
+    """The client's address, given the connection's peer address and its X-Forwarded-For header.
+
+    Each proxy appends the address it received the request from, so the header is
+    read from the right: the first hop that isn't one of our proxies is the client.
+    Everything to the left of it was supplied by the client and is ignored.
+    """
+    if peer is None or not forwarded_for or not is_trusted_proxy(peer, networks):
+        return peer
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not is_trusted_proxy(hop, networks):
+            return hop
+    # Every hop is one of our proxies: the left-most is as close to the client as we can get
+    return hops[0] if hops else peer
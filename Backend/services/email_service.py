@@ -1,21 +1,33 @@
 import smtplib
-import json
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 from sqlalchemy.orm import Session
-from models.integration import Integration
+from database import SessionLocal
+from services.integration_registry import integration_registry
+
+def send_with_own_session(send_func, **kwargs) -> bool:
+    """Call one of the send_* helpers with a short-lived session.
+
+    Async routers hold an AsyncSession, which the email helpers cannot use, so they
+    run this in a worker thread instead of blocking the event loop on SMTP.
+    """
+    db = SessionLocal()
+    try:
+        return send_func(db=db, **kwargs)
+    finally:
+        db.close()
 
 def get_smtp_config(db: Session) -> dict:
-    """Get SMTP configuration from database"""
-    smtp_integration = db.query(Integration).filter(Integration.name == "smtp").first()
+    """Get SMTP configuration (parsed once and cached by the integration registry)"""
+    smtp_integration = integration_registry.get(db, "smtp")
     if not smtp_integration:
         print("SMTP integration not found in database")
         return None
     
     if not smtp_integration.config:
-        print("SMTP config is empty")
+        print("SMTP config is empty or invalid")
         return None
     
     # Check if enabled - must be explicitly True
@@ -23,15 +35,8 @@ def get_smtp_config(db: Session) -> dict:
         print(f"SMTP integration is disabled (enabled={smtp_integration.enabled})")
         return None
     
-    try:
-        config = json.loads(smtp_integration.config) if isinstance(smtp_integration.config, str) else smtp_integration.config
-        if not config or not isinstance(config, dict):
-            print("SMTP config is invalid")
-            return None
-        return config
-    except Exception as e:
-        print(f"Error parsing SMTP config: {e}")
-        return None
+    # Copy so callers can't change the cached config
+    return dict(smtp_integration.config)
 
 def send_email(
     to_email: str,
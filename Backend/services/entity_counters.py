@@ -0,0 +1,104 @@
+from collections import Counter
+from sqlalchemy import event, select, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from database import AppSession
+from models.entity_counter import EntityCounter
+from models.customer import Customer
+from models.sample import Sample
+from models.project import Project
+from models.result_entry import ResultEntry
+from models.report import Report
+
+# Business tables whose row counts are kept in entity_counters
+COUNTED_MODELS = {
+    "customers": Customer,
+    "samples": Sample,
+    "projects": Project,
+    "result_entries": ResultEntry,
+    "reports": Report,
+}
+
+# Per-session counter changes collected during a flush
+DELTAS_KEY = "entity_counter_deltas"
+
+def _track(delta: int):
+    def listener(mapper, connection, target):
+        session = object_session(target)
+        if isinstance(session, AppSession):
+            session.info.setdefault(DELTAS_KEY, Counter())[mapper.local_table.name] += delta
+    return listener
+
+def _apply_deltas(session: Session, flush_context):
+    """One UPDATE per counted table per flush, in the flush's own transaction.
+
+    The counter row stays locked until the transaction ends, so concurrent writers
+    to the same table serialize on it; a rollback undoes the count with the rows.
+    """
+    deltas = session.info.pop(DELTAS_KEY, None)
+    if not deltas:
+        return
+    connection = session.connection()
+    for name, delta in sorted(deltas.items()):
+        if delta:
+            connection.execute(
+                update(EntityCounter).where(EntityCounter.name == name).values(count=EntityCounter.count + delta)
+            )
+
+def _discard_deltas(session: Session, previous_transaction):
+    session.info.pop(DELTAS_KEY, None)
+
+for model in COUNTED_MODELS.values():
+    event.listen(model, "after_insert", _track(1))
+    event.listen(model, "after_delete", _track(-1))
+# Only the app's sessions (AppSession is also the sync session under AsyncSessionLocal)
+event.listen(AppSession, "after_flush", _apply_deltas)
+event.listen(AppSession, "after_soft_rollback", _discard_deltas)
+
+async def get_entity_counts(db: AsyncSession) -> dict:
+    """{table name: row count} for the counted tables, read from entity_counters"""
+    counts = dict((await db.execute(
+        select(EntityCounter.name, EntityCounter.count).where(EntityCounter.name.in_(COUNTED_MODELS))
+    )).all())
+    for name, model in COUNTED_MODELS.items():
+        if name not in counts:
+            # Not seeded yet; count directly until seed_entity_counters has run
+            counts[name] = await db.scalar(select(func.count()).select_from(model))
+    return counts
+
+async def seed_entity_counters(db: AsyncSession):
+    """Create the counter rows that don't exist yet, starting from a full count"""
+    existing = set((await db.execute(select(EntityCounter.name))).scalars())
+    for name, model in COUNTED_MODELS.items():
+        if name in existing:
+            continue
+        try:
+            db.add(EntityCounter(name=name, count=await db.scalar(select(func.count()).select_from(model))))
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()  # Another worker seeded it first
+
+def repair_entity_counters(db: Session, apply: bool = True) -> list:
+    """Recount every counted table; returns (name, stored count or None, actual count) per table.
+
+    Each counter row is locked before its table is counted, so writers that commit
+    meanwhile either finish before the count (and are in it) or wait and apply their
+    change on top of the corrected value.
+    """
+    report = []
+    for name, model in COUNTED_MODELS.items():
+        counter = db.execute(
+            select(EntityCounter).where(EntityCounter.name == name).with_for_update()
+        ).scalar_one_or_none()
+        actual = db.scalar(select(func.count()).select_from(model))
+        report.append((name, counter.count if counter else None, actual))
+        if apply:
+            if counter is None:
+                db.add(EntityCounter(name=name, count=actual))
+            else:
+                counter.count = actual
+            db.commit()
+        else:
+            db.rollback()
+    return report
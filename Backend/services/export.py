@@ -0,0 +1,98 @@
+import csv
+import enum
+import io
+import json
+import os
+import zlib
+from datetime import datetime
+from dotenv import load_dotenv
+from database import async_engine
+
+load_dotenv()
+
+# Rows fetched from the server-side cursor per round trip (and per chunk written to the client)
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+def _plain(value):
+    """JSON/CSV friendly value for a datetime or enum column"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+def _converted_columns(rows: list) -> list:
+    """Indexes of the columns holding datetimes or enums in this batch (the only ones needing conversion)"""
+    converted = []
+    for index in range(len(rows[0]) if rows else 0):
+        value = next((row[index] for row in rows if row[index] is not None), None)
+        if isinstance(value, (datetime, enum.Enum)):
+            converted.append(index)
+    return converted
+
+def _plain_rows(rows: list) -> list:
+    converted = _converted_columns(rows)
+    if not converted:
+        return rows
+    plain = []
+    for row in rows:
+        row = list(row)
+        for index in converted:
+            if row[index] is not None:
+                row[index] = _plain(row[index])
+        plain.append(row)
+    return plain
+
+def encode_ndjson(columns: list, rows: list) -> str:
+    """One JSON object per row, newline terminated (also used for retention archives)"""
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+    return "".join(dumps(dict(zip(columns, row))) + "\n" for row in _plain_rows(rows))
+
+def _encode_csv(rows: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(_plain_rows(rows))
+    return buffer.getvalue()
+
+async def stream_export(query, export_format: ExportFormat, gzip: bool = False, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield `query`'s rows encoded as NDJSON or CSV, one chunk per batch.
+
+    Rows come from a server-side cursor (stream_results + yield_per), so memory stays
+    at one batch however many rows match. The connection is opened here rather than
+    taken from the request's session because the body is sent after the handler returns.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if gzip else None
+
+    def encode(text: str) -> bytes:
+        data = text.encode()
+        return compressor.compress(data) if compressor else data
+
+    async with async_engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=batch_size))
+        columns = list(result.keys())
+        if export_format == ExportFormat.CSV:
+            yield encode(_encode_csv([columns]))
+        async for rows in result.partitions():
+            if export_format == ExportFormat.CSV:
+                chunk = encode(_encode_csv(rows))
+            else:
+                chunk = encode(encode_ndjson(columns, rows))
+            if chunk:
+                yield chunk
+    if compressor:
+        yield compressor.flush()
+
+def export_headers(name: str, export_format: ExportFormat, gzip: bool) -> tuple:
+    """(media type, headers) for an export download"""
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{export_format.value}"
+    if gzip:
+        return "application/gzip", {"Content-Disposition": f'attachment; filename="{filename}.gz"'}
+    return MEDIA_TYPES[export_format], {"Content-Disposition": f'attachment; filename="{filename}"'}
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+from models.integration import Integration
+
+load_dotenv()
+
+# How often a worker checks whether the integrations table changed (another worker may have
+# updated it). Updates made through this worker are picked up immediately.
+INTEGRATION_VERSION_CHECK_SECONDS = float(os.getenv("INTEGRATION_VERSION_CHECK_SECONDS", "5"))
+
+# Every update bumps a row's version and every insert adds a row with a new highest id, so
+# these change whenever the table does
+VERSION_QUERY = select(func.count(Integration.id), func.max(Integration.id), func.sum(Integration.version))
+
+class IntegrationConfig:
+    """An Integration row with its JSON config already parsed"""
+
+    __slots__ = ("name", "enabled", "config", "updated_at")
+
+    def __init__(self, name: str, enabled: bool, config: dict | None, updated_at: datetime):
+        self.name = name
+        self.enabled = enabled
+        self.config = config
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_model(cls, integration: Integration) -> "IntegrationConfig":
+        config = None
+        if integration.config:
+            try:
+                config = json.loads(integration.config) if isinstance(integration.config, str) else integration.config
+            except (json.JSONDecodeError, TypeError) as e:
+                print(f"Error parsing {integration.name} integration config: {e}")
+            if not isinstance(config, dict):
+                config = None
+        return cls(integration.name, integration.enabled is True, config, integration.updated_at)
+
+    def get(self, key: str, default=None):
+        """Read a config value (default if the config is missing or invalid)"""
+        return (self.config or {}).get(key, default)
+
+    def __repr__(self):
+        return f"<IntegrationConfig {self.name} (enabled={self.enabled})>"
+
+class IntegrationRegistry:
+    """In-process copy of every integration's parsed config, reloaded when the table changes"""
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._configs = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        # Counters
+        self.lookups = 0
+        self.version_checks = 0
+        self.reloads = 0
+
+    def invalidate(self):
+        """Force a reload on the next lookup (call after changing an integration)"""
+        with self._lock:
+            self._version = None
+
+    def _needs_check(self) -> bool:
+        with self._lock:
+            self.lookups += 1
+            return self._version is None or time.monotonic() - self._checked_at >= self.check_interval
+
+    def _is_current(self, version: tuple) -> bool:
+        with self._lock:
+            self.version_checks += 1
+            if version == self._version:
+                self._checked_at = time.monotonic()
+                return True
+            return False
+
+    def _replace(self, version: tuple, integrations: list):
+        configs = {integration.name: IntegrationConfig.from_model(integration) for integration in integrations}
+        with self._lock:
+            self._configs = configs
+            self._version = version
+            self._checked_at = time.monotonic()
+            self.reloads += 1
+
+    def get(self, db: Session, name: str) -> IntegrationConfig | None:
+        """Get an integration's config, checking the table version with a sync session when due"""
+        if self._needs_check():
+            version = tuple(db.execute(VERSION_QUERY).one())
+            if not self._is_current(version):
+                self._replace(version, db.execute(select(Integration)).scalars().all())
+        return self._configs.get(name)
+
+    async def get_async(self, db: AsyncSession, name: str) -> IntegrationConfig | None:
+        """Get an integration's config, checking the table version with an async session when due"""
+        if self._needs_check():
+            version = tuple((await db.execute(VERSION_QUERY)).one())
+            if not self._is_current(version):
+                self._replace(version, (await db.execute(select(Integration))).scalars().all())
+        return self._configs.get(name)
+
+    def stats(self) -> dict:
+        """Snapshot of lookup and reload counters"""
+        with self._lock:
+            return {
+                "integrations": len(self._configs),
+                "check_interval_seconds": self.check_interval,
+                "lookups": self.lookups,
+                "version_checks": self.version_checks,
+                "reloads": self.reloads,
+            }
+
+integration_registry = IntegrationRegistry(check_interval=INTEGRATION_VERSION_CHECK_SECONDS)
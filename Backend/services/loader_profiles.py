@@ -0,0 +1,129 @@
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload, raiseload
+from models.department import Department
+from models.login_history import LoginHistory
+from models.project import Project
+from models.report import Report
+from models.request_log import RequestLog
+from models.result_entry import ResultEntry
+from models.sample import Sample
+from models.sample_activity import SampleActivity
+from models.user_impersonation import UserImpersonation
+
+# Every declared profile by name, for tests/test_query_counts.py
+LOADER_PROFILES = {}
+
+class LoaderProfile:
+    """The relationships one response builder reads, loaded with the rows that feed it.
+
+    Many-to-one relationships are joined into the main statement and collections
+    are fetched with one SELECT ... IN per collection, so a list costs the same
+    number of queries for 1 row as for 500. Every relationship the profile doesn't
+    declare is set to raise instead of emitting SQL: a builder that starts reading
+    something new fails on its first request (rather than with MissingGreenlet in
+    an async route, or a silent query per row in a sync one) until it is added here.
+    """
+
+    def __init__(self, name: str, model, *loads, endpoints: tuple = ()):
+        self.name = name
+        self.model = model
+        self.loads = loads
+        self.endpoints = endpoints  # "METHOD path" of the endpoints whose responses this profile feeds
+        self.options = loads + (raiseload("*", sql_only=True),)
+        LOADER_PROFILES[name] = self
+
+    def extend(self, name: str, *loads, endpoints: tuple = ()) -> "LoaderProfile":
+        """A profile loading everything this one does plus `loads`"""
+        return LoaderProfile(name, self.model, *self.loads, *loads, endpoints=endpoints)
+
+    def select(self):
+        """SELECT of the profile's model with its loader options"""
+        return select(self.model).options(*self.options)
+
+    def apply(self, query):
+        """Add the profile's loader options to an existing query"""
+        return query.options(*self.options)
+
+SAMPLE_RESPONSE = LoaderProfile(
+    "sample_response", Sample,
+    joinedload(Sample.customer),
+    joinedload(Sample.project),
+    joinedload(Sample.sample_type),
+    selectinload(Sample.departments),
+    selectinload(Sample.test_types),
+    endpoints=("GET /api/samples/{sample_id}",),
+)
+
+SAMPLE_ACTIVITY = LoaderProfile(
+    "sample_activity", SampleActivity,
+    joinedload(SampleActivity.user),
+    endpoints=("GET /api/samples/{sample_id}/details",),
+)
+
+PROJECT_RESPONSE = LoaderProfile(
+    "project_response", Project,
+    joinedload(Project.customer),
+    endpoints=("GET /api/projects/", "GET /api/projects/search", "GET /api/projects/{id}"),
+)
+
+DEPARTMENT_RESPONSE = LoaderProfile(
+    "department_response", Department,
+    selectinload(Department.test_types),
+    endpoints=("GET /api/departments/",),
+)
+
+RESULT_ENTRY_RESPONSE = LoaderProfile(
+    "result_entry_response", ResultEntry,
+    joinedload(ResultEntry.sample),
+    joinedload(ResultEntry.created_by),
+    joinedload(ResultEntry.committed_by),
+    selectinload(ResultEntry.result_values),
+    endpoints=(
+        "GET /api/result-entries/sample/{sample_id}", "GET /api/result-entries/{result_entry_id}",
+        "GET /api/result-entries/search",
+    ),
+)
+
+# What create_report copies into the report's frozen data
+RESULT_ENTRY_REPORT_DATA = LoaderProfile(
+    "result_entry_report_data", ResultEntry,
+    joinedload(ResultEntry.sample).joinedload(Sample.customer),
+    joinedload(ResultEntry.sample).selectinload(Sample.departments),
+    selectinload(ResultEntry.result_values),
+    endpoints=("POST /api/reports/",),
+)
+
+# Also read by generate_report_html
+REPORT_RESPONSE = LoaderProfile(
+    "report_response", Report,
+    joinedload(Report.generated_by),
+    joinedload(Report.amended_by),
+    joinedload(Report.validated_by),
+    joinedload(Report.finalized_by),
+    joinedload(Report.result_entry).joinedload(ResultEntry.sample).joinedload(Sample.customer),
+    endpoints=("GET /api/reports/proposed", "GET /api/reports/finalized"),
+)
+
+REPORT_DETAIL = REPORT_RESPONSE.extend(
+    "report_detail",
+    joinedload(Report.result_entry).selectinload(ResultEntry.result_values),
+    endpoints=("GET /api/reports/{report_id}",),
+)
+
+LOGIN_HISTORY_LIST = LoaderProfile(
+    "login_history_list", LoginHistory,
+    joinedload(LoginHistory.user),
+    endpoints=("GET /api/analytics/logins/history",),
+)
+
+REQUEST_LOG_LIST = LoaderProfile(
+    "request_log_list", RequestLog,
+    joinedload(RequestLog.route),
+    endpoints=("GET /api/analytics/requests/log",),
+)
+
+IMPERSONATION_LIST = LoaderProfile(
+    "impersonation_list", UserImpersonation,
+    joinedload(UserImpersonation.impersonated_user),
+    endpoints=("GET /api/analytics/impersonate/history",),
+)
@@ -0,0 +1,195 @@
+import asyncio
+import gzip
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+from database import AsyncSessionLocal, async_engine
+from services.blocking_pool import run_blocking
+from services.export import encode_ndjson
+from services.rollups import RollupSpec, REQUEST_LOG_ROLLUP, LOGIN_HISTORY_ROLLUP, get_watermark
+
+load_dotenv()
+
+# Rows older than this many days are removed; 0 keeps them forever
+REQUEST_LOG_RETENTION_DAYS = int(os.getenv("REQUEST_LOG_RETENTION_DAYS", "0"))
+LOGIN_HISTORY_RETENTION_DAYS = int(os.getenv("LOGIN_HISTORY_RETENTION_DAYS", "0"))
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+# Small batches with a pause in between keep each DELETE's locks short on a busy table
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+RETENTION_BATCH_PAUSE_SECONDS = float(os.getenv("RETENTION_BATCH_PAUSE_SECONDS", "0.1"))
+# When set, expired rows are appended to <dir>/<table>-<YYYYMMDD>.ndjson.gz before being deleted
+RETENTION_ARCHIVE_DIR = os.getenv("RETENTION_ARCHIVE_DIR", "")
+
+# MySQL named lock held for a whole run: every worker process starts the retention task,
+# but only the one holding the lock purges, so no two archive and delete the same batch
+RETENTION_LOCK_NAME = "atlas_log_retention"
+
+class RetentionPolicy:
+    """How long one log table's rows are kept; the rollup is what preserves them afterwards"""
+
+    def __init__(self, rollup: RollupSpec, days: int):
+        self.rollup = rollup
+        self.days = days
+
+    @property
+    def name(self) -> str:
+        return self.rollup.name
+
+    @property
+    def table(self):
+        return self.rollup.source.__table__
+
+RETENTION_POLICIES = (
+    RetentionPolicy(REQUEST_LOG_ROLLUP, REQUEST_LOG_RETENTION_DAYS),
+    RetentionPolicy(LOGIN_HISTORY_ROLLUP, LOGIN_HISTORY_RETENTION_DAYS),
+)
+
+def write_archive(directory: str, name: str, columns: list, rows: list) -> str:
+    """Append rows to today's archive file for the table; returns its path.
+
+    Each batch is its own gzip member (concatenated members read back as one
+    stream with zcat or gzip.open), synced to disk before the rows are deleted.
+    A crash between the two archives the batch again on the next run, so
+    readers should de-duplicate on id.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}-{datetime.now(timezone.utc):%Y%m%d}.ndjson.gz")
+    with open(path, "ab") as archive:
+        archive.write(gzip.compress(encode_ndjson(columns, rows).encode()))
+        archive.flush()
+        os.fsync(archive.fileno())
+    return path
+
+@asynccontextmanager
+async def retention_lock():
+    """Yield whether this process may run retention now (always where named locks don't exist, e.g. SQLite)"""
+    async with async_engine.connect() as connection:
+        if connection.dialect.name != "mysql":
+            yield True
+            return
+        # Timeout 0: if another process holds it, skip this run rather than queue behind it
+        acquired = await connection.scalar(text("SELECT GET_LOCK(:name, 0)"), {"name": RETENTION_LOCK_NAME})
+        try:
+            yield acquired == 1
+        finally:
+            if acquired == 1:
+                await connection.scalar(text("SELECT RELEASE_LOCK(:name)"), {"name": RETENTION_LOCK_NAME})
+
+async def purge_batch(db: AsyncSession, policy: RetentionPolicy, cutoff: datetime, batch_size: int,
+                      archive_dir: str = "") -> int:
+    """Archive (optionally) and delete the oldest batch of expired rows; returns how many were removed"""
+    table = policy.table
+    # Only rows already folded into the hourly rollup may go, so charts and totals keep counting them
+    watermark = await get_watermark(db, policy.rollup)
+    rows = (await db.execute(
+        select(*(table.columns if archive_dir else [table.c.id]))
+        .where(table.c.id <= watermark, table.c.created_at < cutoff)
+        .order_by(table.c.id)
+        .limit(batch_size)
+    )).all()
+    if not rows:
+        await db.rollback()
+        return 0
+    if archive_dir:
+        await run_blocking("archive", write_archive, archive_dir, policy.name, list(table.columns.keys()), rows)
+    await db.execute(delete(table).where(table.c.id.in_([row.id for row in rows])))
+    await db.commit()
+    return len(rows)
+
+class RetentionWorker:
+    """Background task that removes log rows past their retention period.
+
+    Runs in every worker process; retention_lock() lets one of them purge at a time.
+    """
+
+    def __init__(self, policies: tuple, interval: float, batch_size: int, batch_pause: float, archive_dir: str):
+        self.policies = [policy for policy in policies if policy.days > 0]
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.archive_dir = archive_dir
+        self._task = None
+        # Counters
+        self.runs = 0
+        self.skipped_runs = 0  # Another process held the retention lock
+        self.rows_deleted = {policy.name: 0 for policy in self.policies}
+        self.rows_archived = 0
+        self.failures = 0
+        self.last_run_ms = 0.0
+        self.last_error = None
+
+    def start(self):
+        if not self.policies:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self):
+        """Purge every expired row, one batch per transaction, unless another process is already at it"""
+        started = time.perf_counter()
+        try:
+            async with retention_lock() as acquired:
+                if not acquired:
+                    self.skipped_runs += 1
+                    return
+                for policy in self.policies:
+                    cutoff = datetime.now(timezone.utc) - timedelta(days=policy.days)
+                    while True:
+                        async with AsyncSessionLocal() as db:
+                            purged = await purge_batch(db, policy, cutoff, self.batch_size, self.archive_dir)
+                        self.rows_deleted[policy.name] += purged
+                        if self.archive_dir:
+                            self.rows_archived += purged
+                        if purged < self.batch_size:
+                            break
+                        await asyncio.sleep(self.batch_pause)
+            self.last_error = None
+        except Exception as e:
+            # Keep the worker alive; whatever is left is picked up next run
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"Log retention failed: {e}")
+        finally:
+            self.runs += 1
+            self.last_run_ms = (time.perf_counter() - started) * 1000
+
+    async def _run(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "retention_days": {policy.name: policy.days for policy in self.policies},
+            "archive_dir": self.archive_dir or None,
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "skipped_runs": self.skipped_runs,
+            "rows_deleted": self.rows_deleted,
+            "rows_archived": self.rows_archived,
+            "failures": self.failures,
+            "last_run_ms": round(self.last_run_ms, 2),
+            "last_error": self.last_error,
+        }
+
+retention_worker = RetentionWorker(
+    RETENTION_POLICIES,
+    interval=RETENTION_INTERVAL_SECONDS,
+    batch_size=RETENTION_BATCH_SIZE,
+    batch_pause=RETENTION_BATCH_PAUSE_SECONDS,
+    archive_dir=RETENTION_ARCHIVE_DIR,
+)
@@ -0,0 +1,102 @@
+import json
+import os
+import random
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Write-time sampling for request_logs. Rules are tried in order and the first match sets the rate;
+# requests matching no rule use REQUEST_LOG_SAMPLE_RATE. For example, to keep every error and 5% of
+# successful GETs:
+#   REQUEST_LOG_SAMPLING_RULES='[{"status": "4xx", "rate": 1}, {"status": "5xx", "rate": 1},
+#                                {"method": "GET", "status": "2xx", "rate": 0.05}]'
+# A rule may match on "method" (name or list), "status" (code or class like "2xx", or a list)
+# and "path" (prefix). Rates are rounded to "1 in N"; kept rows store N as their sample_weight
+# so counts rebuilt from them (rollups, overview) stay estimates of the full traffic.
+REQUEST_LOG_SAMPLING_RULES = os.getenv("REQUEST_LOG_SAMPLING_RULES", "")
+REQUEST_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "1"))
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+def _status_matcher(value):
+    """Predicate for a status code ("404", 404) or class ("4xx")"""
+    value = str(value).lower()
+    if value.endswith("xx"):
+        status_class = int(value[0])
+        return lambda status_code: status_code // 100 == status_class
+    code = int(value)
+    return lambda status_code: status_code == code
+
+class SamplingRule:
+    """One rate applied to the requests matching every given condition"""
+
+    def __init__(self, rate: float, methods=None, statuses=None, path: str = None):
+        self.rate = rate
+        self.every = round(1 / rate) if rate > 0 else 0  # Keep 1 in `every` requests; 0 keeps none
+        self.methods = {method.upper() for method in _as_list(methods)}
+        self.statuses = [str(status) for status in _as_list(statuses)]
+        self.status_matchers = [_status_matcher(status) for status in self.statuses]
+        self.path = path
+
+    @classmethod
+    def from_dict(cls, rule: dict) -> "SamplingRule":
+        rate = float(rule["rate"])
+        if not 0 <= rate <= 1:
+            raise ValueError(f"Sampling rate must be between 0 and 1, got {rate}")
+        return cls(rate, rule.get("method"), rule.get("status"), rule.get("path"))
+
+    def matches(self, method: str, path: str, status_code: int) -> bool:
+        if self.methods and method.upper() not in self.methods:
+            return False
+        if self.path and not path.startswith(self.path):
+            return False
+        if self.status_matchers and not any(matcher(status_code) for matcher in self.status_matchers):
+            return False
+        return True
+
+    def describe(self) -> dict:
+        return {"rate": self.rate, "method": sorted(self.methods) or None, "status": self.statuses or None,
+                "path": self.path}
+
+class LogSampler:
+    """Decides at write time whether a finished request gets a request_logs row"""
+
+    def __init__(self, rules: list, default_rate: float):
+        self.rules = rules
+        self.default = SamplingRule(min(max(default_rate, 0), 1))
+        self.kept = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_env(cls, rules_json: str, default_rate: float) -> "LogSampler":
+        rules = []
+        if rules_json.strip():
+            try:
+                rules = [SamplingRule.from_dict(rule) for rule in json.loads(rules_json)]
+            except (ValueError, TypeError, KeyError) as e:
+                # Log everything rather than silently dropping rows on a typo
+                print(f"Ignoring invalid REQUEST_LOG_SAMPLING_RULES: {e}")
+                rules, default_rate = [], 1
+        return cls(rules, default_rate)
+
+    def sample_weight(self, method: str, path: str, status_code: int) -> int:
+        """How many requests the row for this one stands for, or 0 to skip logging it"""
+        rule = next((rule for rule in self.rules if rule.matches(method, path, status_code)), self.default)
+        if rule.every == 1 or (rule.every and random.random() * rule.every < 1):
+            self.kept += 1
+            return rule.every
+        self.skipped += 1
+        return 0
+
+    def stats(self) -> dict:
+        return {
+            "rules": [rule.describe() for rule in self.rules],
+            "default_rate": self.default.rate,
+            "kept": self.kept,
+            "skipped": self.skipped,
+        }
+
+log_sampler = LogSampler.from_env(REQUEST_LOG_SAMPLING_RULES, REQUEST_LOG_SAMPLE_RATE)
@@ -0,0 +1,221 @@
+import asyncio
+import os
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, or_
+from dotenv import load_dotenv
+from database import AsyncSessionLocal
+from models.login_history import LoginHistory
+
+load_dotenv()
+
+# Failed logins allowed per key within the sliding window before further attempts are rejected
+LOGIN_THROTTLE_WINDOW_SECONDS = float(os.getenv("LOGIN_THROTTLE_WINDOW_SECONDS", "900"))
+LOGIN_THROTTLE_IP_LIMIT = int(os.getenv("LOGIN_THROTTLE_IP_LIMIT", "20"))
+LOGIN_THROTTLE_EMAIL_LIMIT = int(os.getenv("LOGIN_THROTTLE_EMAIL_LIMIT", "10"))
+# Keys tracked per dimension; the least recently seen is evicted first
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+# Rejected attempts are written to login_history as one row per (email, IP) every this many seconds
+LOGIN_THROTTLE_FLUSH_SECONDS = float(os.getenv("LOGIN_THROTTLE_FLUSH_SECONDS", "60"))
+# Failed logins read back from login_history at startup
+LOGIN_THROTTLE_WARM_ROWS = int(os.getenv("LOGIN_THROTTLE_WARM_ROWS", "50000"))
+
+RATE_LIMITED_REASON = "Rate limited"
+
+class FailureRing:
+    """The last `limit` failure times for one key, in a fixed-size ring.
+
+    The slot about to be overwritten holds the oldest of them, so "were all
+    `limit` failures inside the window?" is a single comparison.
+    """
+
+    __slots__ = ("times", "next")
+
+    def __init__(self, limit: int):
+        self.times = array("d", bytes(8 * limit))
+        self.next = 0
+
+    def add(self, moment: float):
+        self.times[self.next] = moment
+        self.next = (self.next + 1) % len(self.times)
+
+    def retry_after(self, now: float, window: float) -> float:
+        """Seconds until the key drops below its limit (0 if it is below already)"""
+        return max(self.times[self.next] + window - now, 0.0)
+
+class SlidingWindowLimiter:
+    """Per-key failure rings with LRU eviction, so memory stays bounded under a spray of keys"""
+
+    def __init__(self, limit: int, window: float, max_keys: int):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._rings = OrderedDict()
+        self.evicted = 0
+
+    def retry_after(self, key: str, now: float) -> float:
+        ring = self._rings.get(key)
+        return ring.retry_after(now, self.window) if ring is not None else 0.0
+
+    def add(self, key: str, moment: float):
+        ring = self._rings.get(key)
+        if ring is None:
+            if len(self._rings) >= self.max_keys:
+                self._rings.popitem(last=False)
+                self.evicted += 1
+            ring = self._rings[key] = FailureRing(self.limit)
+        else:
+            self._rings.move_to_end(key)
+        ring.add(moment)
+
+    def reset(self, key: str):
+        self._rings.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "keys": len(self._rings), "evicted": self.evicted}
+
+def _normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+class LoginThrottle:
+    """Sliding-window limits on failed logins by client IP and by email, checked before any DB or Argon2 work.
+
+    Only real failures count towards the limits, so rejected attempts can't keep a
+    victim's email locked out indefinitely, and a successful login clears its email.
+    Rejected attempts aren't written one by one: they are tallied per (email, IP)
+    and flushed as a single login_history row per pair every `flush_interval`.
+    Limits are per worker process.
+    """
+
+    def __init__(self, window: float, ip_limit: int, email_limit: int, max_keys: int, flush_interval: float):
+        self.window = window
+        self.by_ip = SlidingWindowLimiter(ip_limit, window, max_keys)
+        self.by_email = SlidingWindowLimiter(email_limit, window, max_keys)
+        self.flush_interval = flush_interval
+        self._rejected = {}  # (email, ip) -> attempts since the last flush
+        self._task = None
+        # Counters
+        self.checks = 0
+        self.rejections = 0
+        self.failures = 0
+        self.warmed = 0
+        self.rows_flushed = 0
+        self.flush_failures = 0
+
+    def check(self, ip_address: str, email: str) -> float:
+        """Seconds the caller must wait before trying again, or 0 if the attempt may go ahead"""
+        self.checks += 1
+        now = time.time()
+        return max(self.by_ip.retry_after(ip_address, now), self.by_email.retry_after(_normalize_email(email), now))
+
+    def record_rejected(self, ip_address: str, email: str):
+        self.rejections += 1
+        key = (email[:255], ip_address)
+        if key not in self._rejected and len(self._rejected) >= self.by_ip.max_keys:
+            key = ("*", None)  # Too many distinct pairs before the next flush: tally the rest together
+        self._rejected[key] = self._rejected.get(key, 0) + 1
+
+    def record_failure(self, ip_address: str, email: str):
+        self.failures += 1
+        self._track(ip_address, email, time.time())
+
+    def _track(self, ip_address: str, email: str, moment: float):
+        if ip_address:
+            self.by_ip.add(ip_address, moment)
+        self.by_email.add(_normalize_email(email), moment)
+
+    def record_success(self, email: str):
+        self.by_email.reset(_normalize_email(email))
+
+    async def warm(self):
+        """Replay recent failed logins from login_history, so a restart doesn't reset the limits"""
+        since = datetime.now(timezone.utc) - timedelta(seconds=self.window)
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(LoginHistory.email, LoginHistory.ip_address, LoginHistory.created_at)
+                .where(
+                    LoginHistory.success == False,
+                    LoginHistory.created_at >= since,
+                    or_(LoginHistory.failure_reason.is_(None), LoginHistory.failure_reason.notlike(f"{RATE_LIMITED_REASON}%")),
+                )
+                .order_by(LoginHistory.id.desc())
+                .limit(LOGIN_THROTTLE_WARM_ROWS)
+            )).all()
+        for email, ip_address, created_at in reversed(rows):
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)  # SQLite returns naive UTC
+            self._track(ip_address, email, created_at.timestamp())
+        self.warmed += len(rows)
+
+    async def flush(self):
+        """Write the rejected-attempt tallies as one failed login row per (email, IP)"""
+        if not self._rejected:
+            return
+        rejected, self._rejected = self._rejected, {}
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add_all(
+                    LoginHistory(
+                        email=email,
+                        success=False,
+                        ip_address=ip_address,
+                        failure_reason=f"{RATE_LIMITED_REASON} ({attempts} attempts)",
+                    )
+                    for (email, ip_address), attempts in rejected.items()
+                )
+                await db.commit()
+            self.rows_flushed += len(rejected)
+        except Exception as e:
+            # Put the tallies back for the next flush
+            self.flush_failures += 1
+            for key, attempts in rejected.items():
+                self._rejected[key] = self._rejected.get(key, 0) + attempts
+            print(f"Login throttle flush failed: {e}")
+
+    async def start(self):
+        """Warm the limits from login_history and start the periodic flush"""
+        try:
+            await self.warm()
+        except Exception as e:
+            print(f"Login throttle warm-up failed: {e}")
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "window_seconds": self.window,
+            "by_ip": self.by_ip.stats(),
+            "by_email": self.by_email.stats(),
+            "checks": self.checks,
+            "rejections": self.rejections,
+            "failures": self.failures,
+            "warmed": self.warmed,
+            "pending_rejected": sum(self._rejected.values()),
+            "rows_flushed": self.rows_flushed,
+            "flush_failures": self.flush_failures,
+        }
+
+login_throttle = LoginThrottle(
+    window=LOGIN_THROTTLE_WINDOW_SECONDS,
+    ip_limit=LOGIN_THROTTLE_IP_LIMIT,
+    email_limit=LOGIN_THROTTLE_EMAIL_LIMIT,
+    max_keys=LOGIN_THROTTLE_MAX_KEYS,
+    flush_interval=LOGIN_THROTTLE_FLUSH_SECONDS,
+)
@@ -0,0 +1,161 @@
+import bisect
+import re
+import threading
+
+# Default latency buckets in milliseconds
+DEFAULT_MS_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram (cumulative counts, like Prometheus)"""
+
+    def __init__(self, name: str, description: str, buckets=DEFAULT_MS_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def stats(self) -> dict:
+        """Snapshot with cumulative bucket counts keyed by upper bound"""
+        with self._lock:
+            counts = list(self._counts)
+            count = self.count
+            total = self.sum
+        buckets = {}
+        running = 0
+        for bound, bucket_count in zip(list(self.buckets) + ["+Inf"], counts):
+            running += bucket_count
+            buckets[str(bound)] = running
+        return {
+            "count": count,
+            "sum": round(total, 2),
+            "avg": round(total / count, 2) if count else 0.0,
+            "buckets": buckets,
+        }
+
+# All histograms created through get_histogram, keyed by name
+histograms = {}
+_registry_lock = threading.Lock()
+
+def get_histogram(name: str, description: str, buckets=DEFAULT_MS_BUCKETS) -> Histogram:
+    """Get a histogram by name, creating it on first use"""
+    with _registry_lock:
+        if name not in histograms:
+            histograms[name] = Histogram(name, description, buckets)
+        return histograms[name]
+
+def get_histogram_stats() -> dict:
+    """Stats for every histogram, keyed by name"""
+    return {name: histogram.stats() for name, histogram in histograms.items()}
+
+class LabeledHistogram:
+    """A histogram per combination of label values (e.g. route and status class)"""
+
+    def __init__(self, name: str, description: str, label_names: tuple, buckets=DEFAULT_MS_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Histogram:
+        """Child histogram for the given label values, created on first use"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, Histogram(self.name, self.description, self.buckets))
+        return child
+
+    def children(self) -> dict:
+        with self._lock:
+            return dict(self._children)
+
+    def stats(self) -> dict:
+        """Stats per child, keyed by label values joined with a space"""
+        return {" ".join(map(str, values)): child.stats() for values, child in self.children().items()}
+
+labeled_histograms = {}
+
+def get_labeled_histogram(name: str, description: str, label_names: tuple, buckets=DEFAULT_MS_BUCKETS) -> LabeledHistogram:
+    """Get a labeled histogram by name, creating it on first use"""
+    with _registry_lock:
+        if name not in labeled_histograms:
+            labeled_histograms[name] = LabeledHistogram(name, description, label_names, buckets)
+        return labeled_histograms[name]
+
+# Prometheus text exposition format
+
+METRIC_PREFIX = "atlas_"
+
+def _metric_name(*parts) -> str:
+    return METRIC_PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", "_".join(str(part) for part in parts if part != ""))
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _label_string(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels.items()) + "}"
+
+def _render_histogram(lines: list, name: str, histogram: Histogram, labels: dict):
+    stats = histogram.stats()
+    for bound, count in stats["buckets"].items():
+        lines.append(f"{name}_bucket{_label_string({**labels, 'le': bound})} {count}")
+    lines.append(f"{name}_sum{_label_string(labels)} {stats['sum']}")
+    lines.append(f"{name}_count{_label_string(labels)} {stats['count']}")
+
+# stats() keys that only ever grow (also for every leaf under them, e.g. rows_deleted per table);
+# they are exported as counters, every other number as a gauge
+COUNTER_FIELDS = frozenset({
+    "cache_hits", "checks", "completed", "dropped", "enqueued", "error_requests_folded", "errors", "evicted",
+    "evictions", "expired", "failed", "failed_logins_folded", "failed_open", "failures", "flagged_requests",
+    "flush_failures", "flushes", "fresh_hits", "hits", "invalidations", "kept", "loads", "lookups", "merges",
+    "misses", "refreshes", "rejected", "rejections", "reloads", "rows_archived", "rows_deleted", "rows_expired",
+    "rows_flushed", "rows_folded", "rows_loaded", "runs", "sampled_out", "short_circuited", "skipped",
+    "skipped_runs", "stale_hits", "verified", "version_checks", "written",
+})
+
+def flatten_metrics(stats: dict, *prefix) -> dict:
+    """Numeric leaves of a nested stats dict as {metric name: (type, value)}; strings and None are skipped"""
+    metrics = {}
+    for key, value in stats.items():
+        if isinstance(value, dict) and "buckets" in value:
+            continue  # Histogram stats; histograms are rendered as histograms
+        if isinstance(value, dict):
+            metrics.update(flatten_metrics(value, *prefix, key))
+        elif isinstance(value, bool):
+            metrics[_metric_name(*prefix, key)] = ("gauge", int(value))
+        elif isinstance(value, (int, float)):
+            counter = key in COUNTER_FIELDS or any(part in COUNTER_FIELDS for part in prefix)
+            metrics[_metric_name(*prefix, key)] = ("counter" if counter else "gauge", value)
+    return metrics
+
+def render_prometheus(metrics: dict) -> str:
+    """All histograms plus the given counters and gauges in the Prometheus text format"""
+    lines = []
+    for histogram in list(histograms.values()):
+        name = _metric_name(histogram.name)
+        lines.append(f"# HELP {name} {histogram.description}")
+        lines.append(f"# TYPE {name} histogram")
+        _render_histogram(lines, name, histogram, {})
+    for family in list(labeled_histograms.values()):
+        name = _metric_name(family.name)
+        lines.append(f"# HELP {name} {family.description}")
+        lines.append(f"# TYPE {name} histogram")
+        for values, child in family.children().items():
+            _render_histogram(lines, name, child, dict(zip(family.label_names, values)))
+    for name, (metric_type, value) in metrics.items():
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,81 @@
+import base64
+import json
+import os
+from datetime import datetime
+from fastapi import HTTPException, status
+from sqlalchemy import select, func, or_, text, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Estimated totals count at most this many rows; past it the table statistics are used (MySQL) or the cap itself
+PAGINATION_COUNT_CAP = int(os.getenv("PAGINATION_COUNT_CAP", "10000"))
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque token for the position just after (created_at, row_id) in newest-first order"""
+    payload = json.dumps({"t": created_at.isoformat(), "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """(created_at, id) from a cursor token; 400 if it wasn't produced by encode_cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(payload["t"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+async def keyset_page(db: AsyncSession, query, created_column, id_column, cursor: str | None, limit: int) -> tuple:
+    """One newest-first page of `query` ordered by (created_column, id_column).
+
+    Seeks past the cursor with a WHERE on the ordering columns instead of OFFSET,
+    so every page costs the same index range scan however deep it is.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # Compare against the stored value of the cursor row where it still exists, so the
+        # tie-break on equal timestamps doesn't depend on how the driver round-trips datetimes
+        # (SQLite keeps server defaults without microseconds but binds them with)
+        stored = select(created_column).where(id_column == row_id).scalar_subquery()
+        boundary = func.coalesce(stored, created_at)
+        # (created, id) < (boundary, row_id), written so the first term is an index range bound
+        query = query.where(
+            created_column <= boundary,
+            or_(created_column < boundary, id_column < row_id),
+        )
+    rows = (await db.execute(
+        query.order_by(created_column.desc(), id_column.desc()).limit(limit + 1)
+    )).unique().scalars().all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_column.key), getattr(last, id_column.key))
+
+async def estimate_table_rows(db: AsyncSession, table_name: str) -> int | None:
+    """Row count from the storage engine's statistics (MySQL only; approximate but free)"""
+    if db.bind.dialect.name != "mysql":
+        return None
+    return await db.scalar(
+        text("SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"),
+        {"name": table_name},
+    )
+
+async def count_total(db: AsyncSession, query, exact: bool) -> dict:
+    """Total for a paginated listing: exact on request, otherwise a bounded estimate.
+
+    The estimate counts at most PAGINATION_COUNT_CAP rows. Beyond that an
+    unfiltered listing uses the table statistics, a filtered one reports the cap.
+    """
+    rows = query.with_only_columns(literal_column("1"), maintain_column_froms=True)
+    if exact:
+        return {"total": await db.scalar(select(func.count()).select_from(rows.subquery())), "total_is_estimate": False}
+    capped = await db.scalar(select(func.count()).select_from(rows.limit(PAGINATION_COUNT_CAP + 1).subquery()))
+    if capped <= PAGINATION_COUNT_CAP:
+        return {"total": capped, "total_is_estimate": False}
+    estimate = None if query.whereclause is not None else await estimate_table_rows(db, query.get_final_froms()[0].name)
+    return {"total": max(estimate or 0, PAGINATION_COUNT_CAP), "total_is_estimate": True}
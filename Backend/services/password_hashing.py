@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from auth import ph, verify_password, get_password_hash
+from services.blocking_pool import register_pool
+from services.metrics import get_histogram
+
+load_dotenv()
+
+def _available_memory_mb() -> int:
+    """Physical memory currently available, in MB (0 if it can't be determined)"""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+def _default_concurrency() -> int:
+    """How many Argon2 calls may run at once: one per CPU, capped by the memory budget"""
+    per_hash_mb = max(1, ph.memory_cost // 1024)
+    # By default allow hashing to use up to a quarter of the memory available at startup
+    budget_mb = int(os.getenv("PASSWORD_HASH_MEMORY_BUDGET_MB", "0")) or _available_memory_mb() // 4
+    by_memory = budget_mb // per_hash_mb if budget_mb else 4
+    return max(1, min(os.cpu_count() or 1, by_memory))
+
+# Argon2 allocates memory_cost per call, so concurrency is what bounds memory use
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", "0")) or _default_concurrency()
+# Calls allowed to wait for a free slot before logins are turned away with 503
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", str(PASSWORD_HASH_CONCURRENCY * 4)))
+
+hash_pool = register_pool("hash", PASSWORD_HASH_CONCURRENCY, PASSWORD_HASH_QUEUE)
+
+# Also taken by synchronous callers, so routes hashing outside the pool can't exceed the budget either
+_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_CONCURRENCY)
+
+verify_histogram = get_histogram("password_verify_ms", "Argon2 password verification time in milliseconds")
+hash_histogram = get_histogram("password_hash_ms", "Argon2 password hashing time in milliseconds")
+
+def verify_password_bounded(plain_password: str, hashed_password: str) -> bool:
+    """verify_password, limited to PASSWORD_HASH_CONCURRENCY at a time and timed"""
+    with _hash_slots:
+        started = time.perf_counter()
+        try:
+            return verify_password(plain_password, hashed_password)
+        finally:
+            verify_histogram.observe((time.perf_counter() - started) * 1000)
+
+def hash_password_bounded(password: str) -> str:
+    """get_password_hash, limited to PASSWORD_HASH_CONCURRENCY at a time and timed"""
+    with _hash_slots:
+        started = time.perf_counter()
+        try:
+            return get_password_hash(password)
+        finally:
+            hash_histogram.observe((time.perf_counter() - started) * 1000)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hash pool (503 when the pool's queue is full)"""
+    return await hash_pool.run(verify_password_bounded, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the hash pool (503 when the pool's queue is full)"""
+    return await hash_pool.run(hash_password_bounded, password)
+
+def get_password_hashing_stats() -> dict:
+    """Concurrency limit and timing histograms for password hashing"""
+    return {
+        "concurrency": PASSWORD_HASH_CONCURRENCY,
+        "memory_cost_kb": ph.memory_cost,
+        "verify_ms": verify_histogram.stats(),
+        "hash_ms": hash_histogram.stats(),
+    }
@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from sqlalchemy import event
+from dotenv import load_dotenv
+from database import engine, async_engine
+
+load_dotenv()
+
+# The same statement run more than this many times in one request is flagged as N+1
+QUERY_N_PLUS_ONE_THRESHOLD = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "10"))
+# Distinct N+1 (route, statement) pairs remembered per worker for the offenders endpoint
+QUERY_N_PLUS_ONE_MAX_TRACKED = int(os.getenv("QUERY_N_PLUS_ONE_MAX_TRACKED", "200"))
+
+class RequestQueryStats:
+    """SQL statements executed while handling one request"""
+
+    __slots__ = ("count", "total_ms", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements = Counter()  # Statement text (bound parameters, so one entry per query shape) -> runs
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int = QUERY_N_PLUS_ONE_THRESHOLD) -> list:
+        """(statement, runs) pairs that ran more than `threshold` times, most repeated first"""
+        return [(statement, runs) for statement, runs in self.statements.most_common() if runs > threshold]
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. db;dur=12.4;desc="7 queries\""""
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} queries"'
+
+# Stats for the request being handled; context variables follow the request into
+# thread pool workers and SQLAlchemy's async greenlets
+current_query_stats: ContextVar = ContextVar("current_query_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_query_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started_at")
+    if started:
+        stats.record(statement, (time.perf_counter() - started.pop()) * 1000)
+
+def _handle_error(exception_context):
+    # The after hook doesn't run for failed statements; drop their start time
+    started = exception_context.connection.info.get("query_started_at") if exception_context.connection else None
+    if started:
+        started.pop()
+
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_engine, "handle_error", _handle_error)
+
+class NPlusOneTracker:
+    """Per-worker tally of requests flagged for N+1 queries, by route and statement"""
+
+    def __init__(self, max_tracked: int):
+        self.max_tracked = max_tracked
+        self._lock = threading.Lock()
+        self._entries = {}  # (route, statement) -> {"requests", "max_runs"}
+        self.flagged_requests = 0
+
+    def record(self, route: str, repeated: list):
+        with self._lock:
+            self.flagged_requests += 1
+            for statement, runs in repeated:
+                entry = self._entries.get((route, statement))
+                if entry is None:
+                    if len(self._entries) >= self.max_tracked:
+                        continue
+                    entry = self._entries[(route, statement)] = {"requests": 0, "max_runs": 0}
+                entry["requests"] += 1
+                entry["max_runs"] = max(entry["max_runs"], runs)
+
+    def top(self, limit: int) -> list:
+        with self._lock:
+            entries = [
+                {"route": route, "statement": statement, **entry}
+                for (route, statement), entry in self._entries.items()
+            ]
+        entries.sort(key=lambda entry: (entry["requests"], entry["max_runs"]), reverse=True)
+        return entries[:limit]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "threshold": QUERY_N_PLUS_ONE_THRESHOLD,
+                "flagged_requests": self.flagged_requests,
+                "tracked_statements": len(self._entries),
+            }
+
+n_plus_one_tracker = NPlusOneTracker(max_tracked=QUERY_N_PLUS_ONE_MAX_TRACKED)
@@ -0,0 +1,306 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from sqlalchemy import select, func
+from dotenv import load_dotenv
+from database import AsyncSessionLocal
+from models.request_log import RequestLog, HTTPMethod
+from services.rollups import inserted_before_lag
+
+load_dotenv()
+
+# Days of request_logs held in memory per worker; 0 disables the window (queries fall back to SQL)
+REQUEST_LOG_WINDOW_DAYS = int(os.getenv("REQUEST_LOG_WINDOW_DAYS", "7"))
+# A query older than this triggers an incremental refresh first
+REQUEST_LOG_WINDOW_REFRESH_SECONDS = float(os.getenv("REQUEST_LOG_WINDOW_REFRESH_SECONDS", "10"))
+# Hard cap on rows (about 30 bytes each) so a traffic spike can't outgrow memory; the oldest go first
+REQUEST_LOG_WINDOW_MAX_ROWS = int(os.getenv("REQUEST_LOG_WINDOW_MAX_ROWS", "5000000"))
+REQUEST_LOG_WINDOW_BATCH_SIZE = int(os.getenv("REQUEST_LOG_WINDOW_BATCH_SIZE", "50000"))
+# Rows inserted less than this ago are left for the next refresh, so a batch insert that hasn't
+# committed yet can't end up below the watermark and be skipped
+REQUEST_LOG_WINDOW_LAG_SECONDS = float(os.getenv("REQUEST_LOG_WINDOW_LAG_SECONDS", "2"))
+
+# Rows are kept this much longer than `days`, so a query for the whole window whose start was
+# computed just before a refresh (which moves the window forward) is still covered
+WINDOW_MARGIN = timedelta(minutes=5)
+
+METHODS = list(HTTPMethod)
+METHOD_CODES = {method: code for code, method in enumerate(METHODS)}
+EPOCH = datetime(1970, 1, 1)
+
+# Column name -> dtype. Missing route, user and latency values are stored as 0 / 0 / -1
+COLUMNS = {
+    "id": np.int64,
+    "ts": np.float64,  # created_at as UTC epoch seconds
+    "route_id": np.int32,
+    "method": np.int8,
+    "status": np.int16,
+    "latency": np.int32,
+    "user_id": np.int32,
+    "weight": np.int32,
+}
+
+def _epoch_seconds(value: datetime) -> float:
+    """UTC epoch seconds (naive values are UTC, as SQLite returns them)"""
+    if value.tzinfo is not None:
+        return value.timestamp()
+    return (value - EPOCH).total_seconds()
+
+def _weighted_percentiles(groups: np.ndarray, values: np.ndarray, weights: np.ndarray, group_count: int,
+                          quantiles: tuple) -> np.ndarray:
+    """Weighted percentiles of `values` per group, as a (group_count, len(quantiles)) array.
+
+    One lexsort by (group, value) and a searchsorted over the running weight
+    replaces a per-group sort; groups without values get -1.
+    """
+    result = np.full((group_count, len(quantiles)), -1, dtype=np.int64)
+    if not len(values):
+        return result
+    order = np.lexsort((values, groups))
+    groups, values = groups[order], values[order]
+    cumulative = np.cumsum(weights[order], dtype=np.int64)
+    present, starts = np.unique(groups, return_index=True)
+    ends = np.append(starts[1:], len(groups))
+    before = cumulative[starts] - weights[order][starts]
+    totals = cumulative[ends - 1] - before
+    for column, quantile in enumerate(quantiles):
+        # First row whose running weight reaches the quantile's share of the group
+        targets = before + np.maximum(np.ceil(totals * quantile), 1)
+        positions = np.minimum(np.searchsorted(cumulative, targets, side="left"), ends - 1)
+        result[present, column] = values[positions]
+    return result
+
+class RequestLogWindow:
+    """The last `days` of request_logs as NumPy columns, for vectorized dashboard queries.
+
+    Rows are appended in id order from a watermark, so a refresh reads only what
+    was logged since the previous one, and the oldest rows are dropped from the
+    front as they leave the window. Arrays grow by doubling; capacity is bounded
+    by the window (and `max_rows`). Each worker process holds its own copy.
+    """
+
+    def __init__(self, days: int, refresh_seconds: float, max_rows: int, batch_size: int, lag_seconds: float):
+        self.days = days
+        self.refresh_seconds = refresh_seconds
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self.lag_seconds = lag_seconds
+        self._columns = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._size = 0
+        self._watermark = None  # Id of the last row loaded; None until the first load
+        self._complete_from = None  # Epoch seconds from which every row is held; None until the first load
+        self._refreshed_at = None
+        self._lock = asyncio.Lock()
+        # Counters
+        self.refreshes = 0
+        self.rows_loaded = 0
+        self.rows_expired = 0
+        self.last_refresh_ms = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.days > 0
+
+    def covers(self, since: datetime) -> bool:
+        """Whether the window holds every row from `since` onwards (rows expired or over `max_rows` are gone)"""
+        return self._complete_from is not None and _epoch_seconds(since) >= self._complete_from
+
+    async def ready_for(self, since: datetime) -> bool:
+        """Refresh if due and report whether queries from `since` can be answered from the window.
+
+        Periods longer than the window are turned down before refreshing, so they don't wait for a load.
+        """
+        if not self.enabled or since < datetime.now(timezone.utc) - timedelta(days=self.days) - WINDOW_MARGIN:
+            return False
+        await self.ensure_fresh()
+        return self.covers(since)
+
+    def _append(self, rows: list):
+        """Append (id, created_at, route_id, method, status_code, response_time_ms, user_id, sample_weight) rows"""
+        count = len(rows)
+        needed = self._size + count
+        capacity = len(self._columns["id"])
+        if needed > capacity:
+            capacity = min(max(needed, capacity * 2, 1024), max(needed, self.max_rows + self.batch_size))
+            for name, column in self._columns.items():
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:self._size] = column[:self._size]
+                self._columns[name] = grown
+        ids, created, route_ids, methods, statuses, latencies, user_ids, weights = zip(*rows)
+        values = {
+            "id": ids,
+            "ts": [_epoch_seconds(value) for value in created],
+            "route_id": [route_id or 0 for route_id in route_ids],
+            "method": [METHOD_CODES[HTTPMethod(method)] for method in methods],
+            "status": statuses,
+            "latency": [-1 if latency is None else latency for latency in latencies],
+            "user_id": [user_id or 0 for user_id in user_ids],
+            "weight": [weight or 1 for weight in weights],
+        }
+        for name, column in self._columns.items():
+            column[self._size:needed] = values[name]
+        self._size = needed
+
+    def _expire(self, cutoff: float):
+        """Drop rows from the front that are older than `cutoff` or over the row cap"""
+        timestamps = self._columns["ts"][:self._size]
+        # Ids (and so rows) are in roughly time order: drop the leading run of expired rows
+        fresh = timestamps >= cutoff
+        drop = int(np.argmax(fresh)) if fresh.any() else self._size
+        drop = max(drop, self._size - self.max_rows)
+        self._complete_from = max(self._complete_from, cutoff)
+        if drop <= 0:
+            return
+        # Rows dropped for the cap may be newer than the cutoff: coverage starts just after the newest of them
+        newest_dropped = float(timestamps[:drop].max())
+        if newest_dropped >= self._complete_from:
+            self._complete_from = float(np.nextafter(newest_dropped, np.inf))
+        remaining = self._size - drop
+        for column in self._columns.values():
+            column[:remaining] = column[drop:self._size]
+        self._size = remaining
+        self.rows_expired += drop
+
+    async def refresh(self):
+        """Load rows logged since the last refresh and expire those that left the window"""
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        window_start = now - timedelta(days=self.days) - WINDOW_MARGIN
+        async with AsyncSessionLocal() as db:
+            # Judged by the database's clock, which is what stamps inserted_at
+            settled = inserted_before_lag(RequestLog.inserted_at, self.lag_seconds, db.bind.dialect.name)
+            if self._watermark is None:
+                # First load: start from the first row inside the window
+                first_id = await db.scalar(select(func.min(RequestLog.id)).where(RequestLog.created_at >= window_start))
+                if first_id is None:
+                    first_id = await db.scalar(select(func.coalesce(func.max(RequestLog.id), 0))) + 1
+                self._watermark = first_id - 1
+                self._complete_from = _epoch_seconds(window_start)
+            while True:
+                rows = (await db.execute(
+                    select(
+                        RequestLog.id, RequestLog.created_at, RequestLog.route_id, RequestLog.method,
+                        RequestLog.status_code, RequestLog.response_time_ms, RequestLog.user_id,
+                        RequestLog.sample_weight, settled,
+                    )
+                    .where(RequestLog.id > self._watermark)
+                    .order_by(RequestLog.id)
+                    .limit(self.batch_size)
+                )).tuples().all()
+                # Stop at the first row inserted too recently; the next refresh picks it up. The lag is
+                # measured on inserted_at: created_at is when the request arrived, and a slow request's
+                # row can be written after rows with higher ids
+                ready = next((index for index, row in enumerate(rows) if not row[-1]), len(rows))
+                if ready:
+                    self._append([row[:-1] for row in rows[:ready]])
+                    self._watermark = rows[ready - 1][0]
+                    self.rows_loaded += ready
+                # Expire per batch so a large first load never holds more than max_rows
+                self._expire(_epoch_seconds(window_start))
+                if ready < self.batch_size:
+                    break
+        self._refreshed_at = time.monotonic()
+        self.refreshes += 1
+        self.last_refresh_ms = (time.perf_counter() - started) * 1000
+
+    def warm(self):
+        """Start the first (largest) load in the background so the first dashboard query doesn't pay for it"""
+        if self.enabled and self._refreshed_at is None:
+            task = asyncio.get_running_loop().create_task(self.ensure_fresh())
+            # A failed warm-up is retried by the first query; don't warn about it
+            task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def ensure_fresh(self):
+        """Refresh if the last refresh is older than `refresh_seconds` (concurrent callers share one)"""
+        async with self._lock:
+            if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_seconds:
+                await self.refresh()
+
+    def _since(self, since: datetime) -> dict:
+        """Views of the columns restricted to rows from `since` onwards"""
+        columns = {name: column[:self._size] for name, column in self._columns.items()}
+        mask = columns["ts"] >= _epoch_seconds(since)
+        return {name: column[mask] for name, column in columns.items()}
+
+    def route_summary(self, since: datetime, quantiles: tuple = (0.5, 0.95, 0.99)) -> list:
+        """Requests, server errors and latency (average, max, percentiles) per (route id, method)"""
+        rows = self._since(since)
+        # One integer key per (route, method) pair, then bincount instead of GROUP BY
+        keys = rows["route_id"].astype(np.int64) * len(METHODS) + rows["method"]
+        groups, group_index = np.unique(keys, return_inverse=True)
+        count = len(groups)
+        weights = rows["weight"]
+        requests = np.bincount(group_index, weights=weights, minlength=count)
+        errors = np.bincount(group_index, weights=weights * (rows["status"] >= 500), minlength=count)
+        timed = rows["latency"] >= 0
+        timed_requests = np.bincount(group_index[timed], weights=weights[timed], minlength=count)
+        latency_sum = np.bincount(group_index[timed], weights=rows["latency"][timed] * weights[timed], minlength=count)
+        latency_max = np.full(count, -1, dtype=np.int64)
+        np.maximum.at(latency_max, group_index[timed], rows["latency"][timed])
+        percentiles = _weighted_percentiles(group_index[timed], rows["latency"][timed], weights[timed], count, quantiles)
+        return [
+            {
+                "route_id": int(key // len(METHODS)) or None,
+                "method": METHODS[key % len(METHODS)].value,
+                "requests": int(requests[index]),
+                "errors": int(errors[index]),
+                "avg_response_time_ms": round(float(latency_sum[index] / timed_requests[index]), 1) if timed_requests[index] else 0,
+                "max_response_time_ms": max(int(latency_max[index]), 0),
+                **{
+                    f"p{round(quantile * 100)}_response_time_ms": int(value) if value >= 0 else None
+                    for quantile, value in zip(quantiles, percentiles[index])
+                },
+            }
+            for index, key in enumerate(groups.tolist())
+        ]
+
+    def top_users(self, since: datetime, limit: int) -> list:
+        """The `limit` users with the most requests, with their error count and average latency"""
+        rows = self._since(since)
+        authenticated = rows["user_id"] > 0
+        user_ids, weights = rows["user_id"][authenticated], rows["weight"][authenticated]
+        if not len(user_ids):
+            return []
+        users, user_index = np.unique(user_ids, return_inverse=True)
+        requests = np.bincount(user_index, weights=weights)
+        errors = np.bincount(user_index, weights=weights * (rows["status"][authenticated] >= 400))
+        latencies = rows["latency"][authenticated]
+        timed = latencies >= 0
+        timed_requests = np.bincount(user_index[timed], weights=weights[timed], minlength=len(users))
+        latency_sum = np.bincount(user_index[timed], weights=latencies[timed] * weights[timed], minlength=len(users))
+        # argpartition finds the top `limit` in linear time; only those are sorted
+        top = np.argpartition(-requests, limit - 1)[:limit] if limit < len(users) else np.arange(len(users))
+        top = top[np.argsort(-requests[top], kind="stable")]
+        return [
+            {
+                "user_id": int(users[index]),
+                "requests": int(requests[index]),
+                "errors": int(errors[index]),
+                "avg_response_time_ms": round(float(latency_sum[index] / timed_requests[index]), 1) if timed_requests[index] else 0,
+            }
+            for index in top.tolist()
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "days": self.days,
+            "rows": self._size,
+            "capacity": len(self._columns["id"]),
+            "memory_bytes": sum(column.nbytes for column in self._columns.values()),
+            "watermark": self._watermark,
+            "complete_from": datetime.fromtimestamp(self._complete_from, timezone.utc).isoformat() if self._complete_from else None,
+            "refreshes": self.refreshes,
+            "rows_loaded": self.rows_loaded,
+            "rows_expired": self.rows_expired,
+            "last_refresh_ms": round(self.last_refresh_ms, 2),
+        }
+
+request_log_window = RequestLogWindow(
+    days=REQUEST_LOG_WINDOW_DAYS,
+    refresh_seconds=REQUEST_LOG_WINDOW_REFRESH_SECONDS,
+    max_rows=REQUEST_LOG_WINDOW_MAX_ROWS,
+    batch_size=REQUEST_LOG_WINDOW_BATCH_SIZE,
+    lag_seconds=REQUEST_LOG_WINDOW_LAG_SECONDS,
+)
@@ -0,0 +1,155 @@
+import asyncio
+import os
+import time
+from sqlalchemy import insert
+from dotenv import load_dotenv
+from database import AsyncSessionLocal
+from models.request_log import RequestLog
+
+load_dotenv()
+
+# Queue and flush settings
+REQUEST_LOG_QUEUE_SIZE = int(os.getenv("REQUEST_LOG_QUEUE_SIZE", "10000"))
+REQUEST_LOG_FLUSH_INTERVAL_MS = int(os.getenv("REQUEST_LOG_FLUSH_INTERVAL_MS", "500"))
+REQUEST_LOG_BATCH_SIZE = int(os.getenv("REQUEST_LOG_BATCH_SIZE", "500"))
+
+# What to do when the queue is full:
+#   drop   - discard the new row
+#   sample - once the queue is 75% full keep only one in REQUEST_LOG_OVERFLOW_SAMPLE_EVERY
+#            rows (server errors are always kept), drop when completely full
+#   block  - make the request wait for space in the queue
+REQUEST_LOG_OVERFLOW = os.getenv("REQUEST_LOG_OVERFLOW", "drop").lower()
+REQUEST_LOG_OVERFLOW_SAMPLE_EVERY = int(os.getenv("REQUEST_LOG_OVERFLOW_SAMPLE_EVERY", "10"))
+
+class RequestLogWriter:
+    """Buffers RequestLog rows in memory and bulk-inserts them from a background task"""
+
+    def __init__(self, max_queue: int, flush_interval_ms: int, batch_size: int,
+                 overflow: str, sample_every: int):
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.sample_every = max(1, sample_every)
+        self._queue = None
+        self._task = None
+        self._closing = False
+        self._sample_counter = 0
+        # Counters
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def start(self):
+        """Start the background flusher on the running event loop"""
+        if self._task is None or self._task.done():
+            self._queue = self._queue or asyncio.Queue(maxsize=self.max_queue)
+            self._closing = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued and stop the background flusher"""
+        if self._task is None:
+            return
+        self._closing = True
+        await self._task
+        self._task = None
+
+    async def enqueue(self, row: dict):
+        """Queue a RequestLog row (a dict of column values) for the next bulk insert"""
+        if self._task is None:
+            self.start()
+
+        if self.overflow == "block":
+            await self._queue.put(row)
+            self.enqueued += 1
+            return
+
+        if self.overflow == "sample" and self._queue.qsize() >= self.max_queue * 0.75:
+            if (row.get("status_code") or 0) < 500:
+                self._sample_counter += 1
+                if self._sample_counter % self.sample_every:
+                    self.sampled_out += 1
+                    return
+
+        try:
+            self._queue.put_nowait(row)
+            self.enqueued += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            if batch:
+                await self._flush(batch)
+            elif self._closing:
+                return
+
+    async def _collect_batch(self) -> list:
+        """Wait up to the flush interval for rows, returning early once a full batch is queued"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._closing:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, batch: list):
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(RequestLog), batch)
+                await db.commit()
+            self.written += len(batch)
+        except Exception as e:
+            # Don't let a logging failure take down the flusher
+            self.failed += len(batch)
+            print(f"Failed to write {len(batch)} request logs: {e}")
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.flushes += 1
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self.total_flush_ms += elapsed_ms
+
+    def stats(self) -> dict:
+        """Snapshot of queue depth, flush latency and drop counters"""
+        return {
+            "overflow_policy": self.overflow,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+        }
+
+request_log_writer = RequestLogWriter(
+    max_queue=REQUEST_LOG_QUEUE_SIZE,
+    flush_interval_ms=REQUEST_LOG_FLUSH_INTERVAL_MS,
+    batch_size=REQUEST_LOG_BATCH_SIZE,
+    overflow=REQUEST_LOG_OVERFLOW,
+    sample_every=REQUEST_LOG_OVERFLOW_SAMPLE_EVERY,
+)
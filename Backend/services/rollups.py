@@ -0,0 +1,280 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from sqlalchemy import select, update, func, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+from database import AsyncSessionLocal
+from models.request_log import RequestLog
+from models.login_history import LoginHistory
+from models.analytics_rollup import RequestLogHourly, LoginHistoryHourly, RollupState
+from models.api_route import ApiRoute
+from services.route_registry import UNMATCHED_ROUTE
+
+load_dotenv()
+
+ROLLUP_INTERVAL_SECONDS = float(os.getenv("ROLLUP_INTERVAL_SECONDS", "60"))
+ROLLUP_BATCH_SIZE = int(os.getenv("ROLLUP_BATCH_SIZE", "20000"))
+# Rows inserted less than this ago are left for the next run, so an insert whose transaction
+# hasn't committed yet can't end up below the high-water mark and be skipped
+ROLLUP_LAG_SECONDS = float(os.getenv("ROLLUP_LAG_SECONDS", "30"))
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Naive UTC datetime (naive values are assumed to be UTC already)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def hour_bucket(value: datetime) -> datetime:
+    """Truncate a timestamp to the start of its hour, as a naive UTC datetime like the rollup columns"""
+    return to_naive_utc(value).replace(minute=0, second=0, microsecond=0)
+
+def hour_expression(column, dialect: str):
+    """SQL truncating a timestamp column to the start of its hour, as "YYYY-MM-DD HH:00:00" text"""
+    if dialect == "mysql":
+        return func.date_format(column, "%Y-%m-%d %H:00:00")
+    return func.strftime("%Y-%m-%d %H:00:00", column)
+
+def inserted_before_lag(column, seconds: float, dialect: str):
+    """SQL condition: `column` is more than `seconds` behind the database's clock.
+
+    Insert times come from the database's now(), which is its session's local time
+    (stored naive), so the cutoff is computed there too rather than on the app clock.
+    """
+    if dialect == "mysql":
+        return column < func.timestampadd(text("MICROSECOND"), -round(seconds * 1_000_000), func.now())
+    return column < func.datetime("now", f"-{seconds} seconds")
+
+class RollupSpec:
+    """How one source table is folded into its hourly rollup table"""
+
+    def __init__(self, name: str, source, source_columns: dict, target, dimensions: tuple, measures: dict,
+                 inserted_at, outer_joins: tuple = ()):
+        self.name = name
+        self.source = source
+        self.source_columns = source_columns  # rollup dimension -> source column ("hour" comes from created_at)
+        self.outer_joins = outer_joins  # (table, onclause) pairs the source columns read from
+        self.target = target
+        self.dimensions = dimensions
+        self.measures = measures  # rollup column -> "count" | "sum" | "max", over the source "value" column
+        # An optional "weight" source column makes each row count as that many (sampled request logs)
+        self.inserted_at = inserted_at  # Source column the database stamps when the row is inserted
+
+    def aggregate_query(self, dimensions: tuple, dialect: str):
+        """SELECT of the measures grouped by `dimensions`; the caller adds the WHERE"""
+        expressions = {"hour": hour_expression(self.source.created_at, dialect), **self.source_columns}
+        value = func.coalesce(self.source_columns.get("value"), 0)
+        weight = func.coalesce(self.source_columns["weight"], 1) if "weight" in self.source_columns else None
+        aggregates = []
+        for measure, kind in self.measures.items():
+            if kind == "count":
+                aggregate = func.count() if weight is None else func.sum(weight)
+            elif kind == "sum":
+                aggregate = func.sum(value if weight is None else value * weight)
+            else:
+                aggregate = func.max(value)
+            aggregates.append(aggregate.label(measure))
+        grouped = [expressions[dimension] for dimension in dimensions]
+        query = select(*grouped, *aggregates).select_from(self.source)
+        for table, onclause in self.outer_joins:
+            query = query.outerjoin(table, onclause)
+        return query.group_by(*grouped)
+
+    async def aggregate(self, db: AsyncSession, dimensions: tuple, *criteria) -> dict:
+        """Source rows matching `criteria` folded into {dimension values: {measure: value}}, grouped in SQL"""
+        rows = await db.execute(self.aggregate_query(dimensions, db.bind.dialect.name).where(*criteria))
+        buckets = {}
+        for row in rows:
+            key = tuple(
+                datetime.strptime(value, "%Y-%m-%d %H:%M:%S") if dimension == "hour" else value
+                for dimension, value in zip(dimensions, row)
+            )
+            # SUM comes back as Decimal on MySQL
+            buckets[key] = {measure: int(row[len(dimensions) + index] or 0) for index, measure in enumerate(self.measures)}
+        return buckets
+
+REQUEST_LOG_ROLLUP = RollupSpec(
+    name="request_logs",
+    source=RequestLog,
+    source_columns={
+        "route": func.coalesce(ApiRoute.template, UNMATCHED_ROUTE),
+        "method": RequestLog.method,
+        "status_code": RequestLog.status_code,
+        "value": RequestLog.response_time_ms,
+        "weight": RequestLog.sample_weight,
+    },
+    target=RequestLogHourly,
+    dimensions=("hour", "route", "method", "status_code"),
+    measures={"request_count": "count", "total_response_time_ms": "sum", "max_response_time_ms": "max"},
+    # created_at is when the request arrived, which can be well before its batch was written
+    inserted_at=RequestLog.inserted_at,
+    outer_joins=((ApiRoute, RequestLog.route_id == ApiRoute.id),),
+)
+
+LOGIN_HISTORY_ROLLUP = RollupSpec(
+    name="login_history",
+    source=LoginHistory,
+    source_columns={"success": LoginHistory.success},
+    target=LoginHistoryHourly,
+    dimensions=("hour", "success"),
+    measures={"attempt_count": "count"},
+    inserted_at=LoginHistory.created_at,  # Server default, set on insert
+)
+
+ROLLUPS = (REQUEST_LOG_ROLLUP, LOGIN_HISTORY_ROLLUP)
+
+async def get_watermark(db: AsyncSession, spec: RollupSpec) -> int:
+    """Id of the last source row included in the rollup"""
+    return await db.scalar(select(RollupState.last_id).where(RollupState.name == spec.name)) or 0
+
+async def roll_up_batch(db: AsyncSession, spec: RollupSpec, batch_size: int) -> int:
+    """Fold the next batch of source rows into the rollup; returns how many rows were folded"""
+    last_id = await db.scalar(select(RollupState.last_id).where(RollupState.name == spec.name))
+    if last_id is None:
+        try:
+            db.add(RollupState(name=spec.name, last_id=0))
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()  # Another worker created it first
+        last_id = 0
+    settled = inserted_before_lag(spec.inserted_at, ROLLUP_LAG_SECONDS, db.bind.dialect.name)
+    rows = (await db.execute(
+        select(spec.source.id, settled).where(spec.source.id > last_id).order_by(spec.source.id).limit(batch_size)
+    )).all()
+
+    # Stop at the first row inserted too recently. Ids are assigned on insert, so every lower id
+    # was inserted earlier still and its transaction has had the lag to commit
+    ready = next((index for index, row in enumerate(rows) if not row[1]), len(rows))
+    if not ready:
+        await db.rollback()
+        return 0
+    upper = rows[ready - 1][0]
+
+    # Claim the id range first: a concurrent worker holding the same watermark updates 0 rows and backs off
+    claimed = await db.execute(
+        update(RollupState)
+        .where(RollupState.name == spec.name, RollupState.last_id == last_id)
+        .values(last_id=upper)
+    )
+    if claimed.rowcount != 1:
+        await db.rollback()
+        return 0
+
+    buckets = await spec.aggregate(db, spec.dimensions, spec.source.id > last_id, spec.source.id <= upper)
+    hours = {key[0] for key in buckets}
+    existing = {
+        tuple(getattr(bucket, dimension) for dimension in spec.dimensions): bucket
+        for bucket in (await db.execute(select(spec.target).where(spec.target.hour.in_(hours)))).scalars()
+    }
+    for key, measures in buckets.items():
+        bucket = existing.get(key)
+        if bucket is None:
+            db.add(spec.target(**dict(zip(spec.dimensions, key)), **measures))
+            continue
+        for measure, value in measures.items():
+            if spec.measures[measure] == "max":
+                setattr(bucket, measure, max(getattr(bucket, measure), value))
+            else:
+                setattr(bucket, measure, getattr(bucket, measure) + value)
+    await db.commit()
+    return ready
+
+async def rolled_up_totals(db: AsyncSession, spec: RollupSpec, start: datetime, dimensions: tuple) -> dict:
+    """Measures grouped by the given dimensions from `start`'s hour onwards.
+
+    Reads the rollup table and merges in source rows past the high-water mark (grouped
+    in SQL too), so the result is exact up to now without scanning the raw table's full range.
+    """
+    start_hour = hour_bucket(start)
+    target_columns = [getattr(spec.target, dimension) for dimension in dimensions]
+    aggregates = []
+    for measure, kind in spec.measures.items():
+        column = getattr(spec.target, measure)
+        aggregates.append((func.max(column) if kind == "max" else func.sum(column)).label(measure))
+
+    totals = {}
+    rollup_rows = (await db.execute(
+        select(*target_columns, *aggregates).where(spec.target.hour >= start_hour).group_by(*target_columns)
+    )).all()
+    for row in rollup_rows:
+        key = tuple(row[:len(dimensions)])
+        totals[key] = {measure: getattr(row, measure) or 0 for measure in spec.measures}
+
+    watermark = await get_watermark(db, spec)
+    recent = await spec.aggregate(db, dimensions, spec.source.id > watermark, spec.source.created_at >= start_hour)
+    for key, measures in recent.items():
+        bucket = totals.setdefault(key, {measure: 0 for measure in spec.measures})
+        for measure, value in measures.items():
+            if spec.measures[measure] == "max":
+                bucket[measure] = max(bucket[measure], value)
+            else:
+                bucket[measure] += value
+    return totals
+
+class RollupWorker:
+    """Background task that keeps the hourly rollup tables up to date"""
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task = None
+        # Counters
+        self.runs = 0
+        self.rows_folded = 0
+        self.failures = 0
+        self.last_run_ms = 0.0
+        self.last_error = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self):
+        """Fold everything that is ready, one batch per transaction"""
+        started = time.perf_counter()
+        try:
+            for spec in ROLLUPS:
+                while True:
+                    async with AsyncSessionLocal() as db:
+                        folded = await roll_up_batch(db, spec, self.batch_size)
+                    self.rows_folded += folded
+                    if folded < self.batch_size:
+                        break
+            self.last_error = None
+        except Exception as e:
+            # Keep the worker alive; the next run retries from the same watermark
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"Rollup failed: {e}")
+        finally:
+            self.runs += 1
+            self.last_run_ms = (time.perf_counter() - started) * 1000
+
+    async def _run(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "rows_folded": self.rows_folded,
+            "failures": self.failures,
+            "last_run_ms": round(self.last_run_ms, 2),
+            "last_error": self.last_error,
+        }
+
+rollup_worker = RollupWorker(interval=ROLLUP_INTERVAL_SECONDS, batch_size=ROLLUP_BATCH_SIZE)
@@ -0,0 +1,40 @@
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.routing import APIRoute
+from models.api_route import ApiRoute
+
+# Rollup label for requests that matched no route (404s, scanners)
+UNMATCHED_ROUTE = "(unmatched)"
+
+def get_route_templates(routes) -> list:
+    """Path templates of the app's API routes (static mounts are left out)"""
+    return sorted({route.path for route in routes if isinstance(route, APIRoute)})
+
+class RouteRegistry:
+    """In-process map of route template -> api_routes.id, filled at startup"""
+
+    def __init__(self):
+        self._ids = {}
+
+    def get_id(self, template: str) -> int | None:
+        return self._ids.get(template)
+
+    async def sync(self, db: AsyncSession, templates: list):
+        """Make sure every template has an api_routes row, then load all ids"""
+        known = set((await db.execute(select(ApiRoute.template))).scalars())
+        for template in templates:
+            if template in known:
+                continue
+            try:
+                db.add(ApiRoute(template=template))
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()  # Another worker added it first
+        rows = (await db.execute(select(ApiRoute.template, ApiRoute.id))).all()
+        self._ids = {template: route_id for template, route_id in rows}
+
+    def stats(self) -> dict:
+        return {"routes": len(self._ids)}
+
+route_registry = RouteRegistry()
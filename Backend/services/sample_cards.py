@@ -0,0 +1,205 @@
+import json
+from sqlalchemy import event, select, insert, delete, inspect, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from database import AppSession
+from models.sample_card import SampleCard
+from models.sample import Sample, sample_departments, sample_tests
+from models.customer import Customer
+from models.project import Project
+from models.sample_type import SampleType
+from models.department import Department
+from models.test_type import TestType
+
+# Samples whose cards are rebuilt per statement batch
+SAMPLE_CARD_BATCH_SIZE = 500
+
+# Attributes copied onto cards, per related model; a change to any of them refreshes the cards showing it
+CARD_SOURCE_ATTRIBUTES = {
+    Customer: ("customer_id", "full_name", "email", "phone", "company_name"),
+    Project: ("name",),
+    SampleType: ("name",),
+    Department: ("name",),
+    TestType: ("name",),
+}
+
+def _cards_showing(model, ids: list):
+    """SELECT of the sample ids whose cards show the given related records"""
+    if model is Customer:
+        return select(SampleCard.id).where(SampleCard.customer_id.in_(ids))
+    if model is Project:
+        return select(SampleCard.id).where(SampleCard.project_id.in_(ids))
+    if model is SampleType:
+        return select(SampleCard.id).where(SampleCard.sample_type_id.in_(ids))
+    if model is Department:
+        return select(sample_departments.c.sample_id).where(sample_departments.c.department_id.in_(ids))
+    return select(sample_tests.c.sample_id).where(sample_tests.c.test_type_id.in_(ids))
+
+def _search_text(*fields) -> str:
+    # One field per line, so a search term can't match across two fields
+    return "\n".join(field.upper() for field in fields if field)
+
+def _card_rows(connection, sample_ids: list) -> list:
+    """Card values for the given samples, built with three queries"""
+    departments, test_types = {}, {}
+    for names, table, column, model in (
+        (departments, sample_departments, sample_departments.c.department_id, Department),
+        (test_types, sample_tests, sample_tests.c.test_type_id, TestType),
+    ):
+        for sample_id, name in connection.execute(
+            select(table.c.sample_id, model.name)
+            .join(model, model.id == column)
+            .where(table.c.sample_id.in_(sample_ids))
+            .order_by(table.c.sample_id, model.id)
+        ):
+            names.setdefault(sample_id, []).append(name)
+
+    rows = connection.execute(
+        select(
+            Sample.id, Sample.sample_id, Sample.customer_id, Sample.project_id, Sample.sample_type_id, Sample.name,
+            Sample.volume, Sample.conditions, Sample.notes, Sample.is_batch, Sample.batch_size, Sample.status,
+            Sample.created_at, Sample.updated_at,
+            Customer.customer_id.label("customer_code"), Customer.full_name, Customer.email, Customer.phone,
+            Customer.company_name, Project.name.label("project_name"), SampleType.name.label("sample_type_name"),
+        )
+        .select_from(Sample)
+        .join(Customer, Customer.id == Sample.customer_id)
+        .outerjoin(Project, Project.id == Sample.project_id)
+        .outerjoin(SampleType, SampleType.id == Sample.sample_type_id)
+        .where(Sample.id.in_(sample_ids))
+    ).all()
+    return [
+        {
+            "id": row.id,
+            "sample_code": row.sample_id,
+            "customer_id": row.customer_id,
+            "project_id": row.project_id,
+            "sample_type_id": row.sample_type_id,
+            "name": row.name,
+            "volume": row.volume,
+            "conditions": row.conditions,
+            "notes": row.notes,
+            "is_batch": row.is_batch,
+            "batch_size": row.batch_size,
+            "status": row.status,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "customer_code": row.customer_code,
+            "customer_name": row.full_name,
+            "customer_email": row.email,
+            "customer_phone": row.phone,
+            "customer_company": row.company_name,
+            "project_name": row.project_name,
+            "sample_type_name": row.sample_type_name,
+            "department_names": json.dumps(departments.get(row.id, [])),
+            "test_type_names": json.dumps(test_types.get(row.id, [])),
+            "search_text": _search_text(
+                row.sample_id, row.name, row.full_name, row.email, row.company_name, row.customer_code,
+                row.project_name, row.sample_type_name,
+            ),
+        }
+        for row in rows
+    ]
+
+def refresh_sample_cards(connection, sample_ids) -> int:
+    """Rebuild the cards of the given samples (dropping those of deleted samples); returns cards written"""
+    sample_ids = sorted(sample_ids)
+    written = 0
+    for start in range(0, len(sample_ids), SAMPLE_CARD_BATCH_SIZE):
+        batch = sample_ids[start:start + SAMPLE_CARD_BATCH_SIZE]
+        connection.execute(delete(SampleCard).where(SampleCard.id.in_(batch)))
+        rows = _card_rows(connection, batch)
+        if rows:
+            connection.execute(insert(SampleCard), rows)
+        written += len(rows)
+    return written
+
+def _changed(obj, attributes: tuple) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[attribute].history.has_changes() for attribute in attributes)
+
+def _refresh_after_flush(session: Session, flush_context):
+    """Refresh the cards affected by this flush, in the flush's own transaction.
+
+    session.new/dirty/deleted and attribute history still describe what was just
+    flushed, while the cards still hold the previous customer/project/sample type
+    ids, so records that were just deleted can still be traced to their cards.
+    """
+    sample_ids = set()
+    sources = {}
+    for obj in session.new:
+        if isinstance(obj, Sample):
+            sample_ids.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Sample):
+            if session.is_modified(obj):
+                sample_ids.add(obj.id)
+        elif type(obj) in CARD_SOURCE_ATTRIBUTES and _changed(obj, CARD_SOURCE_ATTRIBUTES[type(obj)]):
+            sources.setdefault(type(obj), []).append(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Sample):
+            sample_ids.add(obj.id)
+        elif type(obj) in CARD_SOURCE_ATTRIBUTES:
+            sources.setdefault(type(obj), []).append(obj.id)
+    if not sample_ids and not sources:
+        return
+    connection = session.connection()
+    for model, ids in sources.items():
+        sample_ids.update(connection.execute(_cards_showing(model, ids)).scalars())
+    refresh_sample_cards(connection, sample_ids)
+
+# Only the app's sessions (AppSession is also the sync session under AsyncSessionLocal)
+event.listen(AppSession, "after_flush", _refresh_after_flush)
+
+def rebuild_sample_cards(db: Session, batch_size: int = SAMPLE_CARD_BATCH_SIZE) -> int:
+    """Regenerate every card from the source tables; returns cards written. The caller commits.
+
+    Runs in one transaction, so readers keep seeing the previous cards until the commit.
+    """
+    connection = db.connection()
+    connection.execute(delete(SampleCard))
+    written, last_id = 0, 0
+    while True:
+        sample_ids = connection.execute(
+            select(Sample.id).where(Sample.id > last_id).order_by(Sample.id).limit(batch_size)
+        ).scalars().all()
+        if not sample_ids:
+            return written
+        written += refresh_sample_cards(connection, sample_ids)
+        last_id = sample_ids[-1]
+
+def check_sample_cards(db: Session, batch_size: int = SAMPLE_CARD_BATCH_SIZE) -> dict:
+    """Compare the cards with what a rebuild would write: {"missing", "stale", "orphaned"} card counts"""
+    connection = db.connection()
+    report = {"missing": 0, "stale": 0, "orphaned": 0}
+    last_id = 0
+    while True:
+        sample_ids = connection.execute(
+            select(Sample.id).where(Sample.id > last_id).order_by(Sample.id).limit(batch_size)
+        ).scalars().all()
+        if not sample_ids:
+            break
+        stored = {
+            row["id"]: dict(row)
+            for row in connection.execute(select(SampleCard.__table__).where(SampleCard.id.in_(sample_ids))).mappings()
+        }
+        for expected in _card_rows(connection, sample_ids):
+            card = stored.get(expected["id"])
+            if card is None:
+                report["missing"] += 1
+            elif card != expected:
+                report["stale"] += 1
+        last_id = sample_ids[-1]
+    report["orphaned"] = connection.scalar(
+        select(func.count()).select_from(SampleCard).where(SampleCard.id.not_in(select(Sample.id)))
+    )
+    return report
+
+async def seed_sample_cards(db: AsyncSession):
+    """Build the cards at startup if the table is still empty (e.g. right after the migration)"""
+    if await db.scalar(select(SampleCard.id).limit(1)) is not None:
+        return
+    if await db.scalar(select(Sample.id).limit(1)) is None:
+        return
+    await db.run_sync(rebuild_sample_cards)
+    await db.commit()
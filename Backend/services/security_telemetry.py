@@ -0,0 +1,305 @@
+import asyncio
+import os
+import time
+from collections import Counter, OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+from database import AsyncSessionLocal
+from models.login_history import LoginHistory
+from models.request_log import RequestLog
+from services.rollups import hour_bucket, to_naive_utc, inserted_before_lag
+from services.login_throttle import RATE_LIMITED_REASON
+
+load_dotenv()
+
+# How far back failed-login buckets are kept (the telemetry endpoint's longest period)
+SECURITY_TELEMETRY_DAYS = int(os.getenv("SECURITY_TELEMETRY_DAYS", "90"))
+# Seconds between the background refreshes that fold in new rows
+SECURITY_TELEMETRY_REFRESH_SECONDS = float(os.getenv("SECURITY_TELEMETRY_REFRESH_SECONDS", "5"))
+# Distinct IPs counted per hour; beyond that the least frequent is replaced (space-saving), so an
+# attack from many addresses can't grow the store while the heaviest offenders stay counted
+SECURITY_TELEMETRY_IPS_PER_HOUR = int(os.getenv("SECURITY_TELEMETRY_IPS_PER_HOUR", "200"))
+SECURITY_TELEMETRY_BATCH_SIZE = int(os.getenv("SECURITY_TELEMETRY_BATCH_SIZE", "20000"))
+# Rows inserted less than this ago are left for the next refresh, so an insert that hasn't
+# committed yet can't end up below the watermark and be skipped
+SECURITY_TELEMETRY_LAG_SECONDS = float(os.getenv("SECURITY_TELEMETRY_LAG_SECONDS", "2"))
+RECENT_FAILED_LOGINS = 50
+RECENT_ERROR_REQUESTS = 100
+# Periods (start hours) whose merged counts are kept and updated as rows are folded in
+MERGED_PERIODS = 8
+
+FAILED_LOGIN_COLUMNS = (
+    LoginHistory.id, LoginHistory.email, LoginHistory.ip_address, LoginHistory.failure_reason,
+    LoginHistory.user_agent, LoginHistory.created_at,
+)
+ERROR_REQUEST_COLUMNS = (
+    RequestLog.id, RequestLog.method, RequestLog.path, RequestLog.status_code, RequestLog.user_id,
+    RequestLog.ip_address, RequestLog.error_message, RequestLog.created_at,
+)
+
+def _count_capped(counter: Counter, key, limit: int) -> tuple:
+    """Count `key`, evicting the least frequent key when the counter is full (space-saving).
+
+    The newcomer inherits the evicted count, so counts are upper bounds, but any key
+    seen more than total / limit times is guaranteed to still be present.
+    Returns (evicted key or None, its count); `key` gained that count plus one.
+    """
+    if key in counter or len(counter) < limit:
+        counter[key] += 1
+        return None, 0
+    smallest, count = min(counter.items(), key=lambda item: item[1])
+    del counter[smallest]
+    counter[key] = count + 1
+    return smallest, count
+
+class FailedLoginHour:
+    """Failed-login counts for one UTC hour (or, merged, for every hour of a period)"""
+
+    __slots__ = ("failed", "reasons", "ips")
+
+    def __init__(self):
+        self.failed = 0
+        self.reasons = Counter()
+        self.ips = Counter()
+
+class SecurityTelemetryStore:
+    """Failed-login counts by hour, reason and IP plus the latest failures and error requests.
+
+    The store follows login_history and request_logs by id watermark from a
+    background task, so each refresh reads only rows recorded since the previous
+    one (and every worker process sees the same data) and requests only read the
+    current state. The first read of a period merges at most one bucket per hour,
+    each holding a bounded number of IPs; the merged counts are then updated as
+    rows are folded in, so a read costs the same however many attempts were made.
+    """
+
+    def __init__(self, days: int, refresh_seconds: float, ips_per_hour: int, batch_size: int, lag_seconds: float):
+        self.days = days
+        self.refresh_seconds = refresh_seconds
+        self.ips_per_hour = ips_per_hour
+        self.batch_size = batch_size
+        self.lag_seconds = lag_seconds
+        self._hours = {}  # naive UTC hour -> FailedLoginHour
+        self._recent_failed_logins = deque(maxlen=RECENT_FAILED_LOGINS)
+        self._recent_error_requests = deque(maxlen=RECENT_ERROR_REQUESTS)
+        self._login_watermark = None
+        self._request_watermark = None
+        self._merged = OrderedDict()  # start hour -> FailedLoginHour over the hours from it, least recently read first
+        self._task = None
+        # Counters
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+        self.failed_logins_folded = 0
+        self.error_requests_folded = 0
+        self.merges = 0
+        self.last_refresh_ms = 0.0
+
+    def _fold_failed_login(self, row):
+        hour = hour_bucket(row.created_at)
+        bucket = self._hours.get(hour)
+        if bucket is None:
+            bucket = self._hours[hour] = FailedLoginHour()
+        reason = row.failure_reason or "Unknown"
+        if reason.startswith(RATE_LIMITED_REASON):
+            reason = RATE_LIMITED_REASON  # "Rate limited (N attempts)" rows from the login throttle
+        # Merged periods including this hour get the same change as its bucket, so they stay its sum
+        merged = [counts for start_hour, counts in self._merged.items() if start_hour <= hour]
+        for counts in (bucket, *merged):
+            counts.failed += 1
+            counts.reasons[reason] += 1
+        if row.ip_address:
+            evicted, count = _count_capped(bucket.ips, row.ip_address, self.ips_per_hour)
+            for counts in merged:
+                counts.ips[row.ip_address] += count + 1
+                if evicted is not None:
+                    counts.ips[evicted] -= count
+                    if counts.ips[evicted] <= 0:
+                        del counts.ips[evicted]
+        self._recent_failed_logins.appendleft(row)
+
+    def _fold_error_request(self, row):
+        self._recent_error_requests.appendleft(row)
+
+    async def _tail(self, db: AsyncSession, columns: tuple, criteria: tuple, inserted_at, watermark: int,
+                    fold) -> tuple:
+        """Fold rows past `watermark` that match `criteria`; returns (new watermark, rows folded).
+
+        The range ends at the highest id inserted (per the `inserted_at` column, on the
+        database's clock) before the lag, and the watermark moves to that end even when
+        nothing in it matched, so quiet periods aren't rescanned. Ids are assigned on
+        insert, so every lower id has had the lag to commit.
+        """
+        model = columns[0].class_
+        settled = inserted_before_lag(inserted_at, self.lag_seconds, db.bind.dialect.name)
+        upper = await db.scalar(select(func.max(model.id)).where(model.id > watermark, settled))
+        if upper is None or upper <= watermark:
+            return watermark, 0
+        folded = 0
+        while True:
+            rows = (await db.execute(
+                select(*columns)
+                .where(model.id > watermark, model.id <= upper, *criteria)
+                .order_by(model.id)
+                .limit(self.batch_size)
+            )).all()
+            for row in rows:
+                fold(row)
+            folded += len(rows)
+            if len(rows) < self.batch_size:
+                return upper, folded
+            watermark = rows[-1].id
+
+    async def _initial_watermarks(self, db: AsyncSession, since: datetime):
+        """Start failed logins at the beginning of the kept period and error requests at the latest 100"""
+        first_login = await db.scalar(select(func.min(LoginHistory.id)).where(LoginHistory.created_at >= since))
+        if first_login is None:
+            first_login = await db.scalar(select(func.coalesce(func.max(LoginHistory.id), 0))) + 1
+        self._login_watermark = first_login - 1
+        # Only the ring buffer needs error requests, so seed it directly instead of scanning the period
+        recent_errors = (await db.execute(
+            select(*ERROR_REQUEST_COLUMNS)
+            .where(RequestLog.status_code >= 400)
+            .order_by(RequestLog.id.desc())
+            .limit(RECENT_ERROR_REQUESTS)
+        )).all()
+        for row in reversed(recent_errors):
+            self._fold_error_request(row)
+        self._request_watermark = recent_errors[0].id if recent_errors else await db.scalar(
+            select(func.coalesce(func.max(RequestLog.id), 0))
+        )
+
+    async def refresh(self):
+        """Fold failed logins and error requests recorded since the last refresh"""
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        since = hour_bucket(now - timedelta(days=self.days))
+        async with AsyncSessionLocal() as db:
+            if self._login_watermark is None:
+                await self._initial_watermarks(db, since)
+            self._login_watermark, failed_logins = await self._tail(
+                db, FAILED_LOGIN_COLUMNS, (LoginHistory.success == False,), LoginHistory.created_at,
+                self._login_watermark, self._fold_failed_login,
+            )
+            self._request_watermark, error_requests = await self._tail(
+                db, ERROR_REQUEST_COLUMNS, (RequestLog.status_code >= 400,), RequestLog.inserted_at,
+                self._request_watermark, self._fold_error_request,
+            )
+        for hour in [hour for hour in self._hours if hour < since]:
+            del self._hours[hour]
+        for start_hour in [start_hour for start_hour in self._merged if start_hour < since]:
+            del self._merged[start_hour]
+        self.failed_logins_folded += failed_logins
+        self.error_requests_folded += error_requests
+        self.refreshes += 1
+        self.last_refresh_ms = (time.perf_counter() - started) * 1000
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # Keep the task alive; the next refresh continues from the same watermarks
+                self.failures += 1
+                self.last_error = str(e)
+                print(f"Security telemetry refresh failed: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def _merge(self, start_hour: datetime) -> FailedLoginHour:
+        """Counts over the hours from `start_hour`, merged on the first read and kept up to date after"""
+        merged = self._merged.get(start_hour)
+        if merged is not None:
+            self._merged.move_to_end(start_hour)
+            return merged
+        merged = FailedLoginHour()
+        for hour, bucket in self._hours.items():
+            if hour >= start_hour:
+                merged.failed += bucket.failed
+                merged.reasons.update(bucket.reasons)
+                merged.ips.update(bucket.ips)
+        self.merges += 1
+        self._merged[start_hour] = merged
+        while len(self._merged) > MERGED_PERIODS:
+            self._merged.popitem(last=False)
+        return merged
+
+    def failed_logins(self, since: datetime, top_ips: int = 20) -> dict:
+        """Failed logins from `since`'s hour onwards: total, by reason, top IPs and the latest attempts"""
+        merged = self._merge(hour_bucket(since))
+        since = to_naive_utc(since)
+        return {
+            "total": merged.failed,
+            "by_reason": dict(merged.reasons.most_common()),
+            "by_ip": dict(merged.ips.most_common(top_ips)),
+            "recent": [
+                {
+                    "id": login.id,
+                    "email": login.email,
+                    "ip_address": login.ip_address,
+                    "failure_reason": login.failure_reason,
+                    "user_agent": login.user_agent,
+                    "created_at": login.created_at.isoformat() if login.created_at else None
+                }
+                for login in self._recent_failed_logins
+                if to_naive_utc(login.created_at) >= since
+            ],
+        }
+
+    def error_requests(self, since: datetime) -> list:
+        """The latest 4xx/5xx requests from `since` onwards, newest first"""
+        since = to_naive_utc(since)
+        return [
+            {
+                "id": req.id,
+                "method": req.method.value,
+                "path": req.path,
+                "status_code": req.status_code,
+                "user_id": req.user_id,
+                "ip_address": req.ip_address,
+                "error_message": req.error_message,
+                "created_at": req.created_at.isoformat() if req.created_at else None
+            }
+            for req in self._recent_error_requests
+            if to_naive_utc(req.created_at) >= since
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "hours": len(self._hours),
+            "recent_failed_logins": len(self._recent_failed_logins),
+            "recent_error_requests": len(self._recent_error_requests),
+            "login_watermark": self._login_watermark,
+            "request_watermark": self._request_watermark,
+            "refreshes": self.refreshes,
+            "failed_logins_folded": self.failed_logins_folded,
+            "error_requests_folded": self.error_requests_folded,
+            "merges": self.merges,
+            "failures": self.failures,
+            "last_refresh_ms": round(self.last_refresh_ms, 2),
+            "last_error": self.last_error,
+        }
+
+security_telemetry = SecurityTelemetryStore(
+    days=SECURITY_TELEMETRY_DAYS,
+    refresh_seconds=SECURITY_TELEMETRY_REFRESH_SECONDS,
+    ips_per_hour=SECURITY_TELEMETRY_IPS_PER_HOUR,
+    batch_size=SECURITY_TELEMETRY_BATCH_SIZE,
+    lag_seconds=SECURITY_TELEMETRY_LAG_SECONDS,
+)
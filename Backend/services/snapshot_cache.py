@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+class SnapshotCache:
+    """Caches the result of an expensive async loader with stale-while-revalidate.
+
+    Within `ttl` seconds the cached value is returned as is. After that, and up to
+    `max_stale` seconds, the stale value is still returned straight away while a
+    single background task reloads it. Older than that (or on first use) callers
+    wait for a reload. The loader takes no arguments and must open its own session,
+    because background reloads outlive the request that triggered them.
+    """
+
+    def __init__(self, name: str, loader, ttl: float, max_stale: float):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.max_stale = max(ttl, max_stale)
+        self._value = None
+        self._loaded_at = None
+        self._refresh_task = None
+        # Counters
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.loads = 0
+        self.failures = 0
+        self.last_load_ms = 0.0
+
+    async def _load(self):
+        started = time.perf_counter()
+        try:
+            value = await self.loader()
+        except Exception:
+            self.failures += 1
+            raise
+        self.last_load_ms = (time.perf_counter() - started) * 1000
+        self.loads += 1
+        self._value = value
+        self._loaded_at = time.monotonic()
+        return value
+
+    def _refresh(self) -> asyncio.Task:
+        """Start a reload unless one is already running (concurrent callers share it)"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._load())
+            # A failed background reload keeps serving the stale value; don't warn about it
+            self._refresh_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return self._refresh_task
+
+    async def get(self):
+        if self._loaded_at is not None:
+            age = time.monotonic() - self._loaded_at
+            if age < self.ttl:
+                self.fresh_hits += 1
+                return self._value
+            if age < self.max_stale:
+                self.stale_hits += 1
+                self._refresh()
+                return self._value
+        return await asyncio.shield(self._refresh())
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def stats(self) -> dict:
+        """Snapshot of age and hit counters"""
+        return {
+            "ttl_seconds": self.ttl,
+            "max_stale_seconds": self.max_stale,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "loads": self.loads,
+            "failures": self.failures,
+            "last_load_ms": round(self.last_load_ms, 2),
+        }
@@ -0,0 +1,91 @@
+import enum
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.organization import Organization
+
+class Granularity(str, enum.Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+async def get_organization_timezone(db: AsyncSession) -> ZoneInfo:
+    """The organization's configured time zone, or UTC if unset or unknown"""
+    name = await db.scalar(select(Organization.timezone).limit(1))
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+class TimeBucketer:
+    """Splits time into local hour / day / week (Monday) / month buckets for one time zone.
+
+    Bucket boundaries are local wall-clock times, so a day bucket across a DST change
+    is 23 or 25 hours long. Hour buckets are UTC hours shown in local time, which keeps
+    them aligned with the hourly rollups (zones with a :30/:45 offset label them
+    accordingly, e.g. 05:30-06:30).
+    """
+
+    def __init__(self, tz: ZoneInfo, granularity: Granularity):
+        self.tz = tz
+        self.granularity = Granularity(granularity)
+
+    def floor(self, moment: datetime) -> datetime:
+        """Start of the bucket containing `moment` (naive values are UTC), as an aware local datetime"""
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        if self.granularity == Granularity.HOUR:
+            return moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0).astimezone(self.tz)
+        local = moment.astimezone(self.tz)
+        if self.granularity == Granularity.WEEK:
+            local = local - timedelta(days=local.weekday())
+        day = 1 if self.granularity == Granularity.MONTH else local.day
+        return datetime(local.year, local.month, day, tzinfo=self.tz)
+
+    def next(self, start: datetime) -> datetime:
+        """Start of the bucket after the one starting at `start`"""
+        if self.granularity == Granularity.HOUR:
+            return (start.astimezone(timezone.utc) + timedelta(hours=1)).astimezone(self.tz)
+        if self.granularity == Granularity.MONTH:
+            year, month = (start.year + 1, 1) if start.month == 12 else (start.year, start.month + 1)
+            return datetime(year, month, 1, tzinfo=self.tz)
+        step = 7 if self.granularity == Granularity.WEEK else 1
+        # Step the wall-clock date, not elapsed time, so DST changes don't shift the boundary
+        following = start.date() + timedelta(days=step)
+        return datetime(following.year, following.month, following.day, tzinfo=self.tz)
+
+    def buckets_since(self, since: datetime, until: datetime) -> list:
+        """Starts of every bucket that lies after `since`, up to the one containing `until`"""
+        start = self.floor(since)
+        if start < since:
+            start = self.next(start)
+        buckets = []
+        while start <= until:
+            buckets.append(start)
+            start = self.next(start)
+        return buckets
+
+    def label(self, start: datetime) -> str:
+        if self.granularity == Granularity.HOUR:
+            return start.strftime("%Y-%m-%d %H:%M")
+        if self.granularity == Granularity.MONTH:
+            return start.strftime("%Y-%m")
+        return start.strftime("%Y-%m-%d")
+
+def zero_filled_series(bucketer: TimeBucketer, buckets: list, counts) -> list:
+    """Fold (moment, key, value) triples into [(bucket start, {key: total})], with every bucket present.
+
+    `moment` is a naive UTC or aware datetime (rollup hours, raw created_at values);
+    triples outside the bucket range are dropped.
+    """
+    # Keyed by UTC instant: aware datetimes sharing a tzinfo compare by wall clock, which
+    # would merge the two 02:00 hours of a DST fall-back
+    series = {start.astimezone(timezone.utc): {} for start in buckets}
+    for moment, key, value in counts:
+        totals = series.get(bucketer.floor(moment).astimezone(timezone.utc))
+        if totals is None:
+            continue
+        totals[key] = totals.get(key, 0) + value
+    return [(start, series[start.astimezone(timezone.utc)]) for start in buckets]
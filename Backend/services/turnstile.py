@@ -0,0 +1,159 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Point this at a local stub server to test logins without Cloudflare
+TURNSTILE_VERIFY_URL = os.getenv("TURNSTILE_VERIFY_URL", "https://challenges.cloudflare.com/turnstile/v0/siteverify")
+TURNSTILE_TIMEOUT_SECONDS = float(os.getenv("TURNSTILE_TIMEOUT_SECONDS", "3"))
+
+# How long a rejection of a token is reused, so a bad token replayed in a loop doesn't reach
+# Cloudflare each time. Successes are never cached: a solved challenge is good for one login
+TURNSTILE_VERDICT_TTL_SECONDS = float(os.getenv("TURNSTILE_VERDICT_TTL_SECONDS", "300"))
+TURNSTILE_VERDICT_CACHE_SIZE = int(os.getenv("TURNSTILE_VERDICT_CACHE_SIZE", "10000"))
+
+# What to do when Cloudflare can't be reached or the breaker is open:
+#   closed - reject the login (default)
+#   open   - let the login through on the password alone
+TURNSTILE_FAILURE_POLICY = os.getenv("TURNSTILE_FAILURE_POLICY", "closed").lower()
+# Consecutive failures that open the breaker, and how long it stays open before retrying
+TURNSTILE_BREAKER_THRESHOLD = int(os.getenv("TURNSTILE_BREAKER_THRESHOLD", "5"))
+TURNSTILE_BREAKER_COOLDOWN_SECONDS = float(os.getenv("TURNSTILE_BREAKER_COOLDOWN_SECONDS", "30"))
+
+class TurnstileVerifier:
+    """Verifies Turnstile tokens over a pooled async client, with rejection caching and a circuit breaker"""
+
+    def __init__(self, verify_url: str, timeout: float, verdict_ttl: float, cache_size: int,
+                 failure_policy: str, breaker_threshold: int, breaker_cooldown: float):
+        self.verify_url = verify_url
+        self.timeout = timeout
+        self.verdict_ttl = verdict_ttl
+        self.cache_size = cache_size
+        self.failure_policy = failure_policy
+        self.breaker_threshold = max(1, breaker_threshold)
+        self.breaker_cooldown = breaker_cooldown
+        self._client = None
+        self._rejections = OrderedDict()  # token digest -> expires_at
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._probing = False  # A half-open probe is in flight
+        # Counters
+        self.verified = 0
+        self.rejected = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.short_circuited = 0
+        self.failed_open = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the running event loop; reused to keep TLS connections alive
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def breaker_state(self) -> str:
+        if self._consecutive_failures < self.breaker_threshold:
+            return "closed"
+        return "open" if time.monotonic() < self._open_until else "half_open"
+
+    def _rejected_before(self, key: str) -> bool:
+        expires_at = self._rejections.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._rejections[key]
+            return False
+        return True
+
+    def _remember_rejection(self, key: str):
+        self._rejections[key] = time.monotonic() + self.verdict_ttl
+        self._rejections.move_to_end(key)
+        while len(self._rejections) > self.cache_size:
+            self._rejections.popitem(last=False)
+
+    def _unavailable(self) -> bool:
+        """Verdict to use when Cloudflare can't give one"""
+        if self.failure_policy == "open":
+            self.failed_open += 1
+            return True
+        return False
+
+    async def verify(self, token: str, secret_key: str, remote_ip: str = None) -> bool:
+        """Verify Turnstile token with Cloudflare"""
+        key = hashlib.sha256(f"{secret_key}:{token}".encode()).hexdigest()
+        if self._rejected_before(key):
+            self.cache_hits += 1
+            return False
+
+        # While half-open a single request probes Cloudflare; the others are short-circuited until it answers
+        state = self.breaker_state
+        if state == "open" or (state == "half_open" and self._probing):
+            self.short_circuited += 1
+            return self._unavailable()
+        probe = state == "half_open"
+
+        data = {"secret": secret_key, "response": token}
+        if remote_ip:
+            data["remoteip"] = remote_ip
+        if probe:
+            self._probing = True
+        try:
+            response = await self._get_client().post(self.verify_url, data=data)
+            response.raise_for_status()
+            success = bool(response.json().get("success", False))
+        except Exception as e:
+            print(f"Turnstile verification error: {type(e).__name__}: {e}")
+            self.errors += 1
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.breaker_threshold:
+                self._open_until = time.monotonic() + self.breaker_cooldown
+            return self._unavailable()
+        finally:
+            if probe:
+                self._probing = False
+
+        self._consecutive_failures = 0
+        if success:
+            self.verified += 1
+        else:
+            self._remember_rejection(key)
+            self.rejected += 1
+        return success
+
+    def stats(self) -> dict:
+        """Snapshot of verdict counters and breaker state"""
+        return {
+            "failure_policy": self.failure_policy,
+            "breaker_state": self.breaker_state,
+            "consecutive_failures": self._consecutive_failures,
+            "cached_rejections": len(self._rejections),
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "cache_hits": self.cache_hits,
+            "errors": self.errors,
+            "short_circuited": self.short_circuited,
+            "failed_open": self.failed_open,
+        }
+
+turnstile_verifier = TurnstileVerifier(
+    verify_url=TURNSTILE_VERIFY_URL,
+    timeout=TURNSTILE_TIMEOUT_SECONDS,
+    verdict_ttl=TURNSTILE_VERDICT_TTL_SECONDS,
+    cache_size=TURNSTILE_VERDICT_CACHE_SIZE,
+    failure_policy=TURNSTILE_FAILURE_POLICY,
+    breaker_threshold=TURNSTILE_BREAKER_THRESHOLD,
+    breaker_cooldown=TURNSTILE_BREAKER_COOLDOWN_SECONDS,
+)
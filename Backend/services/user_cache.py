@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from dotenv import load_dotenv
+from models.user import User, UserType
+
+load_dotenv()
+
+# How long a resolved user is trusted before it is read from the database again.
+# Invalidation only reaches the current process, so with several workers this is
+# also the longest a suspension can take to apply everywhere.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "1000"))
+
+class UserSnapshot:
+    """Read-only copy of the User columns routes read from current_user.
+
+    It is detached from any session, so routes that need to change the user
+    must load the User row themselves.
+    """
+
+    __slots__ = ("id", "email", "full_name", "user_type", "is_active",
+                 "needs_password_reset", "created_at", "updated_at")
+
+    def __init__(self, id: int, email: str, full_name: str, user_type: UserType, is_active: bool,
+                 needs_password_reset: bool, created_at: datetime, updated_at: datetime):
+        self.id = id
+        self.email = email
+        self.full_name = full_name
+        self.user_type = user_type
+        self.is_active = is_active
+        self.needs_password_reset = needs_password_reset
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            user_type=user.user_type,
+            is_active=user.is_active,
+            needs_password_reset=user.needs_password_reset,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+    def __repr__(self):
+        return f"<UserSnapshot {self.email} ({self.user_type})>"
+
+class UserCache:
+    """LRU cache of user snapshots with a TTL, keyed by what the token identifies the user by"""
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()  # key -> (expires_at, snapshot)
+        # Routes that change users run in pool threads, so every access takes the lock
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return the cached snapshot for key, or None if missing or expired"""
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return snapshot
+
+    def set(self, key, snapshot: UserSnapshot):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int):
+        """Drop every cached entry for a user (call after changing or deleting them)"""
+        with self._lock:
+            stale = [key for key, (_, snapshot) in self._entries.items() if snapshot.id == user_id]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Snapshot of size and hit-rate counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "ttl_seconds": self.ttl_seconds,
+                "max_size": self.max_size,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+user_cache = UserCache(ttl_seconds=USER_CACHE_TTL_SECONDS, max_size=USER_CACHE_MAX_SIZE)
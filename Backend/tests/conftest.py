@@ -0,0 +1,120 @@
+import os
+import tempfile
+import uuid
+
+# Point the app at a throwaway SQLite database before anything imports database.py
+TEST_DATABASE = os.path.join(tempfile.mkdtemp(prefix="atlas-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DATABASE}"
+os.environ["REQUEST_LOG_SAMPLING_RULES"] = ""
+os.environ["REQUEST_LOG_SAMPLE_RATE"] = "1"
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from database import Base, engine, async_engine, SessionLocal, AsyncSessionLocal
+import models  # noqa: F401 - registers every table on Base.metadata
+from models.user import User, UserType
+from auth import create_access_token
+from middleware.logging_middleware import LoggingMiddleware
+from routes.auth import router as auth_router
+from routes.settings import router as settings_router
+from services.request_log_writer import request_log_writer
+from services.user_cache import user_cache
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    engine.dispose()
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def async_db():
+    """An AsyncSession on the test database"""
+    async with AsyncSessionLocal() as session:
+        yield session
+    # Pooled aiosqlite connections belong to this test's event loop (and keep the process alive)
+    await async_engine.dispose()
+
+@pytest.fixture
+def make_user():
+    """Create a user with a unique email and return it (detached)"""
+    def make(user_type: UserType = UserType.LAB_ANALYST, is_active: bool = True) -> User:
+        db = SessionLocal()
+        try:
+            user = User(email=f"{uuid.uuid4().hex}@example.com", hashed_password="-", full_name="Test User",
+                        user_type=user_type, is_active=is_active)
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+            db.expunge(user)
+            return user
+        finally:
+            db.close()
+    return make
+
+@pytest.fixture
+def auth_headers():
+    """Bearer header for a user, as issued by /api/auth/login"""
+    def headers(user: User) -> dict:
+        token = create_access_token({"sub": user.email, "user_type": user.user_type.value})
+        return {"Authorization": f"Bearer {token}"}
+    return headers
+
+@pytest.fixture
+def logged_rows(monkeypatch):
+    """RequestLog rows LoggingMiddleware queues, captured instead of written"""
+    rows = []
+
+    async def enqueue(row: dict):
+        rows.append(row)
+
+    monkeypatch.setattr(request_log_writer, "enqueue", enqueue)
+    return rows
+
+@pytest.fixture
+def user_lookups():
+    """SELECTs against the users table run by the async engine (what get_current_user uses)"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+@pytest.fixture
+def client(logged_rows):
+    """The auth and settings routers behind LoggingMiddleware, without main.py's background workers"""
+    user_cache.clear()
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+    app.include_router(auth_router)
+    app.include_router(settings_router)
+    with TestClient(app) as client:
+        yield client
+    user_cache.clear()
+
+@pytest.fixture
+def api(logged_rows, make_user, auth_headers):
+    """Every route of main.app behind LoggingMiddleware, called as a lab administrator.
+
+    main.py's lifespan isn't run: it starts the background workers and shuts the
+    blocking pools down on exit.
+    """
+    import main
+
+    user_cache.clear()
+    app = FastAPI()
+    app.router.routes.extend(main.app.routes)
+    app.add_middleware(LoggingMiddleware)
+    headers = auth_headers(make_user(UserType.LAB_ADMINISTRATOR))
+    with TestClient(app, headers=headers) as client:
+        yield client
+    user_cache.clear()
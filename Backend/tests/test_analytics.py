@@ -0,0 +1,36 @@
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from database import SessionLocal
+from models.customer import Customer
+from models.user import UserType
+from routes.analytics import BUSINESS_CHART_MODELS
+
+def test_business_chart_counts_every_row_in_its_hour(api, make_user, auth_headers):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    db = SessionLocal()
+    db.add_all([
+        Customer(customer_id=uuid.uuid4().hex[:5].upper(), full_name="Chart Customer", created_at=created_at)
+        for created_at in (now - timedelta(hours=3), now - timedelta(hours=3), now - timedelta(hours=30))
+    ])
+    db.commit()
+
+    response = api.get("/api/analytics/business/chart", params={"days": 2, "granularity": "hour"},
+                       headers=auth_headers(make_user(UserType.SUPER_ADMINISTRATOR)))
+    assert response.status_code == 200
+    series = response.json()
+    first = datetime.fromisoformat(series[0]["start"]).astimezone(timezone.utc).replace(tzinfo=None)
+
+    # Recount from the raw timestamps (the organization has no time zone set, so buckets are UTC hours)
+    for name, model in BUSINESS_CHART_MODELS.items():
+        expected = Counter(
+            created_at.replace(minute=0, second=0, microsecond=0)
+            for created_at in db.scalars(select(model.created_at).where(model.created_at >= first))
+        )
+        charted = {
+            datetime.fromisoformat(point["start"]).astimezone(timezone.utc).replace(tzinfo=None): point[name]
+            for point in series if point[name]
+        }
+        assert charted == dict(expected), name
+    db.close()
@@ -0,0 +1,41 @@
+import pytest
+from database import SessionLocal
+from services.entity_counters import repair_entity_counters
+
+@pytest.fixture
+def recount():
+    """Recount the counted tables; returns {name: (stored count, actual count)}"""
+    def recount(apply: bool = False) -> dict:
+        db = SessionLocal()
+        try:
+            return {name: (stored, actual) for name, stored, actual in repair_entity_counters(db, apply=apply)}
+        finally:
+            db.close()
+    return recount
+
+def test_counters_follow_writes_through_the_routers(api, recount):
+    recount(apply=True)
+    sample_type = api.post("/api/sample-types/", json={"name": "Counter Type"}).json()
+    customer = api.post("/api/customers/", json={"full_name": "Counter Customer"}).json()
+    spare = api.post("/api/customers/", json={"full_name": "Spare Customer"}).json()
+    project = api.post("/api/projects/", json={"customer_id": customer["id"], "name": "Counter Project"}).json()
+    sample = api.post("/api/samples/", json={
+        "customer_id": customer["id"], "project_id": project["id"], "sample_type_id": sample_type["id"], "name": "Counted",
+    }).json()
+    entry = api.post("/api/result-entries/", json={"sample_id": sample["id"]}).json()
+    assert api.post(f"/api/result-entries/{entry['id']}/values", json={"test_type": "pH", "value": "7"}).status_code == 201
+    assert api.post(f"/api/result-entries/{entry['id']}/commit").status_code == 200
+    report = api.post("/api/reports/", json={"result_entry_id": entry["id"]})
+    assert report.status_code == 201
+
+    counts = recount()
+    assert counts["reports"][1] >= 1
+    assert all(stored == actual for stored, actual in counts.values()), counts
+
+    assert api.delete(f"/api/reports/{report.json()['id']}").status_code == 204
+    assert api.delete(f"/api/result-entries/{entry['id']}", params={"reason": "test"}).status_code == 204
+    assert api.delete(f"/api/projects/{project['id']}").status_code == 204
+    assert api.delete(f"/api/customers/{spare['id']}").status_code == 204
+
+    counts = recount()
+    assert all(stored == actual for stored, actual in counts.values()), counts
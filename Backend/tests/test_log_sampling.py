@@ -0,0 +1,44 @@
+import pytest
+from services import log_sampling
+from services.log_sampling import LogSampler
+
+@pytest.fixture
+def draw(monkeypatch):
+    """Fix the value random.random() returns to the sampler"""
+    value = {"next": 0.0}
+    monkeypatch.setattr(log_sampling.random, "random", lambda: value["next"])
+    return value
+
+def test_first_matching_rule_sets_the_rate(draw):
+    sampler = LogSampler.from_env(
+        '[{"status": "5xx", "rate": 1}, {"method": "GET", "status": "2xx", "rate": 0.25}]', default_rate=1,
+    )
+    draw["next"] = 0.9
+    assert sampler.sample_weight("GET", "/api/samples/", 500) == 1
+    assert sampler.sample_weight("GET", "/api/samples/", 200) == 0
+    draw["next"] = 0.1
+    assert sampler.sample_weight("GET", "/api/samples/", 200) == 4
+    # No rule matches a POST, so the default rate keeps it
+    assert sampler.sample_weight("POST", "/api/samples/", 201) == 1
+    assert (sampler.kept, sampler.skipped) == (3, 1)
+
+def test_path_prefix_and_status_code_rules(draw):
+    sampler = LogSampler.from_env('[{"path": "/api/analytics", "status": [200, "3xx"], "rate": 0}]', default_rate=1)
+    assert sampler.sample_weight("GET", "/api/analytics/overview", 200) == 0
+    assert sampler.sample_weight("GET", "/api/analytics/overview", 304) == 0
+    assert sampler.sample_weight("GET", "/api/analytics/overview", 404) == 1
+    assert sampler.sample_weight("GET", "/api/samples/", 200) == 1
+
+def test_default_rate_is_rounded_to_one_in_n(draw):
+    sampler = LogSampler([], default_rate=0.3)
+    draw["next"] = 0.3
+    assert sampler.sample_weight("GET", "/", 200) == 3
+    draw["next"] = 0.34
+    assert sampler.sample_weight("GET", "/", 200) == 0
+
+@pytest.mark.parametrize("rules", ['not json', '[{"rate": 2}]', '[{"status": "4xx"}]'])
+def test_invalid_rules_log_everything(rules, draw):
+    draw["next"] = 0.99
+    sampler = LogSampler.from_env(rules, default_rate=0.01)
+    assert sampler.rules == []
+    assert sampler.sample_weight("GET", "/api/samples/", 200) == 1
@@ -0,0 +1,23 @@
+from models.user import UserType
+
+def test_logged_request_does_not_look_the_user_up_again(client, make_user, auth_headers, logged_rows, user_lookups):
+    user = make_user(UserType.LAB_ANALYST)
+    response = client.get("/api/settings/account", headers=auth_headers(user))
+    assert response.status_code == 200
+    # The only lookup is get_current_user's cache miss; the middleware reads the id it left on request.state
+    assert len(user_lookups) == 1
+    assert logged_rows[-1]["user_id"] == user.id
+    assert logged_rows[-1]["path"] == "/api/settings/account"
+
+    response = client.get("/api/settings/account", headers=auth_headers(user))
+    assert response.status_code == 200
+    assert len(user_lookups) == 1
+    assert logged_rows[-1]["user_id"] == user.id
+    assert logged_rows[-1]["query_count"] == 0
+
+def test_unauthenticated_request_is_logged_without_a_user(client, logged_rows, user_lookups):
+    response = client.get("/api/settings/account")
+    assert response.status_code == 401
+    assert user_lookups == []
+    assert logged_rows[-1]["user_id"] is None
+    assert logged_rows[-1]["status_code"] == 401
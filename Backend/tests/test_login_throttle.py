@@ -0,0 +1,37 @@
+from services.login_throttle import SlidingWindowLimiter
+
+def test_limit_reached_within_the_window():
+    limiter = SlidingWindowLimiter(limit=3, window=60, max_keys=10)
+    limiter.add("10.0.0.1", 100)
+    limiter.add("10.0.0.1", 110)
+    assert limiter.retry_after("10.0.0.1", 120) == 0
+    limiter.add("10.0.0.1", 120)
+    # Allowed again once the oldest of the three failures leaves the window
+    assert limiter.retry_after("10.0.0.1", 120) == 40
+    assert limiter.retry_after("10.0.0.1", 160) == 0
+
+def test_failures_outside_the_window_do_not_count():
+    limiter = SlidingWindowLimiter(limit=2, window=60, max_keys=10)
+    limiter.add("a", 0)
+    limiter.add("a", 100)
+    assert limiter.retry_after("a", 100) == 0
+    limiter.add("a", 110)
+    assert limiter.retry_after("a", 110) == 50
+
+def test_unknown_and_reset_keys_are_allowed():
+    limiter = SlidingWindowLimiter(limit=1, window=60, max_keys=10)
+    assert limiter.retry_after("a", 0) == 0
+    limiter.add("a", 0)
+    assert limiter.retry_after("a", 0) == 60
+    limiter.reset("a")
+    assert limiter.retry_after("a", 0) == 0
+
+def test_least_recently_seen_key_is_evicted():
+    limiter = SlidingWindowLimiter(limit=1, window=60, max_keys=2)
+    limiter.add("a", 0)
+    limiter.add("b", 0)
+    limiter.add("a", 1)
+    limiter.add("c", 2)
+    assert limiter.retry_after("b", 2) == 0
+    assert limiter.retry_after("a", 2) > 0
+    assert limiter.stats() == {"limit": 1, "keys": 2, "evicted": 1}
@@ -0,0 +1,25 @@
+import base64
+from datetime import datetime, timezone
+import pytest
+from fastapi import HTTPException
+from services.pagination import encode_cursor, decode_cursor
+
+@pytest.mark.parametrize("created_at", [
+    datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    datetime(2025, 3, 1, 12, 30, 15),
+])
+def test_cursor_round_trip(created_at):
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b'{"id": 1}').decode(),
+    base64.urlsafe_b64encode(b'{"t": "yesterday", "id": 1}').decode(),
+    base64.urlsafe_b64encode(b'[1, 2]').decode(),
+])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+    assert raised.value.status_code == 400
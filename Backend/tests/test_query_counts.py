@@ -0,0 +1,162 @@
+"""List and search endpoints must not issue a query per row.
+
+Every endpoint declared on a loader profile (services/loader_profiles.py) or served
+from a read model is requested with SMALL rows of everything and again with LARGE
+rows, reading the query count from the Server-Timing header. An endpoint fails if
+it doesn't return 200 (e.g. its response builder reads a relationship its profile
+doesn't load) or if its query count grows with the rows. An endpoint added to a
+profile needs a URL in ENDPOINT_URLS below.
+"""
+
+import re
+import uuid
+from datetime import datetime, timezone
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from database import SessionLocal
+from middleware.logging_middleware import LoggingMiddleware
+from models import (
+    User, UserType, Customer, Project, SampleType, Department, TestType, Sample, SampleActivity,
+    ResultEntry, ResultValue, Report, ReportStatus, LoginHistory, RequestLog, HTTPMethod, UserImpersonation,
+)
+from auth import create_access_token
+from services.loader_profiles import LOADER_PROFILES
+from services.request_log_writer import request_log_writer
+import main
+
+SMALL = 2
+LARGE = 40
+
+# Concrete URL for each profile endpoint ({sample}, {project} etc. are ids of the first rows added);
+# None for endpoints that write a single row per request (nothing to grow with)
+ENDPOINT_URLS = {
+    "GET /api/samples/": "/api/samples/?limit=1000",
+    "GET /api/samples/search": "/api/samples/search?q=QC",
+    "GET /api/samples/{sample_id}": "/api/samples/{sample}",
+    "GET /api/samples/{sample_id}/details": "/api/samples/{sample}/details",
+    "GET /api/projects/": "/api/projects/?limit=1000",
+    "GET /api/projects/search": "/api/projects/search?q=QCPR",
+    "GET /api/projects/{id}": "/api/projects/{project}",
+    "GET /api/departments/": "/api/departments/",
+    "GET /api/result-entries/sample/{sample_id}": "/api/result-entries/sample/{sample}",
+    "GET /api/result-entries/{result_entry_id}": "/api/result-entries/{entry}",
+    "GET /api/result-entries/search": "/api/result-entries/search?q=QC",
+    "POST /api/reports/": None,
+    "GET /api/reports/proposed": "/api/reports/proposed",
+    "GET /api/reports/finalized": "/api/reports/finalized",
+    "GET /api/reports/{report_id}": "/api/reports/{report}",
+    "GET /api/analytics/logins/history": "/api/analytics/logins/history?limit=200",
+    "GET /api/analytics/requests/log": "/api/analytics/requests/log?limit=200",
+    "GET /api/analytics/impersonate/history": "/api/analytics/impersonate/history?limit=200",
+}
+
+# Endpoints served from a read model table instead of a loader profile
+READ_MODEL_ENDPOINTS = {
+    "GET /api/samples/": "sample_cards",
+    "GET /api/samples/search": "sample_cards",
+}
+
+PROFILED_ENDPOINTS = {endpoint: profile.name for profile in LOADER_PROFILES.values() for endpoint in profile.endpoints}
+PROFILED_ENDPOINTS.update(READ_MODEL_ENDPOINTS)
+MEASURED_ENDPOINTS = [endpoint for endpoint, url in ENDPOINT_URLS.items() if url and endpoint in PROFILED_ENDPOINTS]
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+def add_rows(start: int, stop: int, admin_id: int, super_admin_id: int) -> dict:
+    """Rows numbered start..stop-1 of every kind the profiled endpoints return; ids of the first of each"""
+    db = SessionLocal()
+    try:
+        admin, super_admin = db.get(User, admin_id), db.get(User, super_admin_id)
+        sample_type = SampleType(name=f"QC Type {start}")
+        now = datetime.now(timezone.utc)
+        first = None
+        for i in range(start, stop):
+            analyst = User(email=f"analyst{i}-{uuid.uuid4().hex[:8]}@example.com", hashed_password="-",
+                           full_name=f"Analyst {i}", user_type=UserType.LAB_ANALYST)
+            department = Department(name=f"QC Department {i}")
+            test_type = TestType(department=department, name=f"QC Test {i}")
+            customer = Customer(customer_id=f"Q{i:04d}", full_name=f"QC Customer {i}", email=f"customer{i}@example.com")
+            project = Project(project_id=f"QCPR{i:04d}", customer=customer, name=f"QC Project {i}")
+            sample = Sample(sample_id=f"QC-{i:07d}", customer=customer, project=project, sample_type=sample_type,
+                            name=f"QC Sample {i}", departments=[department], test_types=[test_type])
+            entry = ResultEntry(sample=sample, created_by=analyst, is_committed=True, committed_by=admin, committed_at=now,
+                                result_values=[ResultValue(test_type=f"QC Test {i}", value=str(v)) for v in range(3)])
+            report = Report(result_entry=entry, report_number=f"RPT-QC-{i:05d}", status=ReportStatus.PROPOSED,
+                            generated_by=analyst)
+            db.add_all([
+                SampleActivity(sample=sample, user=analyst, activity_type="created"),
+                report,
+                Report(result_entry=entry, report_number=f"RPT-QCF-{i:05d}", status=ReportStatus.FINALIZED,
+                       generated_by=analyst, validated_by=admin, finalized_by=admin, finalized_at=now),
+                LoginHistory(user=analyst, email=analyst.email, success=True),
+                RequestLog(user_id=None, method=HTTPMethod.GET, path="/api/samples/", status_code=200, response_time_ms=5),
+                UserImpersonation(super_admin=super_admin, impersonated_user=analyst),
+            ])
+            if first is None:
+                first = (sample, project, entry, report)
+        db.commit()
+        sample, project, entry, report = first
+        return {"sample": sample.id, "project": project.id, "entry": entry.id, "report": report.id}
+    finally:
+        db.close()
+
+def measure(client: TestClient, ids: dict, lab_admin: dict, super_admin: dict) -> dict:
+    """{endpoint: (status code, queries)}"""
+    results = {}
+    for endpoint in MEASURED_ENDPOINTS:
+        url = ENDPOINT_URLS[endpoint].format(**ids)
+        response = client.get(url, headers=super_admin if url.startswith("/api/analytics/") else lab_admin)
+        match = SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+        results[endpoint] = (response.status_code, int(match.group(1)) if match else None)
+    return results
+
+@pytest.fixture(scope="module")
+def app():
+    """main.app's routes behind LoggingMiddleware (which sends Server-Timing), without its lifespan:
+    that starts the background workers and shuts the blocking pools down on exit"""
+    app = FastAPI()
+    app.router.routes.extend(main.app.routes)
+    app.add_middleware(LoggingMiddleware)
+    with pytest.MonkeyPatch.context() as patch:
+        async def enqueue(row: dict):
+            pass
+
+        patch.setattr(request_log_writer, "enqueue", enqueue)
+        yield app
+
+@pytest.fixture(scope="module")
+def measurements(app) -> tuple:
+    """(measurements with SMALL rows, measurements with LARGE rows)"""
+    db = SessionLocal()
+    admin = User(email=f"{uuid.uuid4().hex}@example.com", hashed_password="-", full_name="Query Check Lab",
+                 user_type=UserType.LAB_ADMINISTRATOR)
+    super_admin = User(email=f"{uuid.uuid4().hex}@example.com", hashed_password="-", full_name="Query Check",
+                       user_type=UserType.SUPER_ADMINISTRATOR)
+    db.add_all([admin, super_admin])
+    db.commit()
+    admin_id, super_admin_id = admin.id, super_admin.id
+    headers = [
+        {"Authorization": f"Bearer {create_access_token({'sub': user.email, 'user_type': user.user_type.value})}"}
+        for user in (admin, super_admin)
+    ]
+    db.close()
+
+    ids = add_rows(0, SMALL, admin_id, super_admin_id)
+    with TestClient(app, raise_server_exceptions=False) as client:
+        measure(client, ids, *headers)  # Warm the user cache and route registry first
+        small = measure(client, ids, *headers)
+        add_rows(SMALL, LARGE, admin_id, super_admin_id)
+        large = measure(client, ids, *headers)
+    return small, large
+
+def test_every_profiled_endpoint_has_a_url():
+    assert sorted(endpoint for endpoint in PROFILED_ENDPOINTS if endpoint not in ENDPOINT_URLS) == []
+
+@pytest.mark.parametrize("endpoint", MEASURED_ENDPOINTS)
+def test_query_count_does_not_grow_with_rows(endpoint, measurements):
+    small, large = measurements
+    (small_status, small_queries), (large_status, large_queries) = small[endpoint], large[endpoint]
+    assert (small_status, large_status) == (200, 200)
+    assert small_queries is not None
+    assert large_queries == small_queries, f"{endpoint} ({PROFILED_ENDPOINTS[endpoint]}) grows with rows"
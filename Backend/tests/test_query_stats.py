@@ -0,0 +1,16 @@
+from services.query_stats import RequestQueryStats
+
+def test_repeated_statements_above_the_threshold_most_repeated_first():
+    stats = RequestQueryStats()
+    for statement, runs in (("SELECT a", 3), ("SELECT b", 12), ("SELECT c", 11), ("SELECT d", 10)):
+        for _ in range(runs):
+            stats.record(statement, 0.5)
+    assert stats.repeated_statements(threshold=10) == [("SELECT b", 12), ("SELECT c", 11)]
+    assert stats.repeated_statements(threshold=20) == []
+    assert stats.count == 36
+
+def test_server_timing_header():
+    stats = RequestQueryStats()
+    stats.record("SELECT 1", 1.25)
+    stats.record("SELECT 1", 2.0)
+    assert stats.server_timing() == 'db;dur=3.2;desc="2 queries"'
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pytest
+from sqlalchemy import delete
+from models.request_log import RequestLog, HTTPMethod
+from services.request_log_window import RequestLogWindow, _weighted_percentiles
+
+def percentiles(groups, values, weights, group_count, quantiles=(0.5, 0.95)):
+    return _weighted_percentiles(
+        np.array(groups, dtype=np.int64), np.array(values, dtype=np.int64), np.array(weights, dtype=np.int64),
+        group_count, quantiles,
+    ).tolist()
+
+def test_unweighted_percentiles_per_group():
+    result = percentiles(groups=[1, 0, 0, 0], values=[5, 30, 10, 20], weights=[1, 1, 1, 1], group_count=2)
+    assert result == [[20, 30], [5, 5]]
+
+def test_weights_count_as_repeated_values():
+    # 10 once and 100 three times: the median is 100, the first quartile 10
+    result = percentiles(groups=[0, 0], values=[100, 10], weights=[3, 1], group_count=1, quantiles=(0.25, 0.5))
+    assert result == [[10, 100]]
+
+def test_groups_without_values_get_minus_one():
+    result = percentiles(groups=[0, 2], values=[7, 9], weights=[1, 1], group_count=3)
+    assert result == [[7, 7], [-1, -1], [9, 9]]
+
+def test_no_values():
+    assert percentiles(groups=[], values=[], weights=[], group_count=2) == [[-1, -1], [-1, -1]]
+
+@pytest.mark.anyio
+async def test_refresh_stops_at_rows_inserted_within_the_lag(async_db):
+    await async_db.execute(delete(RequestLog))
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    settled = {"created_at": now - timedelta(minutes=2), "inserted_at": now - timedelta(minutes=1)}
+    first = RequestLog(method=HTTPMethod.GET, path="/api/samples/", status_code=200, **settled)
+    async_db.add(first)
+    await async_db.flush()
+    # inserted_at stamped by the database's own clock, so it is inside the lag
+    async_db.add(RequestLog(method=HTTPMethod.GET, path="/api/samples/", status_code=200, created_at=now))
+    await async_db.flush()
+    async_db.add(RequestLog(method=HTTPMethod.GET, path="/api/samples/", status_code=500, **settled))
+    await async_db.commit()
+
+    window = RequestLogWindow(days=7, refresh_seconds=0, max_rows=1000, batch_size=100, lag_seconds=30)
+    await window.refresh()
+    assert window.stats()["rows"] == 1
+    assert window.stats()["watermark"] == first.id
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import delete
+from models.analytics_rollup import LoginHistoryHourly, RollupState
+from models.login_history import LoginHistory
+from services.rollups import LOGIN_HISTORY_ROLLUP, roll_up_batch, get_watermark, rolled_up_totals
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def db(async_db):
+    for model in (LoginHistory, LoginHistoryHourly, RollupState):
+        await async_db.execute(delete(model))
+    await async_db.commit()
+    return async_db
+
+async def test_rows_inserted_within_the_lag_stop_the_batch(db):
+    long_ago = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(minutes=5)
+    first = LoginHistory(email="a@example.com", success=False, created_at=long_ago)
+    db.add(first)
+    await db.flush()
+    # Stamped by the database's own clock, so it is inside the lag
+    db.add(LoginHistory(email="b@example.com", success=True))
+    await db.flush()
+    db.add(LoginHistory(email="c@example.com", success=False, created_at=long_ago))
+    await db.commit()
+
+    assert await roll_up_batch(db, LOGIN_HISTORY_ROLLUP, batch_size=100) == 1
+    assert await get_watermark(db, LOGIN_HISTORY_ROLLUP) == first.id
+    # Nothing more is ready until the recent row has aged past the lag
+    assert await roll_up_batch(db, LOGIN_HISTORY_ROLLUP, batch_size=100) == 0
+
+    # Rows past the watermark are still counted from the source table
+    totals = await rolled_up_totals(db, LOGIN_HISTORY_ROLLUP, long_ago, ("success",))
+    assert totals == {(False,): {"attempt_count": 2}, (True,): {"attempt_count": 1}}
@@ -0,0 +1,85 @@
+import uuid
+import pytest
+from database import SessionLocal
+from models.sample import Sample
+from models.sample_card import SampleCard
+from services.sample_cards import check_sample_cards
+
+@pytest.fixture
+def cards_report():
+    """check_sample_cards' {"missing", "stale", "orphaned"} counts: what a rebuild would change"""
+    def report() -> dict:
+        db = SessionLocal()
+        try:
+            return check_sample_cards(db)
+        finally:
+            db.close()
+    return report
+
+def search(api, term: str) -> set:
+    response = api.get("/api/samples/search", params={"q": term})
+    assert response.status_code == 200
+    return {sample["id"] for sample in response.json()}
+
+def search_text(sample_id: int) -> str:
+    db = SessionLocal()
+    try:
+        return db.get(SampleCard, sample_id).search_text
+    finally:
+        db.close()
+
+def test_cards_follow_writes_through_the_routers(api, cards_report):
+    tag = uuid.uuid4().hex[:8]
+    sample_type = api.post("/api/sample-types/", json={"name": f"Card Type {tag}"}).json()
+    first = api.post("/api/departments/", json={"name": f"Card Department {tag}"}).json()
+    second = api.post("/api/departments/", json={"name": f"Second Department {tag}"}).json()
+    test_type = api.post(f"/api/departments/{first['id']}/test-types", json={"name": f"Card Test {tag}"}).json()
+    customer = api.post("/api/customers/", json={"full_name": f"Card Customer {tag}"}).json()
+    project = api.post("/api/projects/", json={"customer_id": customer["id"], "name": f"Card Project {tag}"}).json()
+    sample = api.post("/api/samples/", json={
+        "customer_id": customer["id"], "project_id": project["id"], "sample_type_id": sample_type["id"],
+        "name": f"Card Sample {tag}", "department_ids": [first["id"]], "test_type_ids": [test_type["id"]],
+    }).json()
+    assert cards_report() == {"missing": 0, "stale": 0, "orphaned": 0}
+    assert search(api, f"Card Customer {tag}") == {sample["id"]}
+
+    # Changes to the sample and to every record its card copies from
+    assert api.put(f"/api/customers/{customer['id']}", json={"full_name": f"Renamed Customer {tag}"}).status_code == 200
+    assert api.put(f"/api/projects/{project['id']}", json={"name": f"Renamed Project {tag}"}).status_code == 200
+    assert api.put(f"/api/sample-types/{sample_type['id']}", json={"name": f"Renamed Type {tag}"}).status_code == 200
+    assert api.put(f"/api/departments/{first['id']}", json={"name": f"Renamed Department {tag}"}).status_code == 200
+    assert api.put(f"/api/departments/{first['id']}/test-types/{test_type['id']}",
+                   json={"name": f"Renamed Test {tag}"}).status_code == 200
+    assert cards_report() == {"missing": 0, "stale": 0, "orphaned": 0}
+    assert search(api, f"Card Customer {tag}") == set()
+    assert search(api, f"Renamed Customer {tag}") == {sample["id"]}
+
+    response = api.put(f"/api/samples/{sample['id']}", json={
+        "name": f"Moved Sample {tag}", "department_ids": [second["id"]], "test_type_ids": [],
+    })
+    assert response.status_code == 200
+    assert cards_report() == {"missing": 0, "stale": 0, "orphaned": 0}
+    assert f"Moved Sample {tag}".upper() in search_text(sample["id"])
+
+    # Deleting a record a card shows: the project reference is cleared, the department unlinked
+    assert api.delete(f"/api/projects/{project['id']}").status_code == 204
+    assert api.delete(f"/api/departments/{second['id']}").status_code == 204
+    assert cards_report() == {"missing": 0, "stale": 0, "orphaned": 0}
+
+def test_deleted_sample_loses_its_card(api, cards_report):
+    tag = uuid.uuid4().hex[:8]
+    sample_type = api.post("/api/sample-types/", json={"name": f"Card Type {tag}"}).json()
+    customer = api.post("/api/customers/", json={"full_name": f"Card Customer {tag}"}).json()
+    # Created directly, so it has no activity rows (which keep a sample from being deleted)
+    db = SessionLocal()
+    sample = Sample(sample_id=f"CARD-{tag}", customer_id=customer["id"], sample_type_id=sample_type["id"],
+                    name=f"Card Sample {tag}")
+    db.add(sample)
+    db.commit()
+    sample_id = sample.id
+    db.close()
+    assert search(api, f"CARD-{tag}") == {sample_id}
+
+    assert api.delete(f"/api/samples/{sample_id}").status_code == 204
+    assert search(api, f"CARD-{tag}") == set()
+    assert cards_report() == {"missing": 0, "stale": 0, "orphaned": 0}
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import delete
+from models.login_history import LoginHistory
+from models.request_log import RequestLog
+from services.security_telemetry import SecurityTelemetryStore
+
+pytestmark = pytest.mark.anyio
+
+def make_store() -> SecurityTelemetryStore:
+    return SecurityTelemetryStore(days=90, refresh_seconds=60, ips_per_hour=2, batch_size=100, lag_seconds=30)
+
+@pytest.fixture
+async def db(async_db):
+    for model in (LoginHistory, RequestLog):
+        await async_db.execute(delete(model))
+    await async_db.commit()
+    return async_db
+
+def failed_login(ip_address: str, created_at: datetime = None, reason: str = "Invalid password") -> LoginHistory:
+    return LoginHistory(email="a@example.com", success=False, ip_address=ip_address, failure_reason=reason,
+                        created_at=created_at)
+
+async def test_refresh_leaves_rows_inserted_within_the_lag(db):
+    store = make_store()
+    await store.refresh()
+    long_ago = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(minutes=5)
+    db.add(failed_login("10.0.0.1", long_ago))
+    await db.flush()
+    # Stamped by the database's own clock, so it is inside the lag
+    db.add(failed_login("10.0.0.2"))
+    await db.commit()
+
+    await store.refresh()
+    counts = store.failed_logins(long_ago - timedelta(hours=1))
+    assert counts["total"] == 1
+    assert counts["by_ip"] == {"10.0.0.1": 1}
+
+async def test_merged_periods_follow_folded_rows(db):
+    store = make_store()
+    await store.refresh()
+    long_ago = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(minutes=5)
+    since = long_ago - timedelta(hours=1)
+    db.add_all([failed_login("10.0.0.1", long_ago), failed_login("10.0.0.1", long_ago), failed_login("10.0.0.2", long_ago)])
+    await db.commit()
+    await store.refresh()
+    assert store.failed_logins(since)["total"] == 3
+
+    # A third IP in the same hour replaces the least frequent one (two IPs per hour)
+    db.add_all([failed_login("10.0.0.3", long_ago, "User not found"), failed_login("10.0.0.3", long_ago)])
+    await db.commit()
+    await store.refresh()
+    updated = store.failed_logins(since)
+    assert store.merges == 1
+    assert updated["total"] == 5
+    assert updated["by_reason"] == {"Invalid password": 4, "User not found": 1}
+    assert updated["by_ip"] == {"10.0.0.3": 3, "10.0.0.1": 2}
+
+    # The same as merging the hour buckets from scratch
+    store._merged.clear()
+    assert store.failed_logins(since) == updated
@@ -0,0 +1,27 @@
+from models.user import UserType
+from services.user_cache import user_cache
+
+def test_suspended_user_is_rejected_on_the_next_request(client, make_user, auth_headers):
+    manager = make_user(UserType.LAB_MANAGER)
+    analyst = make_user(UserType.LAB_ANALYST)
+    # Put the analyst in the user cache; its TTL is far longer than this test
+    assert client.get("/api/settings/account", headers=auth_headers(analyst)).status_code == 200
+    assert user_cache.get(("email", analyst.email)) is not None
+
+    response = client.put(f"/api/settings/users/{analyst.id}/suspend", headers=auth_headers(manager))
+    assert response.status_code == 200
+    assert response.json()["is_active"] is False
+
+    response = client.get("/api/settings/account", headers=auth_headers(analyst))
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Inactive user"
+
+def test_activated_user_is_accepted_on_the_next_request(client, make_user, auth_headers):
+    manager = make_user(UserType.LAB_MANAGER)
+    analyst = make_user(UserType.LAB_ANALYST, is_active=False)
+    assert client.get("/api/settings/account", headers=auth_headers(analyst)).status_code == 401
+
+    response = client.put(f"/api/settings/users/{analyst.id}/activate", headers=auth_headers(manager))
+    assert response.status_code == 200
+
+    assert client.get("/api/settings/account", headers=auth_headers(analyst)).status_code == 200
@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from services.snapshot_cache import SnapshotCache
+
+pytestmark = pytest.mark.anyio
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("load failed")
+        return self.calls
+
+async def test_fresh_value_is_served_from_the_cache():
+    loader = CountingLoader()
+    cache = SnapshotCache("test", loader, ttl=60, max_stale=120)
+    assert await cache.get() == 1
+    assert await cache.get() == 1
+    assert loader.calls == 1
+    assert cache.fresh_hits == 1
+
+async def test_concurrent_first_callers_share_one_load():
+    loader = CountingLoader()
+    cache = SnapshotCache("test", loader, ttl=60, max_stale=120)
+    assert await asyncio.gather(cache.get(), cache.get(), cache.get()) == [1, 1, 1]
+    assert loader.calls == 1
+
+async def test_stale_value_is_returned_while_reloading_in_the_background():
+    loader = CountingLoader()
+    cache = SnapshotCache("test", loader, ttl=0, max_stale=60)
+    assert await cache.get() == 1
+    assert await cache.get() == 1
+    assert cache.stale_hits == 1
+    await cache._refresh_task
+    assert await cache.get() == 2
+
+async def test_failed_background_reload_keeps_the_stale_value():
+    loader = CountingLoader()
+    cache = SnapshotCache("test", loader, ttl=0, max_stale=60)
+    assert await cache.get() == 1
+    loader.fail = True
+    assert await cache.get() == 1
+    await asyncio.wait([cache._refresh_task])
+    assert await cache.get() == 1
+    assert cache.failures >= 1
+
+async def test_invalidate_forces_a_reload():
+    loader = CountingLoader()
+    cache = SnapshotCache("test", loader, ttl=60, max_stale=120)
+    await cache.get()
+    cache.invalidate()
+    assert await cache.get() == 2
+
+async def test_first_load_failure_is_raised():
+    loader = CountingLoader()
+    loader.fail = True
+    cache = SnapshotCache("test", loader, ttl=60, max_stale=120)
+    with pytest.raises(RuntimeError):
+        await cache.get()
+    assert cache.failures == 1
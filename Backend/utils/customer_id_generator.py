@@ -1,16 +1,17 @@
 import random
 import string
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.customer import Customer
 
-def generate_customer_id(db: Session) -> str:
+async def generate_customer_id(db: AsyncSession) -> str:
     """Generate a unique 5-character customer ID"""
     while True:
         # Generate a 5-character alphanumeric ID (uppercase letters and numbers)
         customer_id = ''.join(random.choices(string.ascii_uppercase + string.digits, k=5))
         
         # Check if it already exists
-        existing = db.query(Customer).filter(Customer.customer_id == customer_id).first()
+        existing = (await db.execute(select(Customer).where(Customer.customer_id == customer_id))).scalar_one_or_none()
         if not existing:
             return customer_id
 
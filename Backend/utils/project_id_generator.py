@@ -1,16 +1,17 @@
 import random
 import string
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.project import Project
 
-def generate_project_id(db: Session) -> str:
+async def generate_project_id(db: AsyncSession) -> str:
     """Generate a unique 8-character project ID"""
     while True:
         # Generate an 8-character alphanumeric ID (uppercase letters and numbers)
         project_id = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
         
         # Check if it already exists
-        existing = db.query(Project).filter(Project.project_id == project_id).first()
+        existing = (await db.execute(select(Project).where(Project.project_id == project_id))).scalar_one_or_none()
         if not existing:
             return project_id
 
@@ -1,30 +1,34 @@
 import { useState, useEffect } from 'react'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card'
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select'
-import { analyticsService, type ChartDataPoint, type RequestChartDataPoint } from '@/services/analyticsService'
+import { analyticsService, type BusinessChartDataPoint, type ChartDataPoint, type ChartGranularity, type RequestChartDataPoint } from '@/services/analyticsService'
 import { LineChart, Line, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts'
-import { TrendingUp, Activity } from 'lucide-react'
+import { TrendingUp, Activity, Briefcase } from 'lucide-react'
 import { LoadingMeter } from '@/components/ui/loading'
 
 export function Charts() {
   const [loginData, setLoginData] = useState<ChartDataPoint[]>([])
   const [requestData, setRequestData] = useState<RequestChartDataPoint[]>([])
+  const [businessData, setBusinessData] = useState<BusinessChartDataPoint[]>([])
   const [loading, setLoading] = useState(true)
   const [days, setDays] = useState(7)
+  const [granularity, setGranularity] = useState<ChartGranularity>('day')
 
   useEffect(() => {
     loadChartData()
-  }, [days])
+  }, [days, granularity])
 
   const loadChartData = async () => {
     try {
       setLoading(true)
-      const [loginChart, requestChart] = await Promise.all([
-        analyticsService.getLoginChartData(days),
-        analyticsService.getRequestsChartData(days)
+      const [loginChart, requestChart, businessChart] = await Promise.all([
+        analyticsService.getLoginChartData(days, granularity),
+        analyticsService.getRequestsChartData(days, granularity),
+        analyticsService.getBusinessChartData(days, granularity)
       ])
       setLoginData(loginChart)
       setRequestData(requestChart)
+      setBusinessData(businessChart)
     } catch (error) {
       console.error('Failed to load chart data:', error)
     } finally {
@@ -49,16 +53,29 @@ export function Charts() {
             Visual representation of system metrics and trends
           </p>
         </div>
-        <Select value={days.toString()} onValueChange={(value) => setDays(parseInt(value))}>
-          <SelectTrigger className="w-32">
-            <SelectValue />
-          </SelectTrigger>
-          <SelectContent>
-            <SelectItem value="7">Last 7 days</SelectItem>
-            <SelectItem value="30">Last 30 days</SelectItem>
-            <SelectItem value="90">Last 90 days</SelectItem>
-          </SelectContent>
-        </Select>
+        <div className="flex gap-2">
+          <Select value={granularity} onValueChange={(value) => setGranularity(value as ChartGranularity)}>
+            <SelectTrigger className="w-32">
+              <SelectValue />
+            </SelectTrigger>
+            <SelectContent>
+              <SelectItem value="hour">Hourly</SelectItem>
+              <SelectItem value="day">Daily</SelectItem>
+              <SelectItem value="week">Weekly</SelectItem>
+              <SelectItem value="month">Monthly</SelectItem>
+            </SelectContent>
+          </Select>
+          <Select value={days.toString()} onValueChange={(value) => setDays(parseInt(value))}>
+            <SelectTrigger className="w-32">
+              <SelectValue />
+            </SelectTrigger>
+            <SelectContent>
+              <SelectItem value="7">Last 7 days</SelectItem>
+              <SelectItem value="30">Last 30 days</SelectItem>
+              <SelectItem value="90">Last 90 days</SelectItem>
+            </SelectContent>
+          </Select>
+        </div>
       </div>
 
       {/* Login Chart */}
@@ -123,6 +140,40 @@ export function Charts() {
           )}
         </CardContent>
       </Card>
+
+      {/* Business Chart */}
+      <Card>
+        <CardHeader>
+          <CardTitle className="flex items-center gap-2">
+            <Briefcase className="h-5 w-5" />
+            Lab Activity
+          </CardTitle>
+          <CardDescription>
+            Customers, projects, samples and reports created over time
+          </CardDescription>
+        </CardHeader>
+        <CardContent>
+          {businessData.length > 0 ? (
+            <ResponsiveContainer width="100%" height={400}>
+              <BarChart data={businessData}>
+                <CartesianGrid strokeDasharray="3 3" />
+                <XAxis dataKey="date" />
+                <YAxis allowDecimals={false} />
+                <Tooltip />
+                <Legend />
+                <Bar dataKey="customers" fill="#8b5cf6" name="Customers" />
+                <Bar dataKey="projects" fill="#f59e0b" name="Projects" />
+                <Bar dataKey="samples" fill="#3b82f6" name="Samples" />
+                <Bar dataKey="reports" fill="#10b981" name="Reports" />
+              </BarChart>
+            </ResponsiveContainer>
+          ) : (
+            <div className="text-center py-12 text-muted-foreground">
+              No lab activity data available
+            </div>
+          )}
+        </CardContent>
+      </Card>
     </div>
   )
 }
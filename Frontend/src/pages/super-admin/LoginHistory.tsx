@@ -10,9 +10,13 @@ import { LoadingMeter } from '@/components/ui/loading'
 export function LoginHistory() {
   const [logins, setLogins] = useState<LoginHistoryItem[]>([])
   const [total, setTotal] = useState(0)
+  const [totalIsEstimate, setTotalIsEstimate] = useState(false)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  // Cursors of the pages before the current one (the first page has no cursor)
+  const [cursorStack, setCursorStack] = useState<(string | undefined)[]>([])
   const [loading, setLoading] = useState(true)
   const [filters, setFilters] = useState({
-    skip: 0,
+    cursor: undefined as string | undefined,
     limit: 50,
     success_only: false,
     failed_only: false,
@@ -21,19 +25,21 @@ export function LoginHistory() {
 
   useEffect(() => {
     loadLogins()
-  }, [filters.skip, filters.limit, filters.success_only, filters.failed_only])
+  }, [filters.cursor, filters.limit, filters.success_only, filters.failed_only])
 
   const loadLogins = async () => {
     try {
       setLoading(true)
       const data = await analyticsService.getLoginHistory({
-        skip: filters.skip,
+        cursor: filters.cursor,
         limit: filters.limit,
         success_only: filters.success_only || undefined,
         failed_only: filters.failed_only || undefined,
       })
       setLogins(data.items)
       setTotal(data.total)
+      setTotalIsEstimate(data.total_is_estimate)
+      setNextCursor(data.next_cursor)
     } catch (error) {
       console.error('Failed to load login history:', error)
     } finally {
@@ -87,22 +93,30 @@ export function LoginHistory() {
               <Button
                 variant={filters.success_only ? "default" : "outline"}
                 size="sm"
-                onClick={() => setFilters({
-                  ...filters,
-                  success_only: !filters.success_only,
-                  failed_only: false
-                })}
+                onClick={() => {
+                  setCursorStack([])
+                  setFilters({
+                    ...filters,
+                    cursor: undefined,
+                    success_only: !filters.success_only,
+                    failed_only: false
+                  })
+                }}
               >
                 Successful Only
               </Button>
               <Button
                 variant={filters.failed_only ? "default" : "outline"}
                 size="sm"
-                onClick={() => setFilters({
-                  ...filters,
-                  failed_only: !filters.failed_only,
-                  success_only: false
-                })}
+                onClick={() => {
+                  setCursorStack([])
+                  setFilters({
+                    ...filters,
+                    cursor: undefined,
+                    failed_only: !filters.failed_only,
+                    success_only: false
+                  })
+                }}
               >
                 Failed Only
               </Button>
@@ -116,7 +130,7 @@ export function LoginHistory() {
         <CardHeader>
           <CardTitle>Login Attempts</CardTitle>
           <CardDescription>
-            Showing {filteredLogins.length} of {total} total logins
+            Showing {filteredLogins.length} of {totalIsEstimate ? 'about ' : ''}{total.toLocaleString()} total logins
           </CardDescription>
         </CardHeader>
         <CardContent>
@@ -169,25 +183,31 @@ export function LoginHistory() {
           )}
 
           {/* Pagination */}
-          {total > filters.limit && (
+          {(cursorStack.length > 0 || nextCursor) && (
             <div className="flex items-center justify-between mt-4 pt-4 border-t border-border">
               <div className="text-sm text-muted-foreground">
-                Page {Math.floor(filters.skip / filters.limit) + 1} of {Math.ceil(total / filters.limit)}
+                Page {cursorStack.length + 1} of {totalIsEstimate ? 'about ' : ''}{Math.ceil(total / filters.limit)}
               </div>
               <div className="flex gap-2">
                 <Button
                   variant="outline"
                   size="sm"
-                  disabled={filters.skip === 0}
-                  onClick={() => setFilters({ ...filters, skip: Math.max(0, filters.skip - filters.limit) })}
+                  disabled={cursorStack.length === 0}
+                  onClick={() => {
+                    setFilters({ ...filters, cursor: cursorStack[cursorStack.length - 1] })
+                    setCursorStack(cursorStack.slice(0, -1))
+                  }}
                 >
                   Previous
                 </Button>
                 <Button
                   variant="outline"
                   size="sm"
-                  disabled={filters.skip + filters.limit >= total}
-                  onClick={() => setFilters({ ...filters, skip: filters.skip + filters.limit })}
+                  disabled={!nextCursor}
+                  onClick={() => {
+                    setCursorStack([...cursorStack, filters.cursor])
+                    setFilters({ ...filters, cursor: nextCursor ?? undefined })
+                  }}
                 >
                   Next
                 </Button>
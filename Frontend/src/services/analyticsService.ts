@@ -43,11 +43,15 @@ export interface LoginHistoryItem {
   created_at: string
 }
 
-export interface LoginHistoryResponse {
+export interface CursorPage<T> {
   total: number
-  items: LoginHistoryItem[]
+  total_is_estimate: boolean
+  next_cursor: string | null
+  items: T[]
 }
 
+export type LoginHistoryResponse = CursorPage<LoginHistoryItem>
+
 export interface SecurityTelemetry {
   period_days: number
   failed_logins: {
@@ -76,18 +80,32 @@ export interface SecurityTelemetry {
   }>
 }
 
+export type ChartGranularity = 'hour' | 'day' | 'week' | 'month'
+
 export interface ChartDataPoint {
   date: string
+  start: string
   successful: number
   failed: number
 }
 
 export interface RequestChartDataPoint {
   date: string
+  start: string
   status_codes: Record<string, number>
   total: number
 }
 
+export interface BusinessChartDataPoint {
+  date: string
+  start: string
+  customers: number
+  projects: number
+  samples: number
+  result_entries: number
+  reports: number
+}
+
 export interface UserForImpersonation {
   id: number
   email: string
@@ -141,8 +159,9 @@ export const analyticsService = {
   },
 
   async getLoginHistory(params: {
-    skip?: number
+    cursor?: string
     limit?: number
+    exact_total?: boolean
     success_only?: boolean
     failed_only?: boolean
     user_id?: number
@@ -160,16 +179,23 @@ export const analyticsService = {
     return response.data
   },
 
-  async getLoginChartData(days: number = 7): Promise<ChartDataPoint[]> {
+  async getLoginChartData(days: number = 7, granularity: ChartGranularity = 'day'): Promise<ChartDataPoint[]> {
     const response = await api.get<ChartDataPoint[]>('/api/analytics/logins/chart', {
-      params: { days }
+      params: { days, granularity }
     })
     return response.data
   },
 
-  async getRequestsChartData(days: number = 7): Promise<RequestChartDataPoint[]> {
+  async getRequestsChartData(days: number = 7, granularity: ChartGranularity = 'day'): Promise<RequestChartDataPoint[]> {
     const response = await api.get<RequestChartDataPoint[]>('/api/analytics/requests/chart', {
-      params: { days }
+      params: { days, granularity }
+    })
+    return response.data
+  },
+
+  async getBusinessChartData(days: number = 30, granularity: ChartGranularity = 'day'): Promise<BusinessChartDataPoint[]> {
+    const response = await api.get<BusinessChartDataPoint[]>('/api/analytics/business/chart', {
+      params: { days, granularity }
     })
     return response.data
   },
@@ -202,12 +228,9 @@ export const analyticsService = {
     return response.data
   },
 
-  async getImpersonationHistory(skip: number = 0, limit: number = 50): Promise<{
-    total: number
-    items: ImpersonationHistoryItem[]
-  }> {
-    const response = await api.get('/api/analytics/impersonate/history', {
-      params: { skip, limit }
+  async getImpersonationHistory(cursor?: string, limit: number = 50): Promise<CursorPage<ImpersonationHistoryItem>> {
+    const response = await api.get<CursorPage<ImpersonationHistoryItem>>('/api/analytics/impersonate/history', {
+      params: { cursor, limit }
     })
     return response.data
   },